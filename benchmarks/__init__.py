@@ -0,0 +1,9 @@
+"""
+Benchmarks of smbl
+
+Run all benchmarks and compare with stored baseline:
+    python -m benchmarks.run
+Save new baseline:
+    python -m benchmarks.run --save
+"""
+from .cases import CASES, case
@@ -0,0 +1,345 @@
+"""
+Benchmark cases
+
+Every case is function which takes size parameter, prepares data
+and returns function without arguments, only this function is timed
+"""
+from __future__ import annotations
+
+import random
+from functools import reduce
+from math import sin
+from operator import add
+from typing import Callable
+
+from smbl import Var, Expression, Scope
+from smbl.algebra import Vector, ortogonalize, hessian
+from smbl.calculus import riman_integral, solve_ode_batch, minimize
+from smbl.relations import BinaryRelation, Relation, ReachabilityIndex, join_all, properties
+from smbl.taylor import taylor_coefficients
+from smbl.polynomial import Polynomial
+from smbl.incremental import IncrementalEvaluator
+from smbl.fingerprint import deduplicate
+from smbl.rewrite import Wildcard, Rule, Rewriter
+
+
+# name -> (setup function, sizes)
+CASES: dict[str, tuple[Callable[[int], Callable[[], object]], tuple]] = {}
+
+
+def case(*sizes):
+    """
+    Register benchmark case for every of given sizes
+    """
+    def decorator(setup):
+        CASES[setup.__name__] = (setup, sizes)
+        return setup
+    return decorator
+
+
+x, y = Var("x"), Var("y")
+
+
+def _terms(n: int) -> list[Expression]:
+    return [x * i + y for i in range(n)]
+
+
+def _balanced(terms: list) -> Expression:
+    """
+    Sum of terms as balanced tree, so depth
+    of recursion in evaluation is log(n)
+    """
+    while len(terms) > 1:
+        terms = [a + b for a, b in zip(terms[::2], terms[1::2])] + terms[len(terms) - len(terms) % 2:]
+    return terms[0]
+
+
+def _random_relation(n: int, degree: int = 4) -> BinaryRelation:
+    rnd = random.Random(n)
+    pairs = {(rnd.randrange(n), rnd.randrange(n)) for _ in range(degree * n)}
+    return BinaryRelation(pairs, set(range(n)))
+
+
+# -- EXPRESSIONS --
+
+@case(100, 1000, 10000)
+def build(n: int):
+    """
+    Build Expression of n terms by OperationHandler operators
+    """
+    return lambda: reduce(add, (x * i + y for i in range(n)))
+
+
+@case(100, 1000, 10000)
+def call(n: int):
+    """
+    Expression.__call__ of tree with n terms
+    """
+    e = _balanced(_terms(n))
+    return lambda: e(x=1.5, y=2.0)
+
+
+@case(1, 2, 3, 4, 5)
+def derivative(depth: int):
+    """
+    Take derivative depth times, size of result grows exponentially
+    """
+    e = x * x * x * y + x / y
+
+    def run():
+        d = e
+        for _ in range(depth):
+            d = d.derivative(x)
+        return d
+    return run
+
+
+@case(1, 2, 3, 4, 5, 20)
+def taylor(order: int):
+    """
+    Taylor coefficients up to order by jets, compare with derivative
+    """
+    e = x * x * x * y + x / y
+    return lambda: taylor_coefficients(e, x, 1.5, order, y=2.0)
+
+
+def _many_vars(n: int) -> tuple[list[Var], Expression]:
+    with Scope():
+        vs = [Var(f"v{i}") for i in range(n)]
+    return vs, _balanced([v * (v + i) for i, v in enumerate(vs)])
+
+
+@case(100, 300, 1000)
+def full_evaluation(n: int):
+    """
+    Expression.__call__ of tree with n Vars, compare with incremental_update,
+    every node checks all given values, so cost is O(size * n)
+    """
+    vs, e = _many_vars(n)
+    values = {v.name: 1.0 for v in vs}
+    return lambda: e(**values)
+
+
+@case(100, 300, 1000, 10000)
+def incremental_update(n: int):
+    """
+    Change one Var of tree with n Vars, cost is O(depth)
+    """
+    vs, e = _many_vars(n)
+    ev = IncrementalEvaluator(e, **{v.name: 1.0 for v in vs})
+    name = vs[n // 2].name
+    values = iter(range(10 ** 9))
+    return lambda: ev.update(**{name: next(values)})
+
+
+@case(5, 10, 20)
+def hessian_dense(n: int):
+    """
+    Hessian of sum of all pairwise products of n Vars,
+    only upper triangle is differentiated
+    """
+    with Scope():
+        vs = [Var(f"v{i}") for i in range(n)]
+    e = _balanced([a * b * b for a in vs for b in vs])
+    return lambda: hessian(e, vs)
+
+
+@case(100, 1000, 10000)
+def substitude(n: int):
+    """
+    Substitude Expression to tree with n terms
+    """
+    e = _balanced(_terms(n))
+    value = y * y + 1
+    return lambda: e.substitude(x=value)
+
+
+@case(10, 100, 300)
+def polynomial_mul(n: int):
+    """
+    Product of two sparse polynomials with n terms in 3 vars
+    """
+    rnd = random.Random(n)
+    z = Var("z")
+
+    def poly():
+        terms = {tuple(rnd.randrange(20) for _ in range(3)): rnd.randint(1, 9) for _ in range(n)}
+        return Polynomial(terms, (x, y, z))
+    a, b = poly(), poly()
+    return lambda: a * b
+
+
+@case(100, 1000, 10000)
+def deduplicate_corpus(n: int):
+    """
+    Deduplicate n random sums of products, every
+    Expression is written in two orders of operands
+    """
+    rnd = random.Random(n)
+    z = Var("z")
+    corpus = []
+    for _ in range(n // 2):
+        a, b, c = rnd.sample([x, y, z, 2, 3, 5], 3)
+        corpus.extend([a * (b + c), c * a + a * b])
+    return lambda: deduplicate(corpus)
+
+
+@case(10, 100, 1000)
+def rewrite_rules(n: int):
+    """
+    Rewrite tree of 1000 terms by n rules, rules are
+    indexed, so cost doesn't grow with n
+    """
+    a = Wildcard("a")
+    with Scope():
+        vs = [Var(f"v{i}") for i in range(n)]
+    rules = Rewriter([Rule(a * 1, a), Rule(a + 0, a)])
+    for v in vs:
+        rules.add(v * a, a * v)
+    e = _balanced([(x * 1 + 0) * i + y * 1 for i in range(1000)])
+    return lambda: rules.rewrite(e)
+
+
+# -- RELATIONS --
+
+@case(50, 100, 200)
+def relation_mul(n: int):
+    p = _random_relation(n)
+    return lambda: p * p
+
+
+@case(1000, 10000, 100000)
+def relation_join(n: int):
+    """
+    Natural join of three relations with n tuples, chain a-b-c-d
+    """
+    rnd = random.Random(n)
+
+    def table(columns):
+        return Relation({(rnd.randrange(n), rnd.randrange(n)) for _ in range(n)}, columns=columns)
+    p, q, r = table(("a", "b")), table(("b", "c")), table(("c", "d"))
+    return lambda: join_all(p, q, r)
+
+
+@case(50, 100, 200)
+def transitive_closure(n: int):
+    p = _random_relation(n)
+    return p.transitive_closure
+
+
+@case(1000, 10000, 100000)
+def reachability_queries(n: int):
+    """
+    1000 queries to reachability index of random relation
+    with n elements, compare with transitive_closure
+    """
+    p = _random_relation(n, degree=1)
+    index = ReachabilityIndex(p)
+    rnd = random.Random(n)
+    queries = [(rnd.randrange(n), rnd.randrange(n)) for _ in range(1000)]
+    return lambda: index.reachable_many(queries)
+
+
+@case(30, 60, 120)
+def equivalence(n: int):
+    """
+    Check of equivalence relation, all pairs are checked
+    """
+    p = BinaryRelation({(a, b) for a in range(n) for b in range(n) if a % 6 == b % 6}, set(range(n)))
+    return lambda: properties.equivalence(p)
+
+
+@case(20, 40, 80)
+def total_order(n: int):
+    """
+    Check of total order a <= b, all pairs are checked
+    """
+    p = BinaryRelation({(a, b) for a in range(n) for b in range(a, n)}, set(range(n)))
+    return lambda: properties.total_order(p)
+
+
+# -- CALCULUS AND ALGEBRA --
+
+@case(6, 10, 14)
+def riman_integral_adaptive(digits: int):
+    """
+    Adaptive integral with tolerance 10^-digits
+    """
+    tol = 10.0 ** -digits
+    return lambda: riman_integral(lambda t: sin(t * t), (0, 10), tol=tol)
+
+
+@case(1000, 10000, 100000)
+def riman_integral_sum(n: int):
+    """
+    Riemann sum with n points
+    """
+    return lambda: riman_integral(sin, (0, 1), dx=1 / n)
+
+
+@case(1, 10, 100)
+def ode_batch(n: int):
+    """
+    Van der Pol oscillator for n initial conditions by one batch
+    """
+    t = Var("t")
+    f = [y, (1 - x * x) * y - x]
+    starts = [(2.0, 0.1 * i) for i in range(n)]
+    return lambda: solve_ode_batch(f, (0, 5), starts, t=t, y=[x, y])
+
+
+@case(1, 10, 100)
+def minimize_batch(n: int):
+    """
+    L-BFGS on Rosenbrock function from n starting points
+    """
+    f = (1 - x) * (1 - x) + 100 * (y - x * x) * (y - x * x)
+    rnd = random.Random(n)
+    starts = [(rnd.uniform(-2, 2), rnd.uniform(-2, 2)) for _ in range(n)]
+    return lambda: minimize(f, [x, y], starts)
+
+
+def _vectors(n: int, spread: float = 1.0) -> list[Vector]:
+    """
+    n random vectors of dimension 2n, vectors with
+    small spread are close to one direction
+    """
+    rnd = random.Random(n)
+    return [Vector.from_iterable(1 - spread + spread * rnd.random() for _ in range(2 * n)) for _ in range(n)]
+
+
+@case(25, 50, 100)
+def ortogonalize_classical(n: int):
+    """
+    Classical Gram–Schmidt of n random vectors of dimension 2n
+    """
+    a = _vectors(n)
+    return lambda: ortogonalize(a, method="classical")
+
+
+@case(25, 50, 100)
+def ortogonalize_modified(n: int):
+    """
+    Modified Gram–Schmidt of n random vectors of dimension 2n
+    """
+    a = _vectors(n)
+    return lambda: ortogonalize(a)
+
+
+@case(25, 50, 100)
+def ortogonalize_householder(n: int):
+    """
+    Householder QR of n random vectors of dimension 2n
+    """
+    a = _vectors(n)
+    return lambda: ortogonalize(a, method="householder")
+
+
+@case(25, 50, 100)
+def ortogonalize_ill_conditioned(n: int):
+    """
+    Modified Gram–Schmidt of n vectors close to one direction, classical
+    method loses orthogonality on such input (see orthogonality_error)
+    """
+    a = _vectors(n, spread=1e-7)
+    return lambda: ortogonalize(a)
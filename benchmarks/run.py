@@ -0,0 +1,159 @@
+"""
+Runner of benchmarks
+
+Every case is timed for all its sizes, time is minimum over repeats
+of mean time of one call, so it is stable to noise of machine.
+Results are compared with baseline and cases slower than baseline
+more than threshold times are reported as regressions
+
+Usage:
+    python -m benchmarks.run                    # compare with baseline
+    python -m benchmarks.run --save             # save results as baseline
+    python -m benchmarks.run -k relation        # only cases with `relation` in name
+    python -m benchmarks.run --threshold 1.5    # regression is 50% slower
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from typing import Optional
+
+from .cases import CASES
+
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def key(name: str, size) -> str:
+    return f"{name}[{size}]"
+
+
+def measure(func, repeat: int = 5, min_time: float = 0.2) -> float:
+    """
+    Return time of one call of func in seconds
+    """
+    timer = timeit.Timer(func)
+    number, total = timer.autorange()
+    # autorange stops at 0.2 s, scale number for other min_time
+    if total < min_time:
+        number = max(1, int(number * min_time / max(total, 1e-9)))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(pattern: str = "", repeat: int = 5, min_time: float = 0.2,
+        sizes: Optional[int] = None) -> dict[str, float]:
+    """
+    Time cases with pattern in name
+
+    :param sizes: time only first given count of sizes of every case
+    :return: {"case[size]": time of one call}
+    """
+    results = {}
+    for name, (setup, case_sizes) in CASES.items():
+        if pattern not in name:
+            continue
+        for size in case_sizes[:sizes]:
+            results[key(name, size)] = measure(setup(size), repeat, min_time)
+    return results
+
+
+def load(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def save(path: str, results: dict[str, float]):
+    baseline = {
+        "machine": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "processor": platform.machine(),
+        },
+        "results": results,
+    }
+    with open(path, "w") as file:
+        json.dump(baseline, file, indent=2)
+        file.write("\n")
+
+
+def compare(results: dict[str, float], baseline: dict[str, float],
+            threshold: float = 1.25) -> list[tuple[str, float, Optional[float], str]]:
+    """
+    Compare results with baseline
+
+    :param threshold: case is regression if it is slower than
+                      baseline more than threshold times
+    :return: rows (case, time, baseline time, status)
+    """
+    rows = []
+    for name, time in results.items():
+        base = baseline.get(name)
+        if base is None:
+            status = "new"
+        elif time > base * threshold:
+            status = "REGRESSION"
+        elif time * threshold < base:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, time, base, status))
+    return rows
+
+
+def _format_time(t: Optional[float]) -> str:
+    if t is None:
+        return "-"
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if t >= scale:
+            return f"{t / scale:.3f} {unit}"
+    return f"{t / 1e-9:.1f} ns"
+
+
+def report(rows: list[tuple[str, float, Optional[float], str]]) -> str:
+    width = max([len(name) for name, *_ in rows] + [4])
+    lines = [f"{'case':<{width}} {'time':>12} {'baseline':>12} {'ratio':>7}  status"]
+    for name, time, base, status in rows:
+        ratio = f"{time / base:.2f}" if base else "-"
+        lines.append(
+            f"{name:<{width}} {_format_time(time):>12} {_format_time(base):>12} {ratio:>7}  {status}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Run smbl benchmarks")
+    parser.add_argument("-k", dest="pattern", default="", help="run only cases with this substring in name")
+    parser.add_argument("--baseline", default=BASELINE, help="path to baseline json")
+    parser.add_argument("--save", action="store_true", help="save results as baseline")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio reported as regression (default: 1.25)")
+    parser.add_argument("--repeat", type=int, default=5, help="repeats of every measure")
+    parser.add_argument("--quick", action="store_true", help="only smallest size, one repeat")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        results = run(args.pattern, repeat=1, min_time=0.01, sizes=1)
+    else:
+        results = run(args.pattern, repeat=args.repeat)
+
+    stored = load(args.baseline)
+    rows = compare(results, stored.get("results", {}), args.threshold)
+    print(report(rows))
+
+    if args.save:
+        # keep baseline of cases which were not run
+        save(args.baseline, {**stored.get("results", {}), **results})
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    return 1 if any(status == "REGRESSION" for *_, status in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
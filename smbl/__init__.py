@@ -1,7 +1,16 @@
 from .var import Var, Constant, Expression
+from .scope import Scope
 
 from . import operation
 from . import domain
+from . import compiler
+from . import interval
+from . import profiling
+from . import taylor
+from . import polynomial
+from . import incremental
+from . import fingerprint
+from . import rewrite
 
 from . import relations
 from . import algebra
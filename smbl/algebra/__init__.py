@@ -1,2 +1,5 @@
 from .vector import Vector
+from .matrix import Matrix
+from .symbolic import SymbolicVector, SymbolicMatrix, gradient, jacobian
+from .symbolic import hessian, HessianVectorProduct
 from .euclidean_space import *
@@ -1,16 +1,163 @@
+from itertools import repeat
+from math import copysign, sqrt, sumprod
+from operator import mul, sub
+
 from .vector import Vector
+from .matrix import Matrix
 
 
-def ortogonalize(a: list[Vector]) -> list[Vector]:
-    """
-    Gram–Schmidt process 
-    """
+__all__ = ["ortogonalize", "qr", "orthogonality_error"]
+
+
+def _classical(a: list[Vector]) -> list[Vector]:
     e = []
 
     for j in range(len(a)):
         ej = a[j]
         for s in range(j):
             ej += -(a[j] * e[s]) / (e[s] * e[s]) * e[s]
-        e.append(ej) 
+        e.append(ej)
     return e
 
+
+def _modified(rows: list[list]) -> list[list]:
+    """
+    Modified Gram–Schmidt, rows are orthogonalized in place
+
+    Every new orthogonal vector is immediately projected out
+    of all next vectors, so rounding errors are not accumulated
+    """
+    for j, e in enumerate(rows):
+        ee = sumprod(e, e)
+        if ee == 0:
+            continue
+        for k in range(j + 1, len(rows)):
+            c = sumprod(rows[k], e) / ee
+            if c:
+                rows[k] = list(map(sub, rows[k], map(mul, e, repeat(c))))
+    return rows
+
+
+def _householder(columns: list[list]) -> list:
+    """
+    Householder QR of matrix with given columns, columns are
+    transformed in place to columns of R
+
+    :return: reflectors (k, v, v * v), reflector k is I - 2vv^T / (v * v)
+             applied to components k, k+1, ... (None for zero column)
+    """
+    d = len(columns[0]) if columns else 0
+    reflectors = []
+    for k in range(min(len(columns), d)):
+        x = columns[k]
+        alpha = sqrt(sumprod(x[k:], x[k:]))
+        if alpha == 0:
+            reflectors.append(None)
+            continue
+        alpha = -copysign(alpha, x[k])
+
+        v = x[k:]
+        v[0] -= alpha
+        vv = sumprod(v, v)
+        x[k:] = [alpha] + [0.0] * (d - k - 1)
+
+        for j in range(k + 1, len(columns)):
+            w = columns[j]
+            c = 2 * sumprod(v, w[k:]) / vv
+            if c:
+                w[k:] = map(sub, w[k:], map(mul, v, repeat(c)))
+        reflectors.append((k, v, vv))
+    return reflectors
+
+
+def _q_column(reflectors: list, j: int, d: int) -> list:
+    """
+    Return column j of Q = H_0 H_1 ... H_{n-1}
+    """
+    q = [0.0] * d
+    q[j] = 1.0
+    # reflectors after j don't change e_j
+    for reflector in reversed(reflectors[:j + 1]):
+        if reflector is None:
+            continue
+        k, v, vv = reflector
+        c = 2 * sumprod(v, q[k:]) / vv
+        q[k:] = map(sub, q[k:], map(mul, v, repeat(c)))
+    return q
+
+
+def qr(A: Matrix) -> tuple[Matrix, Matrix]:
+    """
+    Householder QR decomposition of real matrix d x n (d >= n)
+
+    :return: (Q, R), Q is d x n with orthonormal columns,
+             R is n x n upper triangular, A = Q @ R
+    """
+    d, n = A.shape
+    if d < n:
+        raise ValueError(f"Cannot calculate reduced QR of {A.shape} matrix")
+    columns = [list(map(float, c)) for c in A.columns]
+    reflectors = _householder(columns)
+    Q = Matrix([_q_column(reflectors, j, d) for j in range(n)]).T
+    R = Matrix([c[:n] for c in columns]).T
+    return Q, R
+
+
+def ortogonalize(a: list[Vector],
+                 normalize: bool = False,
+                 method: str = "modified") -> list[Vector]:
+    """
+    Gram–Schmidt process
+
+    :param a: list of real vectors
+    :param normalize: return orthonormal vectors (zero vectors stay zero)
+    :param method: "classical" - classical Gram–Schmidt,
+                   "modified" - modified Gram–Schmidt,
+                   "householder" - by Householder QR, most stable
+    """
+    if method == "classical":
+        e = _classical(a)
+        if normalize:
+            e = [v / v.norm if v.norm else v for v in e]
+        return e
+
+    if method == "modified":
+        rows = _modified([list(v.values) for v in a])
+        if normalize:
+            for j, e in enumerate(rows):
+                norm = sqrt(sumprod(e, e))
+                if norm:
+                    rows[j] = list(map(mul, e, repeat(1 / norm)))
+        return [Vector.from_iterable(e) for e in rows]
+
+    if method == "householder":
+        columns = [list(map(float, v.values)) for v in a]
+        d = len(columns[0]) if columns else 0
+        reflectors = _householder(columns)
+        e = []
+        for j in range(len(columns)):
+            r = columns[j][j] if j < d else 0.0
+            if r == 0:
+                e.append(Vector.from_iterable([0.0] * d))
+                continue
+            # Gram–Schmidt vector is R_jj * q_j
+            scale = copysign(1.0, r) if normalize else r
+            q = _q_column(reflectors, j, d)
+            e.append(Vector.from_iterable(map(mul, q, repeat(scale))))
+        return e
+
+    raise ValueError(f"Unknown orthogonalization method `{method}`")
+
+
+def orthogonality_error(e: list[Vector]) -> float:
+    """
+    Return max |cos| of angle between two different vectors
+    """
+    norms = [v.norm for v in e]
+    error = 0.0
+    for i in range(len(e)):
+        for j in range(i + 1, len(e)):
+            if norms[i] and norms[j]:
+                error = max(error, abs(e[i] * e[j]) / (norms[i] * norms[j]))
+    return error
+
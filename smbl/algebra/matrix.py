@@ -1,7 +1,162 @@
 from __future__ import annotations
+from itertools import repeat
+from math import prod, sumprod
+from operator import add, sub, mul
+from typing import Iterable, Iterator, Union
+
 from .vector import Vector
 
 
 class Matrix:
-    def __init__(self, elems: list[Vector]):
-        self.elems = elems
+    """
+    Matrix stored by rows
+
+    Products are calculated by math.sumprod of rows and columns,
+    elimination is done by map over whole rows
+    """
+
+    vector = Vector     # type of rows
+
+    def __init__(self, elems: list[Vector | Iterable]):
+        """
+        :param elems: rows of matrix (Vectors or any iterables)
+        """
+        self.elems = [e if isinstance(e, self.vector) else self.vector.from_iterable(e) for e in elems]
+        self.rows = tuple(e.values for e in self.elems)
+        if len({len(row) for row in self.rows}) > 1:
+            raise ValueError("Rows of matrix have different lengths")
+
+    @classmethod
+    def identity(cls, n: int) -> Matrix:
+        return cls([[int(i == j) for j in range(n)] for i in range(n)])
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.rows), len(self.rows[0]) if self.rows else 0
+
+    @property
+    def T(self) -> Matrix:
+        """
+        Transposed matrix
+        """
+        return type(self)(zip(*self.rows))
+
+    def transpose(self) -> Matrix:
+        return self.T
+
+    @property
+    def columns(self) -> list[tuple]:
+        return list(zip(*self.rows))
+
+    def __getitem__(self, i: int) -> Vector:
+        return self.elems[i]
+
+    def __iter__(self) -> Iterator[Vector]:
+        return iter(self.elems)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _check(self, other: Matrix):
+        if self.shape != other.shape:
+            raise ValueError(f"Matrices have different shapes: {self.shape} and {other.shape}")
+
+    def __add__(self, other: Matrix) -> Matrix:
+        self._check(other)
+        return type(self)(map(add, a, b) for a, b in zip(self.rows, other.rows))
+
+    def __sub__(self, other: Matrix) -> Matrix:
+        self._check(other)
+        return type(self)(map(sub, a, b) for a, b in zip(self.rows, other.rows))
+
+    @staticmethod
+    def _scalar(other):
+        if isinstance(other, (Matrix, Vector)):
+            raise TypeError(f"Cannot multiply matrix by {type(other).__name__} elementwise, use @")
+
+    def __mul__(self, other) -> Matrix:
+        self._scalar(other)
+        return type(self)(map(mul, row, repeat(other)) for row in self.rows)
+
+    def __rmul__(self, other) -> Matrix:
+        self._scalar(other)
+        return type(self)(map(mul, repeat(other), row) for row in self.rows)
+
+    def __matmul__(self, other: Union[Matrix, Vector]) -> Union[Matrix, Vector]:
+        """
+        Product of matrix by matrix or by vector
+        """
+        if isinstance(other, Vector):
+            if self.shape[1] != len(other):
+                raise ValueError(f"Cannot multiply {self.shape} matrix by {len(other)} vector")
+            v = other.values
+            return self.vector.from_iterable(sumprod(row, v) for row in self.rows)
+
+        if self.shape[1] != other.shape[0]:
+            raise ValueError(f"Cannot multiply {self.shape} matrix by {other.shape} matrix")
+        columns = other.columns
+        return type(self)([sumprod(row, col) for col in columns] for row in self.rows)
+
+    @staticmethod
+    def _eliminate(rows: list[list], n: int) -> int:
+        """
+        Forward Gaussian elimination with partial pivoting
+        on first n columns, rows are changed in place
+
+        :return: sign of rows permutation or 0 if matrix is singular
+        """
+        sign = 1
+        for i in range(n):
+            p = max(range(i, n), key=lambda r: abs(rows[r][i]))
+            if rows[p][i] == 0:
+                return 0
+            if p != i:
+                rows[i], rows[p] = rows[p], rows[i]
+                sign = -sign
+
+            pivot_row = rows[i]
+            pivot = pivot_row[i]
+            for r in range(i + 1, n):
+                factor = rows[r][i] / pivot
+                if factor:
+                    rows[r] = list(map(sub, rows[r], map(mul, pivot_row, repeat(factor))))
+        return sign
+
+    @property
+    def det(self):
+        """
+        Determinant of square matrix
+        """
+        n, m = self.shape
+        if n != m:
+            raise ValueError(f"Cannot calculate determinant of {self.shape} matrix")
+        rows = [list(row) for row in self.rows]
+        sign = self._eliminate(rows, n)
+        if sign == 0:
+            return 0
+        return sign * prod(rows[i][i] for i in range(n))
+
+    def solve(self, b: Vector) -> Vector:
+        """
+        Return x: A @ x = b
+        """
+        n, m = self.shape
+        if n != m or n != len(b):
+            raise ValueError(f"Cannot solve system with {self.shape} matrix and {len(b)} vector")
+
+        rows = [[*row, v] for row, v in zip(self.rows, b.values)]
+        if self._eliminate(rows, n) == 0:
+            raise ValueError("Matrix is singular")
+
+        x = [0] * n
+        for i in reversed(range(n)):
+            row = rows[i]
+            x[i] = (row[n] - sumprod(row[i + 1:n], x[i + 1:])) / row[i]
+        return self.vector.from_iterable(x)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Matrix) and self.rows == other.rows
+
+    def __repr__(self) -> str:
+        rows = ",\n    ".join(repr(e) for e in self.elems)
+        return f"Matrix([\n    {rows},\n])"
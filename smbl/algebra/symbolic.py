@@ -0,0 +1,195 @@
+"""
+This module implements vectors and matrices
+with Expressions as entries
+"""
+from __future__ import annotations
+from functools import reduce
+from operator import add, mul
+from typing import Iterable, Sequence
+
+from ..var import Var, Expression
+from ..compiler import Kernel, compile_expression, variables
+from ..taylor import Jet, FUNCTIONS
+from .vector import Vector
+from .matrix import Matrix
+
+
+def _sorted_vars(exprs: Iterable[Expression]) -> list[Var]:
+    return sorted(variables(*exprs), key=lambda v: v.name)
+
+
+class SymbolicVector(Vector):
+    """
+    Vector of Expressions
+
+    All entries are compiled to one Kernel, so equal
+    subexpressions of different entries are computed once
+
+    Usage:
+    >>> v = SymbolicVector(x * y, x + x * y)
+    >>> v.evaluate(x=2, y=3)
+        Vector(6, 8)
+    """
+
+    def __init__(self, *values):
+        super().__init__(*(Expression.to_expression(v) for v in values))
+        self._kernels = {}
+
+    @classmethod
+    def from_iterable(cls, values: Iterable) -> SymbolicVector:
+        return cls(*values)
+
+    def __mul__(self, vec: Vector) -> Expression:
+        if not isinstance(vec, Vector):
+            return self.__rmul__(vec)
+        self._check(vec)
+        return reduce(add, map(mul, self.values, vec.values))
+
+    @property
+    def vars(self) -> set[Var]:
+        return variables(*self.values)
+
+    def compile(self, *vars: Var) -> Kernel:
+        """
+        Compile all entries to one Kernel returning tuple
+
+        :param vars: Vars in order of arguments (default: sorted by name)
+        """
+        vars = tuple(vars) if vars else tuple(_sorted_vars(self.values))
+        if vars not in self._kernels:
+            self._kernels[vars] = Kernel(list(self.values), vars)
+        return self._kernels[vars]
+
+    def evaluate(self, **values) -> Vector:
+        """
+        Calculate all entries by one call of compiled Kernel
+        """
+        return Vector.from_iterable(self.compile().evaluate(**values))
+
+    def derivative(self, var: Var) -> SymbolicVector:
+        return SymbolicVector(*(e.derivative(var) for e in self.values))
+
+    def jacobian(self, vars: list[Var]) -> SymbolicMatrix:
+        return jacobian(self.values, vars)
+
+
+class SymbolicMatrix(Matrix):
+    """
+    Matrix of Expressions
+
+    Usage:
+    >>> J = jacobian([x * y, x + y], [x, y])
+    >>> J.evaluate(x=2, y=3)
+        Matrix([
+            Vector(3, 2),
+            Vector(1, 1),
+        ])
+    """
+
+    vector = SymbolicVector
+
+    def __init__(self, elems: list[Vector | Iterable]):
+        super().__init__(elems)
+        self._kernels = {}
+
+    @property
+    def vars(self) -> set[Var]:
+        return variables(*(e for row in self.rows for e in row))
+
+    def compile(self, *vars: Var) -> Kernel:
+        """
+        Compile all entries (row by row) to one Kernel returning tuple
+
+        :param vars: Vars in order of arguments (default: sorted by name)
+        """
+        entries = [e for row in self.rows for e in row]
+        vars = tuple(vars) if vars else tuple(_sorted_vars(entries))
+        if vars not in self._kernels:
+            self._kernels[vars] = Kernel(entries, vars)
+        return self._kernels[vars]
+
+    def evaluate(self, **values) -> Matrix:
+        """
+        Calculate all entries by one call of compiled Kernel
+        """
+        return self.reshape(self.compile().evaluate(**values))
+
+    def reshape(self, values: tuple) -> Matrix:
+        """
+        Return Matrix of shape of this matrix with given entries
+        """
+        _, m = self.shape
+        return Matrix([values[i:i + m] for i in range(0, len(values), m)])
+
+
+def gradient(expr: Expression, vars: list[Var]) -> SymbolicVector:
+    """
+    Return vector of partial derivatives of Expression
+    """
+    expr = Expression.to_expression(expr)
+    return SymbolicVector(*(expr.derivative(var) for var in vars))
+
+
+def jacobian(exprs: list[Expression], vars: list[Var]) -> SymbolicMatrix:
+    """
+    Return Jacobian matrix of Expressions, row i is gradient of exprs[i]
+    """
+    return SymbolicMatrix([gradient(e, vars) for e in exprs])
+
+
+def hessian(expr: Expression, vars: list[Var]) -> SymbolicMatrix:
+    """
+    Return symmetric matrix of second derivatives of Expression
+
+    Only upper triangle is calculated, derivatives by var j of
+    all rows share one memo, so derivative of every common
+    subtree of gradient is taken once
+    """
+    expr = Expression.to_expression(expr)
+    grads = [expr._differentiate(var, {}) for var in vars]
+    memos = [{} for _ in vars]
+    n = len(vars)
+    rows = [[None] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i, n):
+            rows[i][j] = rows[j][i] = grads[i]._differentiate(vars[j], memos[j])
+    return SymbolicMatrix(rows)
+
+
+class HessianVectorProduct:
+    """
+    Product of Hessian of Expression by vector without forming Hessian
+
+    Gradient is evaluated once at jets x + t v, derivative
+    of gradient by t is H v, so cost is cost of gradient
+
+    Usage:
+    >>> hvp = HessianVectorProduct(x * x * y, [x, y])
+    >>> hvp([1, 2], [1, 0])
+        Vector(4, 2)
+    """
+
+    def __init__(self, expr: Expression, vars: list[Var]):
+        expr = Expression.to_expression(expr)
+        self.vars = list(vars)
+        self.others = sorted(variables(expr) - set(self.vars), key=lambda v: v.name)
+        self.kernel = compile_expression(
+            [expr.derivative(var) for var in self.vars], self.vars + self.others, FUNCTIONS
+        )
+
+    def __call__(self, point: Sequence, v: Sequence, **values) -> Vector:
+        """
+        :param point: values of vars
+        :param v: vector to multiply
+        :param values: values of other Vars of Expression
+        """
+        if len(point) != len(self.vars) or len(v) != len(self.vars):
+            raise ValueError(f"Point and vector must have {len(self.vars)} components")
+        args = [Jet([p, d]) for p, d in zip(point, v)]
+        for var in self.others:
+            if var.name not in values:
+                raise NameError(f"Variable `{var.name}` not given value")
+            args.append(values[var.name])
+        return Vector.from_iterable(
+            g.coefficients[1] if isinstance(g, Jet) else 0 for g in self.kernel(*args)
+        )
@@ -1,27 +1,84 @@
 from __future__ import annotations
-from typing import override
+from itertools import repeat
+from math import sqrt, sumprod
+from operator import add, sub, mul, neg, truediv
+from typing import Iterable, Iterator, override
 
 
 class Vector:
+    """
+    Vector of values
+
+    Element-wise operations are done by map and dot product by
+    math.sumprod, so loops over values are done by C code
+    """
+
     def __init__(self, *values):
         self.values = values
 
+    @classmethod
+    def from_iterable(cls, values: Iterable) -> Vector:
+        """
+        Create vector without unpacking values to arguments
+        """
+        vec = cls.__new__(cls)
+        vec.values = tuple(values)
+        return vec
+
+    def _check(self, vec: Vector):
+        if len(self.values) != len(vec.values):
+            raise ValueError(f"Vectors have different dimensions: "
+                             f"{len(self.values)} and {len(vec.values)}")
+
     def __add__(self, vec: Vector) -> Vector:
-        return type(self)(*[a + b for a, b in zip(self.values, vec.values)])
+        self._check(vec)
+        return self.from_iterable(map(add, self.values, vec.values))
 
     @property
     def inverse(self) -> Vector:
-        return (-1) * self
-    
+        return self.from_iterable(map(neg, self.values))
+
+    def __neg__(self) -> Vector:
+        return self.inverse
+
     def __sub__(self, vec: Vector) -> Vector:
-        return self + vec.inverse
+        self._check(vec)
+        return self.from_iterable(map(sub, self.values, vec.values))
 
     @override
     def __mul__(self, vec: Vector) -> int | float | complex:
-        return sum([a * b for a, b in zip(self.values, vec.values)])
-    
+        if not isinstance(vec, Vector):
+            return self.__rmul__(vec)
+        self._check(vec)
+        return sumprod(self.values, vec.values)
+
     def __rmul__(self, other) -> Vector:
-        return type(self)(*[a * other for a in self.values])
+        return self.from_iterable(map(mul, self.values, repeat(other)))
+
+    def __truediv__(self, other) -> Vector:
+        return self.from_iterable(map(truediv, self.values, repeat(other)))
+
+    @property
+    def norm(self) -> float:
+        """
+        Euclidean norm of real vector
+        """
+        return sqrt(abs(self * self))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.values)
+
+    def __getitem__(self, i: int):
+        return self.values[i]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Vector) and self.values == other.values
+
+    def __hash__(self) -> int:
+        return hash(self.values)
 
     def __repr__(self) -> str:
         return f"Vector{self.values}"
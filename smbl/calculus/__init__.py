@@ -0,0 +1,4 @@
+from .integral import stieltjes_integral, riman_integral, multiple_integral
+from .ode import solve_ode, solve_ode_batch, ODESolution
+from .solvers import find_root, solve_system, minimize, SolverResult
+from . import quadrature
@@ -1,62 +1,290 @@
 """
-Test module for integral implementation
+This module implements integrals of functions and Expressions
+
+Expressions are compiled to Kernels before integration (see integrand),
+riman_integral and stieltjes_integral can distribute work between
+thread or process workers, multiple_integral integrates Expression of
+many variables by iterated adaptive quadrature
 """
-from typing import Callable
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from math import ceil, fsum
+from operator import mul, sub
+from typing import Callable, Optional, Union
+
+from ..var import Var, Expression
+from ..compiler import compile_expression, variables
+from .quadrature import integrate, evaluate_many
+
+
+class _Identity:
+    """
+    Function g(x) = x with batch evaluation as Kernel
+    """
+
+    def __call__(self, x: float) -> float:
+        return x
+
+    def batch(self, xs: list[float]) -> list[float]:
+        return list(xs)
+
+
+_identity = _Identity()
+
+
+EXECUTORS = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+def _map(func: Callable, tasks: list[tuple],
+         workers: Optional[int], executor: str) -> list:
+    """
+    Apply func to arguments of every task, tasks are
+    distributed between workers, order of results is kept
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor `{executor}`")
+    if not workers or workers == 1 or len(tasks) == 1:
+        return [func(*args) for args in tasks]
+    with EXECUTORS[executor](max_workers=workers) as pool:
+        return list(pool.map(func, *zip(*tasks)))
+
+
+def integrand(f: Union[Callable, Expression], var: Optional[Var] = None) -> Callable:
+    """
+    Return function to integrate
+
+    Expression is compiled once to Kernel of one variable
+    (see smbl.compiler), so it is not walked for every point
+
+    :param f:           function or Expression
+    :param var:         integration variable of Expression
+    """
+    if not isinstance(f, (Expression, Var)):
+        return f
+    if var is None:
+        vars = variables(f)
+        if len(vars) != 1:
+            raise ValueError("Integration variable is not given")
+        var, = vars
+    return compile_expression(f, [var])
+
+
+def _stieltjes_chunk(f: Callable, g: Callable,
+                     segment: tuple[float, float], n: int,
+                     start: int, stop: int,
+                     vectorized: bool) -> float:
+    """
+    Return Riman-Stieltjes sum on grid points [start, stop]
+    of uniform grid with n steps on segment
+    """
+    a, b = segment
+    h = (b - a) / n
+    xs = [a + i * h for i in range(start, stop + 1)]
+    if stop == n:
+        xs[-1] = b
+
+    gs = evaluate_many(g, xs, vectorized)
+    fs = evaluate_many(f, xs[:-1], vectorized)
 
+    dg = list(map(sub, gs[1:], gs[:-1]))
+    if min(dg) < 0:
+        raise TypeError("Invalid type of g function, it must be non-decreasing")
+    return fsum(map(mul, fs, dg))
 
-def stieltjes_integral(f: Callable[[float], float],
-                       g: Callable[[float], float],
+
+def stieltjes_integral(f: Union[Callable[[float], float], Expression],
+                       g: Union[Callable[[float], float], Expression],
                        segment: tuple[float, float],
-                       dx: float = 1e-5) -> float:
+                       dx: float = 1e-5,
+                       chunk: int = 2**16,
+                       vectorized: bool = False,
+                       var: Optional[Var] = None,
+                       workers: Optional[int] = None,
+                       executor: str = "thread") -> float:
     """
     Return integral of function on segment
     by Riman-Stieltjes
 
-    :param f:           function
-    :param g:           not-decreasing function 
+    Grid is processed by chunks, in every chunk f and g are
+    evaluated once per point (see evaluate_many). Chunks can
+    be distributed between workers, partial sums are added
+    by fsum in order of chunks, so result does not depend
+    on count of workers
+
+    :param f:           function or Expression
+    :param g:           not-decreasing function or Expression
     :param segment:     segment
     :param dx:          step
+    :param chunk:       count of grid points evaluated at once
+    :param vectorized:  f and g accept list of points
+    :param var:         integration variable of Expressions
+    :param workers:     count of workers to process chunks
+    :param executor:    "thread" or "process" (f and g must be picklable),
+                        threads speed up only functions which release GIL
+                        (e.g. numpy), pure-Python functions and compiled
+                        Expressions need "process"
 
     :return:            integral value
     """
-    intg = 0
+    f, g = integrand(f, var), integrand(g, var)
     a, b = segment
 
     sign = -1 if a > b else 1
     if a > b:
         a, b = b, a
 
-    while a < b:
-        dg = g(a + dx) - g(a)
-        if dg < 0:
-            raise TypeError("Invalid type of g function, it must be non-decreasing")
-        intg += f(a) * dg
-        a += dx
-    return sign * intg
+    # grid points are computed from index, so error of step
+    # is not accumulated and last point is exactly b
+    n = max(1, ceil((b - a) / dx))
+    tasks = [
+        (f, g, (a, b), n, start, min(start + chunk, n), vectorized)
+        for start in range(0, n, chunk)
+    ]
+    return sign * fsum(_map(_stieltjes_chunk, tasks, workers, executor))
 
 
-def riman_integral(f: Callable[[float], float], 
-                   segment: tuple[float, float], 
-                   dx: float = 1e-5) -> float:
+def riman_integral(f: Union[Callable[[float], float], Expression],
+                   segment: tuple[float, float],
+                   dx: Optional[float] = None,
+                   method: str = "gauss-kronrod",
+                   tol: float = 1e-10,
+                   var: Optional[Var] = None,
+                   workers: Optional[int] = None,
+                   parts: int = 16,
+                   executor: str = "thread") -> float:
     """
     Return integral of function on segment
     by Riman
 
-    :param f:           function
+    By default integral is calculated by adaptive quadrature,
+    if step is given Riman sum with this step is used
+
+    If workers is given segment is split into parts which
+    are integrated by workers (parts don't depend on count
+    of workers, so result is the same for any count, including
+    workers=1). Without workers whole segment is integrated at once,
+    so result can differ from split one in last digits (within tol)
+
+    :param f:           function or Expression
     :param segment:     segment
-    :param dx:          step
+    :param dx:          step of Riman sum
+    :param method:      adaptive method (see quadrature.METHODS)
+    :param tol:         target absolute error of adaptive method
+    :param var:         integration variable of Expression
+    :param workers:     count of workers
+    :param parts:       count of subintervals for workers
+    :param executor:    "thread" or "process" (f must be picklable,
+                        Expressions are pickled and compiled in workers),
+                        threads speed up only functions which release GIL
+                        (e.g. numpy), pure-Python functions and compiled
+                        Expressions need "process"
+
+    :return:            integral value
+    """
+    f = integrand(f, var)
+    if dx is not None:
+        return stieltjes_integral(f, _identity, segment, dx,
+                                  workers=workers, executor=executor)
+    if workers is None:
+        value, _ = integrate(f, segment, method, tol)
+        return value
+
+    a, b = segment
+    tasks = [
+        (f, (a + (b - a) * i / parts, a + (b - a) * (i + 1) / parts), method, tol / parts)
+        for i in range(parts)
+    ]
+    return fsum(value for value, _ in _map(integrate, tasks, workers, executor))
+
+
+class _Section:
+    """
+    Kernel with fixed values of first arguments
+    """
+
+    def __init__(self, kernel: Callable, fixed: tuple):
+        self.kernel = kernel
+        self.fixed = fixed
+
+    def __call__(self, x: float) -> float:
+        return self.kernel(*self.fixed, x)
+
+    def batch(self, xs: list[float]) -> list:
+        return self.kernel.batch(*self.fixed, xs)
+
+
+def multiple_integral(f: Expression,
+                      segments: dict[Var, tuple[float, float]],
+                      method: str = "gauss-kronrod",
+                      tol: float = 1e-10) -> float:
+    """
+    Return multiple integral of Expression by iterated
+    adaptive quadrature
+
+    Usage:
+    >>> multiple_integral(x * y, {x: (0, 1), y: (0, 2)})
+        1.0
+
+    :param f:           Expression
+    :param segments:    segment of every integration variable,
+                        first variable is outer integral
+    :param method:      adaptive method (see quadrature.METHODS)
+    :param tol:         target absolute error of every inner integral
 
     :return:            integral value
     """
-    return stieltjes_integral(f, lambda x: x, segment, dx) 
+    vars = list(segments)
+    kernel = compile_expression(f, vars)
+
+    def section(fixed: tuple) -> float:
+        var = vars[len(fixed)]
+        if len(fixed) == len(vars) - 1:
+            g = _Section(kernel, fixed)
+        else:
+            def g(x: float) -> float:
+                return section((*fixed, x))
+        value, _ = integrate(g, segments[var], method, tol)
+        return value
+
+    return section(())
 
 
 if __name__ == "__main__":
     from math import sin, cos, pi
+    from time import perf_counter
+
+    class Counter:
+        def __init__(self, f):
+            self.f = f
+            self.calls = 0
+
+        def __call__(self, x):
+            self.calls += 1
+            return self.f(x)
 
     seg = (0, 1)
-    print(stieltjes_integral(cos, sin, (0, pi/2)))
-    print(riman_integral(lambda x: x, seg))
-    print(riman_integral(sin, seg))
-    print(riman_integral(cos, seg))
-    print(riman_integral(lambda x: sin(cos(x)), seg))
+    print(stieltjes_integral(cos, sin, (0, pi/2)), "~", pi / 4)
+
+    functions = {
+        "x": (lambda x: x, 0.5),
+        "sin(x)": (sin, 1 - cos(1)),
+        "cos(x)": (cos, sin(1)),
+        "sin(cos(x))": (lambda x: sin(cos(x)), None),
+    }
+
+    print(f"{'f':<12} {'method':<14} {'value':>20} {'error':>10} {'calls':>8} {'time, s':>9}")
+    for name, (f, exact) in functions.items():
+        if exact is None:
+            exact, _ = integrate(f, seg, tol=1e-15)
+        for method in ("riman dx=1e-5", "gauss-kronrod", "simpson"):
+            counter = Counter(f)
+            start = perf_counter()
+            if method.startswith("riman"):
+                value = riman_integral(counter, seg, dx=1e-5)
+            else:
+                value = riman_integral(counter, seg, method=method)
+            time = perf_counter() - start
+            print(f"{name:<12} {method:<14} {value:>20.16f} "
+                  f"{abs(value - exact):>10.1e} {counter.calls:>8} {time:>9.5f}")
@@ -0,0 +1,363 @@
+"""
+Solvers of ordinary differential equations y' = f(t, y)
+
+Right-hand side given by Expressions is compiled to one Kernel,
+every stage of method is one batch call of Kernel for all
+trajectories, so many initial conditions are integrated together
+with common adaptive step
+"""
+from __future__ import annotations
+
+from math import sqrt, sumprod
+from operator import add, sub
+from typing import Callable, Optional, Sequence, Union
+
+from ..var import Var, Expression
+from ..algebra.symbolic import SymbolicVector, jacobian
+
+
+# Dormand–Prince 5(4) coefficients
+_C = (0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1)
+_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# difference of weights of 5 and 4 order solutions
+_E = (
+    35 / 384 - 5179 / 57600,
+    0,
+    500 / 1113 - 7571 / 16695,
+    125 / 192 - 393 / 640,
+    -2187 / 6784 + 92097 / 339200,
+    11 / 84 - 187 / 2100,
+    -1 / 40,
+)
+
+# parameters of Rosenbrock 2(3) pair
+_D = 1 / (2 + sqrt(2))
+_E32 = 6 + sqrt(2)
+
+
+Rows = list[Sequence[float]]
+
+
+class ODESolution:
+    """
+    Solution of initial value problem
+
+    t - times of accepted steps,
+    y - states at times t, y[k] is tuple of components,
+        for batch y[k][i] is state of trajectory i
+    """
+
+    def __init__(self, t: list[float], y: list, steps: int, rejected: int, evaluations: int):
+        self.t = t
+        self.y = y
+        self.steps = steps
+        self.rejected = rejected
+        self.evaluations = evaluations
+
+    @property
+    def final(self):
+        return self.y[-1]
+
+    def trajectory(self, i: int) -> list[tuple]:
+        """
+        Return states of trajectory i of batch solution
+        """
+        return [y[i] for y in self.y]
+
+    def __repr__(self) -> str:
+        return (f"ODESolution(t=[{self.t[0]}, {self.t[-1]}], steps={self.steps}, "
+                f"rejected={self.rejected}, evaluations={self.evaluations})")
+
+
+class _RHS:
+    """
+    Right-hand side for batch of states, counts evaluations
+    """
+
+    def __init__(self, f, t: Optional[Var], y: Optional[Sequence[Var]]):
+        self.evaluations = 0
+        self.jacobian = None
+        if callable(f) and not isinstance(f, (Expression, Var)):
+            self._kernel = None
+            self._f = f
+            return
+        if t is None or y is None:
+            raise ValueError("Vars t and y must be given for Expressions")
+        exprs = list(f.values) if isinstance(f, SymbolicVector) else list(f)
+        if len(exprs) != len(y):
+            raise ValueError(f"{len(exprs)} equations for {len(y)} unknowns")
+        self.exprs, self.t, self.y = exprs, t, list(y)
+        self._kernel = SymbolicVector(*exprs).compile(t, *y)
+
+    def __call__(self, t: float, Y: Rows) -> Rows:
+        self.evaluations += 1
+        if self._kernel is None:
+            return [tuple(self._f(t, y)) for y in Y]
+        return self._kernel.batch(t, *map(list, zip(*Y)))
+
+    def jacobian_function(self, jac: Optional[Callable]) -> Callable[[float, Rows], list]:
+        """
+        Return function of batch which returns for every state
+        rows of matrix [df/dy | df/dt]
+        """
+        if jac is not None:
+            return lambda t, Y: [[list(row) for row in jac(t, y)] for y in Y]
+        if self._kernel is None:
+            raise ValueError("Stiff method needs Expressions or jacobian function")
+
+        m = len(self.y)
+        kernel = jacobian(self.exprs, self.y + [self.t]).compile(self.t, *self.y)
+
+        def evaluate(t: float, Y: Rows) -> list:
+            entries = kernel.batch(t, *map(list, zip(*Y)))
+            return [[e[i:i + m + 1] for i in range(0, m * (m + 1), m + 1)] for e in entries]
+        return evaluate
+
+
+def _combine(Y: Rows, h: float, weights: Sequence[float], K: list[Rows]) -> Rows:
+    """
+    Return Y + h * sum weights[s] * K[s] for every state
+    """
+    stages = [(w, k) for w, k in zip(weights, K) if w]
+    ws = [w for w, _ in stages]
+    result = []
+    for y, *ks in zip(Y, *(k for _, k in stages)):
+        result.append([yj + h * sumprod(ws, kj) for yj, *kj in zip(y, *ks)])
+    return result
+
+
+def _error(Y: Rows, Ynew: Rows, E: Rows, rtol: float, atol: float) -> float:
+    """
+    Max over states of RMS of scaled error
+    """
+    error = 0.0
+    for y, ynew, e in zip(Y, Ynew, E):
+        s = sum((ej / (atol + rtol * max(abs(yj), abs(nj)))) ** 2 for yj, nj, ej in zip(y, ynew, e))
+        error = max(error, sqrt(s / len(e)) if e else 0.0)
+    return error
+
+
+def _initial_step(Y: Rows, F: Rows, span: float) -> float:
+    d0 = max((max(map(abs, y), default=0.0) for y in Y), default=0.0)
+    d1 = max((max(map(abs, f), default=0.0) for f in F), default=0.0)
+    h = 0.01 * d0 / d1 if d0 > 1e-5 and d1 > 1e-5 else 1e-6
+    return min(h, abs(span))
+
+
+def _factor(error: float, order: int, rejected: bool) -> float:
+    factor = 5.0 if error == 0 else 0.9 * error ** (-1 / (order + 1))
+    return max(0.2, min(1.0 if rejected else 5.0, factor))
+
+
+def _lu(rows: list[list[float]]) -> tuple[list[list[float]], list[int]]:
+    """
+    LU decomposition with partial pivoting, L and U are stored in one matrix
+    """
+    n = len(rows)
+    perm = list(range(n))
+    for i in range(n):
+        p = max(range(i, n), key=lambda r: abs(rows[r][i]))
+        if rows[p][i] == 0:
+            raise ValueError("Matrix of Rosenbrock method is singular")
+        if p != i:
+            rows[i], rows[p] = rows[p], rows[i]
+            perm[i], perm[p] = perm[p], perm[i]
+        pivot = rows[i][i]
+        for r in range(i + 1, n):
+            factor = rows[r][i] / pivot
+            rows[r][i] = factor
+            if factor:
+                for c in range(i + 1, n):
+                    rows[r][c] -= factor * rows[i][c]
+    return rows, perm
+
+
+def _lu_solve(lu: tuple[list[list[float]], list[int]], b: Sequence[float]) -> list[float]:
+    rows, perm = lu
+    n = len(rows)
+    x = [b[p] for p in perm]
+    for i in range(n):
+        x[i] -= sumprod(rows[i][:i], x[:i])
+    for i in reversed(range(n)):
+        x[i] = (x[i] - sumprod(rows[i][i + 1:], x[i + 1:])) / rows[i][i]
+    return x
+
+
+def _dormand_prince(f: _RHS, t0: float, t1: float, Y: Rows, rtol: float, atol: float,
+                    h: Optional[float], max_steps: int, **_) -> tuple:
+    direction = 1 if t1 >= t0 else -1
+    t = t0
+    K1 = f(t, Y)
+    h = abs(h) if h else _initial_step(Y, K1, t1 - t0)
+    ts, ys = [t], [[tuple(y) for y in Y]]
+    steps = rejected = 0
+    while direction * (t1 - t) > 0:
+        if steps + rejected >= max_steps:
+            raise RuntimeError(f"Maximum number of steps {max_steps} reached at t={t}")
+        h = min(h, abs(t1 - t))
+        dh = direction * h
+
+        K = [K1]
+        for s in range(1, 7):
+            Ys = _combine(Y, dh, _A[s], K)
+            K.append(f(t + _C[s] * dh, Ys))
+        # last stage is evaluated at solution of 5 order
+        Ynew = Ys
+        error = _error(Y, Ynew, _combine([[0.0] * len(y) for y in Y], dh, _E, K), rtol, atol)
+
+        if error <= 1:
+            t = t1 if h == abs(t1 - t) else t + dh
+            Y, K1 = Ynew, K[6]
+            ts.append(t)
+            ys.append([tuple(y) for y in Y])
+            steps += 1
+        else:
+            rejected += 1
+        h *= _factor(error, 4, error > 1)
+    return ts, ys, steps, rejected
+
+
+def _rosenbrock(f: _RHS, t0: float, t1: float, Y: Rows, rtol: float, atol: float,
+                h: Optional[float], max_steps: int, jac: Optional[Callable] = None) -> tuple:
+    """
+    Rosenbrock 2(3) pair of Shampine and Reichelt (ode23s)
+
+    W = I - h d J,  W k1 = F0 + h d T,  W (k2 - k1) = F1 - k1,
+    y_new = y + h k2,  W k3 = F2 - e32 (k2 - F1) - 2 (k1 - F0) + h d T,
+    error = h / 6 (k1 - 2 k2 + k3),  J = df/dy, T = df/dt
+    """
+    J = f.jacobian_function(jac)
+    direction = 1 if t1 >= t0 else -1
+    t = t0
+    F0 = f(t, Y)
+    h = abs(h) if h else _initial_step(Y, F0, t1 - t0)
+    m = len(Y[0])
+    ts, ys = [t], [[tuple(y) for y in Y]]
+    steps = rejected = 0
+    jacobians = None
+    while direction * (t1 - t) > 0:
+        if steps + rejected >= max_steps:
+            raise RuntimeError(f"Maximum number of steps {max_steps} reached at t={t}")
+        h = min(h, abs(t1 - t))
+        dh = direction * h
+        if jacobians is None:
+            jacobians = J(t, Y)
+
+        hd = dh * _D
+        try:
+            lus = [
+                _lu([[(i == j) - hd * rows[i][j] for j in range(m)] for i in range(m)])
+                for rows in jacobians
+            ]
+        except ValueError:
+            rejected += 1
+            h /= 2
+            continue
+        T = [[row[m] * hd for row in rows] for rows in jacobians]
+
+        k1 = [_lu_solve(lu, list(map(add, fy, ty))) for lu, fy, ty in zip(lus, F0, T)]
+        F1 = f(t + dh / 2, _combine(Y, dh, (0.5,), [k1]))
+        k2 = [list(map(add, _lu_solve(lu, list(map(sub, fy, a))), a))
+              for lu, fy, a in zip(lus, F1, k1)]
+        Ynew = _combine(Y, dh, (1,), [k2])
+        F2 = f(t + dh, Ynew)
+        k3 = [
+            _lu_solve(lu, [f2 - _E32 * (b - g1) - 2 * (a - g0) + tj
+                           for f2, b, g1, a, g0, tj in zip(*row)])
+            for lu, *row in zip(lus, F2, k2, F1, k1, F0, T)
+        ]
+        E = [[dh / 6 * (a - 2 * b + c) for a, b, c in zip(*row)] for row in zip(k1, k2, k3)]
+        error = _error(Y, Ynew, E, rtol, atol)
+
+        if error <= 1:
+            t = t1 if h == abs(t1 - t) else t + dh
+            Y, F0 = Ynew, F2
+            jacobians = None
+            ts.append(t)
+            ys.append([tuple(y) for y in Y])
+            steps += 1
+        else:
+            rejected += 1
+        h *= _factor(error, 2, error > 1)
+    return ts, ys, steps, rejected
+
+
+METHODS = {
+    "rk45": _dormand_prince,
+    "dormand-prince": _dormand_prince,
+    "rosenbrock": _rosenbrock,
+    "stiff": _rosenbrock,
+}
+
+
+def solve_ode_batch(f: Union[list[Expression], SymbolicVector, Callable],
+                    t_span: tuple[float, float],
+                    y0: Sequence[Sequence[float]],
+                    t: Optional[Var] = None,
+                    y: Optional[Sequence[Var]] = None,
+                    method: str = "rk45",
+                    rtol: float = 1e-6,
+                    atol: float = 1e-9,
+                    h: Optional[float] = None,
+                    max_steps: int = 100000,
+                    jac: Optional[Callable] = None) -> ODESolution:
+    """
+    Integrate y' = f(t, y) for many initial conditions with common step
+
+    :param f: Expressions of components of f by Vars t and y,
+              or function f(t, y) -> sequence
+    :param t_span: (t0, t1)
+    :param y0: initial states of trajectories
+    :param t: Var of time
+    :param y: Vars of components of state
+    :param method: "rk45" (Dormand–Prince) or "rosenbrock" for stiff systems,
+                   Jacobian of Rosenbrock method is calculated by
+                   Expression.derivative or by jac
+    :param rtol, atol: relative and absolute tolerance of every step
+    :param h: initial step
+    :param jac: function jac(t, y) -> rows of matrix [df/dy | df/dt],
+                needed by Rosenbrock method for f given by function
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method `{method}`")
+    Y = [list(map(float, state)) for state in y0]
+    if not Y:
+        raise ValueError("No initial conditions")
+    rhs = _RHS(f, t, y)
+    t0, t1 = t_span
+    ts, ys, steps, rejected = METHODS[method](
+        rhs, t0, t1, Y, rtol, atol, h, max_steps, jac=jac
+    )
+    return ODESolution(ts, ys, steps, rejected, rhs.evaluations)
+
+
+def solve_ode(f: Union[list[Expression], SymbolicVector, Callable],
+              t_span: tuple[float, float],
+              y0: Sequence[float],
+              t: Optional[Var] = None,
+              y: Optional[Sequence[Var]] = None,
+              method: str = "rk45",
+              rtol: float = 1e-6,
+              atol: float = 1e-9,
+              h: Optional[float] = None,
+              max_steps: int = 100000,
+              jac: Optional[Callable] = None) -> ODESolution:
+    """
+    Integrate y' = f(t, y) from y(t0) = y0 (see solve_ode_batch)
+
+    Usage:
+    >>> sol = solve_ode([-2 * u], (0, 1), [1.0], t=t, y=[u])
+    >>> sol.final
+        (0.1353352832...,)
+    """
+    sol = solve_ode_batch(f, t_span, [y0], t, y, method, rtol, atol, h, max_steps, jac)
+    sol.y = [states[0] for states in sol.y]
+    return sol
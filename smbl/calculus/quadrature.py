@@ -0,0 +1,204 @@
+"""
+Adaptive quadrature methods
+
+Every method returns pair (value, error) where error
+is estimation of absolute error of value
+"""
+import sys
+from heapq import heappush, heappop
+from math import fsum
+from typing import Callable, Sequence
+
+
+# error less than rounding error of value can't be reached
+_ROUNDING = 50 * sys.float_info.epsilon
+
+
+# Kronrod nodes (non-negative half) of 15-point rule,
+# every odd node is node of 7-point Gauss rule
+_XGK = (
+    0.991455371120812639206854697526329,
+    0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926,
+    0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013,
+    0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245,
+    0.000000000000000000000000000000000,
+)
+_WGK = (
+    0.022935322010529224963732008058970,
+    0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518,
+    0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550,
+    0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649,
+    0.209482141084727828012999174891714,
+)
+_WG = (
+    0.129484966168869693270611432679082,
+    0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975,
+    0.417959183673469387755102040816327,
+)
+
+
+def evaluate_many(f: Callable, xs: list[float], vectorized: bool = False) -> Sequence:
+    """
+    Evaluate function in every point of xs
+
+    Function with `batch` method (for example compiled Expression)
+    is evaluated by one batch call. If vectorized is True function
+    is called with whole list of points (for example numpy ufunc),
+    scalar functions are evaluated point by point
+
+    :param f:           function
+    :param xs:          points
+    :param vectorized:  try to call f with list of points
+
+    :return:            values of function
+    """
+    if hasattr(f, "batch"):
+        return f.batch(xs)
+    if vectorized:
+        try:
+            ys = f(xs)
+            if len(ys) == len(xs):
+                return ys
+        except TypeError:
+            pass
+    return list(map(f, xs))
+
+
+def _gk15(f: Callable[[float], float], a: float, b: float) -> tuple[float, float]:
+    """
+    Gauss-Kronrod (7, 15) rule on [a, b]
+
+    :return: Kronrod value and difference with Gauss value
+    """
+    c = (a + b) / 2
+    h = (b - a) / 2
+
+    # all 15 nodes are evaluated at once
+    xs = [c - h * x for x in _XGK[:7]] + [c] + [c + h * x for x in _XGK[6::-1]]
+    ys = evaluate_many(f, xs)
+
+    fc = ys[7]
+    kronrod = [_WGK[7] * fc]
+    gauss = [_WG[3] * fc]
+    for i in range(7):
+        fs = ys[i] + ys[14 - i]
+        kronrod.append(_WGK[i] * fs)
+        if i % 2:
+            gauss.append(_WG[i // 2] * fs)
+
+    k = h * fsum(kronrod)
+    g = h * fsum(gauss)
+    return k, abs(k - g)
+
+
+def gauss_kronrod(f: Callable[[float], float],
+                  segment: tuple[float, float],
+                  tol: float = 1e-10,
+                  limit: int = 500) -> tuple[float, float]:
+    """
+    Adaptive Gauss-Kronrod (7, 15) quadrature
+
+    Subinterval with largest error is bisected until
+    total error is less than tol (tol is not less than
+    rounding error of value, 50 * machine epsilon * |value|)
+
+    :param f:           function
+    :param segment:     segment
+    :param tol:         target absolute error
+    :param limit:       max count of subintervals
+
+    :return:            (integral value, error estimation)
+    """
+    a, b = segment
+    value, error = _gk15(f, a, b)
+    heap = [(-error, a, b, value)]
+
+    while error > max(tol, _ROUNDING * abs(value)) and len(heap) < limit:
+        e, a, b, v = heappop(heap)
+        m = (a + b) / 2
+        lv, le = _gk15(f, a, m)
+        rv, re = _gk15(f, m, b)
+        heappush(heap, (-le, a, m, lv))
+        heappush(heap, (-re, m, b, rv))
+        error += le + re + e
+        value += lv + rv - v
+
+    value = fsum(v for *_, v in heap)
+    error = fsum(-e for e, *_ in heap)
+    return value, error
+
+
+def simpson(f: Callable[[float], float],
+            segment: tuple[float, float],
+            tol: float = 1e-10,
+            depth: int = 50) -> tuple[float, float]:
+    """
+    Adaptive Simpson quadrature with Richardson extrapolation
+
+    Tolerance is not less than rounding error of estimation
+    (50 * machine epsilon * |value|), subinterval is not bisected
+    if its error is on the level of rounding
+
+    :param f:           function
+    :param segment:     segment
+    :param tol:         target absolute error
+    :param depth:       max depth of bisection
+
+    :return:            (integral value, error estimation)
+    """
+    a, b = segment
+    m = (a + b) / 2
+    fa, fm, fb = f(a), f(m), f(b)
+    whole = (b - a) / 6 * (fa + 4 * fm + fb)
+
+    tol = max(tol, _ROUNDING * abs(whole))
+    values, errors = [], []
+    stack = [(a, b, fa, fm, fb, whole, tol, depth)]
+    while stack:
+        a, b, fa, fm, fb, whole, eps, d = stack.pop()
+        m = (a + b) / 2
+        flm, frm = f((a + m) / 2), f((m + b) / 2)
+        left = (m - a) / 6 * (fa + 4 * flm + fm)
+        right = (b - m) / 6 * (fm + 4 * frm + fb)
+        delta = left + right - whole
+
+        if d <= 0 or abs(delta) <= max(15 * eps, _ROUNDING * abs(left + right)):
+            values.append(left + right + delta / 15)
+            errors.append(abs(delta) / 15)
+        else:
+            stack.append((a, m, fa, flm, fm, left, eps / 2, d - 1))
+            stack.append((m, b, fm, frm, fb, right, eps / 2, d - 1))
+
+    return fsum(values), fsum(errors)
+
+
+METHODS = {
+    "gauss-kronrod": gauss_kronrod,
+    "simpson": simpson,
+}
+
+
+def integrate(f: Callable[[float], float],
+              segment: tuple[float, float],
+              method: str = "gauss-kronrod",
+              tol: float = 1e-10) -> tuple[float, float]:
+    """
+    Integrate function on segment by adaptive method
+
+    :param f:           function
+    :param segment:     segment
+    :param method:      name of method from METHODS
+    :param tol:         target absolute error
+
+    :return:            (integral value, error estimation)
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown integration method `{method}`")
+    return METHODS[method](f, segment, tol)
@@ -0,0 +1,402 @@
+"""
+Root finding and minimization of Expressions
+
+Expression and its derivatives are compiled once to one Kernel,
+every iteration is one batch call of Kernel for all starting
+points which are not converged yet
+"""
+from __future__ import annotations
+
+from math import sqrt, sumprod, isfinite
+from typing import Optional, Sequence, Union
+
+from ..var import Var, Expression
+from ..compiler import Kernel, variables
+from ..algebra.vector import Vector
+from ..algebra.matrix import Matrix
+
+
+Point = Union[float, tuple[float, ...]]
+
+
+class SolverResult:
+    """
+    Result of solver for every starting point
+
+    x - solutions (numbers for find_root, tuples otherwise),
+    value - |f(x)| for roots, ||F(x)|| for systems, f(x) for minimize,
+    converged - True if tolerance is reached,
+    iterations - iterations made from every start,
+    evaluations - count of batch calls of Kernels
+    """
+
+    def __init__(self, x: list[Point], value: list[float], converged: list[bool],
+                 iterations: list[int], evaluations: int):
+        self.x = x
+        self.value = value
+        self.converged = converged
+        self.iterations = iterations
+        self.evaluations = evaluations
+
+    @property
+    def stats(self) -> dict:
+        """
+        Summary of convergence
+        """
+        n = len(self.x)
+        converged = [it for it, c in zip(self.iterations, self.converged) if c]
+        return {
+            "starts": n,
+            "converged": len(converged),
+            "rate": len(converged) / n if n else 0.0,
+            "mean_iterations": sum(converged) / len(converged) if converged else None,
+            "max_iterations": max(converged, default=None),
+            "evaluations": self.evaluations,
+        }
+
+    def best(self) -> Point:
+        """
+        Converged solution with least value
+        """
+        candidates = [(v, x) for x, v, c in zip(self.x, self.value, self.converged) if c]
+        if not candidates:
+            raise ValueError("No starting point converged")
+        return min(candidates, key=lambda item: item[0])[1]
+
+    def __repr__(self) -> str:
+        s = self.stats
+        return f"SolverResult(converged={s['converged']}/{s['starts']}, evaluations={s['evaluations']})"
+
+
+class _Batch:
+    """
+    Kernel of Expressions by vars, other Vars are fixed by values
+    """
+
+    def __init__(self, exprs: list[Expression], vars: Sequence[Var], values: dict):
+        self.vars = list(vars)
+        others = sorted(variables(*exprs) - set(self.vars), key=lambda v: v.name)
+        for var in others:
+            if var.name not in values:
+                raise NameError(f"Variable `{var.name}` not given value")
+        self.fixed = [values[var.name] for var in others]
+        self.kernel = Kernel(exprs, self.vars + others)
+        self.evaluations = 0
+
+    def __call__(self, points: list[Sequence[float]]) -> list[Optional[tuple]]:
+        """
+        Return values of Expressions for every point,
+        None for points where evaluation fails
+        """
+        if not points:
+            return []
+        self.evaluations += 1
+        columns = [list(c) for c in zip(*points)]
+        try:
+            return self.kernel.batch(*columns, *self.fixed)
+        except (ArithmeticError, ValueError):
+            # find failed points one by one
+            rows = []
+            for point in points:
+                try:
+                    rows.append(self.kernel(*point, *self.fixed))
+                except (ArithmeticError, ValueError):
+                    rows.append(None)
+            return rows
+
+
+def _to_points(starts, n: int) -> list[list[float]]:
+    points = []
+    for s in starts:
+        point = [s] if isinstance(s, (int, float)) else list(s)
+        if len(point) != n:
+            raise ValueError(f"Starting point {s} has not {n} components")
+        points.append([float(v) for v in point])
+    return points
+
+
+def find_root(expr: Expression,
+              var: Var,
+              starts: Sequence[float],
+              method: str = "newton",
+              tol: float = 1e-12,
+              max_iter: int = 50,
+              **values) -> SolverResult:
+    """
+    Find roots of f(var) = 0 from every starting point
+
+    :param method: "newton" (quadratic convergence)
+                   or "halley" (cubic convergence, uses f'')
+    :param tol: stop when |step| <= tol * (1 + |x|) or f(x) == 0
+    :param values: values of other Vars of Expression
+    """
+    if method not in ("newton", "halley"):
+        raise ValueError(f"Unknown method `{method}`")
+    expr = Expression.to_expression(expr)
+    d1 = expr.derivative(var)
+    exprs = [expr, d1] + ([d1.derivative(var)] if method == "halley" else [])
+    batch = _Batch(exprs, [var], values)
+
+    x = [p[0] for p in _to_points(starts, 1)]
+    n = len(x)
+    value = [float("inf")] * n
+    converged = [False] * n
+    iterations = [0] * n
+    active = list(range(n))
+    for _ in range(max_iter):
+        if not active:
+            break
+        rows = batch([[x[i]] for i in active])
+        next_active = []
+        for i, row in zip(active, rows):
+            if row is None:
+                continue
+            f, df = row[0], row[1]
+            value[i] = abs(f)
+            if f == 0:
+                converged[i] = True
+                continue
+            if df == 0:
+                continue
+            step = f / df
+            if method == "halley":
+                denominator = 2 * df * df - f * row[2]
+                if denominator:
+                    step = 2 * f * df / denominator
+            x[i] -= step
+            iterations[i] += 1
+            if not isfinite(x[i]):
+                continue
+            if abs(step) <= tol * (1 + abs(x[i])):
+                converged[i] = True
+                continue
+            next_active.append(i)
+        active = next_active
+
+    # values at final points
+    done = [i for i in range(n) if converged[i]]
+    for i, row in zip(done, batch([[x[i]] for i in done])):
+        if row is not None:
+            value[i] = abs(row[0])
+    return SolverResult(x, value, converged, iterations, batch.evaluations)
+
+
+def solve_system(exprs: Sequence[Expression],
+                 vars: Sequence[Var],
+                 starts: Sequence[Sequence[float]],
+                 method: str = "damped",
+                 tol: float = 1e-12,
+                 max_iter: int = 100,
+                 **values) -> SolverResult:
+    """
+    Solve system F(vars) = 0 from every starting point
+
+    :param method: "newton" - full Newton steps,
+                   "damped" - Newton steps shortened by backtracking
+                   until ||F|| decreases (converges from far starts)
+    :param tol: stop when ||step|| <= tol * (1 + ||x||) or F(x) == 0
+    """
+    if method not in ("newton", "damped"):
+        raise ValueError(f"Unknown method `{method}`")
+    exprs = [Expression.to_expression(e) for e in exprs]
+    m = len(vars)
+    if len(exprs) != m:
+        raise ValueError(f"{len(exprs)} equations for {m} unknowns")
+    jacobian = [e.derivative(v) for e in exprs for v in vars]
+    batch = _Batch(exprs + jacobian, vars, values)
+    residual = _Batch(exprs, vars, values)
+
+    x = _to_points(starts, m)
+    n = len(x)
+    value = [float("inf")] * n
+    converged = [False] * n
+    iterations = [0] * n
+    active = list(range(n))
+    for _ in range(max_iter):
+        if not active:
+            break
+        rows = batch([x[i] for i in active])
+        steps = {}
+        for i, row in zip(active, rows):
+            if row is None:
+                continue
+            F = row[:m]
+            value[i] = sqrt(sumprod(F, F))
+            if value[i] == 0:
+                converged[i] = True
+                continue
+            J = Matrix([row[m + k * m:m + (k + 1) * m] for k in range(m)])
+            try:
+                dx = J.solve(Vector.from_iterable(-f for f in F)).values
+            except ValueError:
+                continue
+            steps[i] = list(dx)
+
+        if method == "damped":
+            _backtrack(residual, x, steps, value)
+        next_active = []
+        for i, dx in steps.items():
+            x[i] = [a + b for a, b in zip(x[i], dx)]
+            iterations[i] += 1
+            if sqrt(sumprod(dx, dx)) <= tol * (1 + sqrt(sumprod(x[i], x[i]))):
+                converged[i] = True
+            elif all(map(isfinite, x[i])):
+                next_active.append(i)
+        active = next_active
+
+    done = [i for i in range(n) if converged[i]]
+    for i, row in zip(done, residual([x[i] for i in done])):
+        if row is not None:
+            value[i] = sqrt(sumprod(row, row))
+    return SolverResult([tuple(p) for p in x], value, converged, iterations,
+                        batch.evaluations + residual.evaluations)
+
+
+def _backtrack(residual: _Batch, x: list[list[float]], steps: dict[int, list[float]],
+               norms: list[float], halvings: int = 30):
+    """
+    Shorten steps in place until ||F(x + step)|| < (1 - 1e-4 a) ||F(x)||,
+    a is part of full step, trial points of all starts are one batch
+    """
+    pending = dict.fromkeys(steps, 1.0)
+    for _ in range(halvings):
+        if not pending:
+            return
+        trial = list(pending)
+        rows = residual([[a + s * b for a, b in zip(x[i], steps[i])] for i, s in
+                         ((i, pending[i]) for i in trial)])
+        for i, row in zip(trial, rows):
+            a = pending[i]
+            if row is not None and sqrt(sumprod(row, row)) <= (1 - 1e-4 * a) * norms[i]:
+                steps[i] = [a * b for b in steps[i]]
+                del pending[i]
+            else:
+                pending[i] = a / 2
+    # no decrease, take shortest step
+    for i, a in pending.items():
+        steps[i] = [a * b for b in steps[i]]
+
+
+def minimize(expr: Expression,
+             vars: Sequence[Var],
+             starts: Sequence[Sequence[float]],
+             method: str = "lbfgs",
+             tol: float = 1e-8,
+             max_iter: int = 200,
+             memory: int = 10,
+             **values) -> SolverResult:
+    """
+    Find local minima of Expression from every starting point
+
+    :param method: "lbfgs" - limited-memory BFGS,
+                   "gradient" - steepest descent
+    :param tol: stop when max |gradient| <= tol
+    :param memory: count of last steps used by L-BFGS
+    """
+    if method not in ("lbfgs", "gradient"):
+        raise ValueError(f"Unknown method `{method}`")
+    expr = Expression.to_expression(expr)
+    m = len(vars)
+    batch = _Batch([expr] + [expr.derivative(v) for v in vars], vars, values)
+
+    x = _to_points(starts, m)
+    n = len(x)
+    value = [float("inf")] * n
+    converged = [False] * n
+    iterations = [0] * n
+    gradient: list[Optional[list[float]]] = [None] * n
+    history: list[list[tuple]] = [[] for _ in range(n)]
+
+    for i, row in zip(range(n), batch(x)):
+        if row is not None:
+            value[i], gradient[i] = row[0], list(row[1:])
+    active = [i for i in range(n) if gradient[i] is not None]
+
+    for _ in range(max_iter):
+        active = [i for i in active if max(map(abs, gradient[i]), default=0) > tol]
+        for i in range(n):
+            if gradient[i] is not None and max(map(abs, gradient[i]), default=0) <= tol:
+                converged[i] = True
+        if not active:
+            break
+
+        directions = {}
+        for i in active:
+            d = _direction(gradient[i], history[i]) if method == "lbfgs" else [-g for g in gradient[i]]
+            if sumprod(d, gradient[i]) >= 0:
+                # not descent direction, restart
+                history[i].clear()
+                d = [-g for g in gradient[i]]
+            if not history[i]:
+                scale = 1 / max(1.0, sqrt(sumprod(d, d)))
+                d = [scale * v for v in d]
+            directions[i] = d
+
+        accepted = _armijo(batch, x, directions, value, gradient)
+        next_active = []
+        for i in active:
+            if i not in accepted:
+                continue
+            new_x, new_value, new_gradient = accepted[i]
+            s = [a - b for a, b in zip(new_x, x[i])]
+            y = [a - b for a, b in zip(new_gradient, gradient[i])]
+            sy = sumprod(s, y)
+            if sy > 1e-12:
+                history[i].append((s, y, 1 / sy))
+                if len(history[i]) > memory:
+                    history[i].pop(0)
+            x[i], value[i], gradient[i] = new_x, new_value, new_gradient
+            iterations[i] += 1
+            next_active.append(i)
+        active = next_active
+
+    for i in range(n):
+        if gradient[i] is not None and max(map(abs, gradient[i]), default=0) <= tol:
+            converged[i] = True
+    return SolverResult([tuple(p) for p in x], value, converged, iterations, batch.evaluations)
+
+
+def _direction(g: list[float], history: list[tuple]) -> list[float]:
+    """
+    L-BFGS two-loop recursion, return -H g
+    """
+    q = list(g)
+    alphas = []
+    for s, y, rho in reversed(history):
+        a = rho * sumprod(s, q)
+        alphas.append(a)
+        q = [qi - a * yi for qi, yi in zip(q, y)]
+    if history:
+        s, y, _ = history[-1]
+        gamma = sumprod(s, y) / sumprod(y, y)
+        q = [gamma * qi for qi in q]
+    for (s, y, rho), a in zip(history, reversed(alphas)):
+        b = rho * sumprod(y, q)
+        q = [qi + (a - b) * si for qi, si in zip(q, s)]
+    return [-qi for qi in q]
+
+
+def _armijo(batch: _Batch, x: list[list[float]], directions: dict[int, list[float]],
+            value: list[float], gradient: list[list[float]], halvings: int = 40) -> dict:
+    """
+    Backtracking line search f(x + a d) <= f(x) + 1e-4 a g d,
+    trial points of all starts are one batch
+
+    :return: {start: (new x, new value, new gradient)} of accepted steps
+    """
+    pending = dict.fromkeys(directions, 1.0)
+    accepted = {}
+    for _ in range(halvings):
+        if not pending:
+            break
+        trial = list(pending)
+        points = [[a + pending[i] * d for a, d in zip(x[i], directions[i])] for i in trial]
+        for i, point, row in zip(trial, points, batch(points)):
+            a = pending[i]
+            slope = sumprod(gradient[i], directions[i])
+            if row is not None and isfinite(row[0]) and row[0] <= value[i] + 1e-4 * a * slope:
+                accepted[i] = (point, row[0], list(row[1:]))
+                del pending[i]
+            else:
+                pending[i] = a / 2
+    return accepted
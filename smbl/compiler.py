@@ -0,0 +1,290 @@
+"""
+This module compiles Expressions to python functions
+
+Expression tree is walked once, equal subtrees are computed once
+and result is python function without tree walking and without
+validation of Var domains on every call
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from itertools import repeat
+from typing import Any, Callable, Optional, Union
+
+from .operation import Operation, OpVar, OpConst
+from .operation import Add, Sub, Mul, Div, FloorDiv, Mod, Pow
+from .var import Var, Constant, Expression
+
+
+# Python code templates of default operations, every operation of table
+# can be template string or python function to call with operands
+OPERATIONS = {
+    Add: "{0} + {1}",
+    Sub: "{0} - {1}",
+    Mul: "{0} * {1}",
+    Div: "{0} / {1}",
+    FloorDiv: "{0} // {1}",
+    Mod: "{0} % {1}",
+    Pow: "{0} ** {1}",
+}
+
+
+def variables(*exprs: Expression) -> set[Var]:
+    """
+    Return Vars which are really used in Expressions
+
+    NOTE: Expression.vars can also contain Vars replaced by substitude
+    """
+    vars = set()
+    stack = list(exprs)
+    visited = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in visited:
+            continue
+        visited.add(id(node))
+        if isinstance(node, Var):
+            vars.add(node)
+        elif isinstance(node, Expression):
+            stack.extend(node._operands)
+    return vars
+
+
+class Compiler:
+    """
+    Translate Expressions to lines of python code
+
+    Every unique subtree is assigned to temporary variable once,
+    Vars are replaced by function arguments
+    """
+
+    def __init__(self,
+                 vars: list[Var],
+                 operations: Optional[dict[Union[Operation, Callable], Union[str, Callable]]] = None):
+        """
+        :param vars: Vars in order of function arguments
+        :param operations: table to override code of operations and functions
+        """
+        self.args = {var: f"_a{i}" for i, var in enumerate(vars)}
+        self.operations = OPERATIONS | (operations or {})
+        self.namespace = {}
+        self.lines = []
+        self._names = {}    # key of subtree -> name of value
+        self._nodes = {}    # id of node -> (node, key, name)
+
+    def bind(self, obj: Any, prefix: str = "_o") -> str:
+        """
+        Put object to namespace of compiled code
+
+        :return: name of object in code
+        """
+        key = ("obj", id(obj))
+        if key not in self._names:
+            name = f"{prefix}{len(self.namespace)}"
+            self.namespace[name] = obj
+            self._names[key] = name
+        return self._names[key]
+
+    def _const(self, value: Any) -> tuple[tuple, str]:
+        key = ("const", type(value), value)
+        if key not in self._names:
+            name = f"_c{len(self.namespace)}"
+            self.namespace[name] = value
+            self._names[key] = name
+        return key, self._names[key]
+
+    def _code(self, operation: Union[Operation, Callable], args: list[str]) -> str:
+        impl = self.operations.get(operation, operation)
+        if impl is operation and isinstance(operation, Operation):
+            impl = operation._operation
+        if isinstance(impl, str):
+            return impl.format(*args)
+        return f"{self.bind(impl)}({', '.join(args)})"
+
+    def visit(self, node: Any) -> tuple[tuple, str]:
+        """
+        Emit code for node
+
+        :return: (structural key of node, name of value in code)
+        """
+        if id(node) in self._nodes:
+            return self._nodes[id(node)][1:]
+
+        if isinstance(node, Var):
+            if node not in self.args:
+                raise NameError(f"Variable `{node.name}` not given value")
+            result = ("var", node), self.args[node]
+        elif isinstance(node, Constant):
+            result = self._const(node())
+        elif isinstance(node, (int, float, complex)):
+            result = self._const(node)
+        elif isinstance(node, Expression):
+            operation = node._operation
+            if operation is OpVar or operation is OpConst:
+                result = self.visit(node._operands[0])
+            else:
+                children = [self.visit(op) for op in node._operands]
+                key = (id(operation), *(k for k, _ in children))
+                if key not in self._names:
+                    # operation is kept in namespace, so its id is not reused
+                    self.bind(operation)
+                    name = f"_t{len(self.lines)}"
+                    code = self._code(operation, [n for _, n in children])
+                    self.lines.append(f"{name} = {code}")
+                    self._names[key] = name
+                result = key, self._names[key]
+        else:
+            raise TypeError(f"{type(node)} not valid type of operand")
+
+        self._nodes[id(node)] = (node, *result)
+        return result
+
+    def source(self, exprs: list[Any], single: bool = True) -> str:
+        """
+        Return source of functions:
+            _kernel(*values) -> value
+            _batch(*columns) -> list of values
+        """
+        results = [self.visit(e)[1] for e in exprs]
+        result = results[0] if single else f"({', '.join(results)},)"
+
+        args = ", ".join(self.args.values())
+        columns = ", ".join(f"_col{i}" for i in range(len(self.args)))
+        if not self.args:
+            loop = "for _ in range(1):"
+        elif len(self.args) == 1:
+            loop = f"for {args} in _col0:"
+        else:
+            loop = f"for {args} in zip({columns}):"
+
+        body = [f"    {line}" for line in self.lines]
+        batch_body = [f"        {line}" for line in self.lines]
+        return "\n".join([
+            f"def _kernel({args}):",
+            *body,
+            f"    return {result}",
+            "",
+            f"def _batch({columns}):",
+            "    _out = []",
+            "    _append = _out.append",
+            f"    {loop}",
+            *batch_body,
+            f"        _append({result})",
+            "    return _out",
+        ])
+
+
+class Kernel:
+    """
+    Compiled Expression (or list of Expressions)
+
+    Usage:
+    >>> k = Kernel(x * y + x, [x, y])
+    >>> k(2, 3)                 # values in order of vars
+        8
+    >>> k.evaluate(x=2, y=3)    # values by names of vars
+        8
+    >>> k.batch([1, 2], [3, 3]) # values for every row of columns
+        [4, 8]
+    """
+
+    def __init__(self,
+                 exprs: Union[Expression, list[Expression]],
+                 vars: list[Var],
+                 operations: Optional[dict] = None):
+        """
+        :param exprs: Expression or list of Expressions (kernel returns tuple)
+        :param vars: Vars in order of arguments
+        :param operations: table to override code of operations (see OPERATIONS)
+        """
+        single = not isinstance(exprs, (list, tuple))
+        if single:
+            exprs = [exprs]
+
+        self.vars = tuple(vars)
+        self.exprs = [Expression.to_expression(e) for e in exprs]
+        self._single = single
+        self._operations = operations
+        self._compile()
+
+    def _compile(self):
+        compiler = Compiler(self.vars, self._operations)
+        self.source = compiler.source(self.exprs, self._single)
+        namespace = compiler.namespace
+        exec(compile(self.source, "<smbl kernel>", "exec"), namespace)
+        self._kernel = namespace["_kernel"]
+        self._batch = namespace["_batch"]
+
+    def __getstate__(self) -> dict:
+        # generated functions can't be pickled, they are compiled again
+        return {"exprs": self.exprs, "vars": self.vars,
+                "single": self._single, "operations": self._operations}
+
+    def __setstate__(self, state: dict):
+        self.exprs = state["exprs"]
+        self.vars = state["vars"]
+        self._single = state["single"]
+        self._operations = state["operations"]
+        self._compile()
+
+    def __call__(self, *values) -> Any:
+        return self._kernel(*values)
+
+    def evaluate(self, **values) -> Any:
+        """
+        Calculate value with Vars values given by names
+        """
+        args = []
+        for var in self.vars:
+            if var.name not in values:
+                raise NameError(f"Variable `{var.name}` not given value")
+            args.append(values[var.name])
+        return self._kernel(*args)
+
+    def batch(self, *columns, validate: bool = False) -> list:
+        """
+        Calculate values for every row of columns
+
+        Scalar argument is used for every row
+
+        :param validate: check values are in domains of Vars
+                         (one vectorized check for every column)
+        """
+        if len(columns) != len(self.vars):
+            raise TypeError(f"Kernel takes {len(self.vars)} columns, {len(columns)} given")
+        if not columns:
+            return [self._kernel()]
+
+        iterables = [isinstance(c, Iterable) for c in columns]
+        if validate:
+            columns = [list(c) if it and not hasattr(c, "__getitem__") else c
+                       for c, it in zip(columns, iterables)]
+            for var, column, it in zip(self.vars, columns, iterables):
+                if it:
+                    var.validate_many(column)
+                elif column not in var.domain:
+                    raise ValueError(f"({column}) not in {var.domain}")
+        if not any(iterables):
+            return [self._kernel(*columns)]
+        columns = [c if it else repeat(c) for c, it in zip(columns, iterables)]
+        return self._batch(*columns)
+
+    def __repr__(self) -> str:
+        vars = ", ".join(v.name for v in self.vars)
+        return f"Kernel(vars=({vars}), size={self.source.count(chr(10))})"
+
+
+def compile_expression(expr: Union[Expression, list[Expression]],
+                       vars: Optional[list[Var]] = None,
+                       operations: Optional[dict] = None) -> Kernel:
+    """
+    Compile Expression to Kernel
+
+    :param expr: Expression or list of Expressions
+    :param vars: Vars in order of kernel arguments (default: used Vars sorted by name)
+    :param operations: table to override code of operations (see OPERATIONS)
+    """
+    if vars is None:
+        exprs = expr if isinstance(expr, (list, tuple)) else [expr]
+        vars = sorted(variables(*exprs), key=lambda v: v.name)
+    return Kernel(expr, vars, operations)
@@ -1,13 +1,20 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from array import array
+from math import isqrt
+from typing import Any, Iterable, Optional, Sequence
+
+from .operation import Add, Sub, Mul, Div, FloorDiv, Mod, Pow
 
 
 class Domain(ABC):
-    # TODO: Implement operation override in some domains
     """
     Domain class
     """
 
+    # Domain can override code of operations for compiled
+    # Expressions (see smbl.compiler.OPERATIONS)
+    operations = None
+
     @abstractmethod
     def __in_domain__(self, value: Any) -> bool:
         """
@@ -23,11 +30,165 @@ class Domain(ABC):
     def __contains__(self, item) -> bool:
         return self.__in_domain__(item)
 
+    def contains_many(self, values: Iterable) -> list[bool]:
+        """
+        Check every value in Domain
+
+        :param values: values to check
+        :return: mask, True for values in Domain
+        """
+        return [self.__in_domain__(v) for v in values]
+
+    def first_invalid(self, values: Iterable) -> Optional[int]:
+        """
+        Return index of first value not in Domain or None
+        if all values are in Domain
+        """
+        for i, ok in enumerate(self.contains_many(values)):
+            if not ok:
+                return i
+        return None
+
+
+# --- TYPED BUFFERS ---
+
+
+_INTEGER_CODES = set("bBhHiIlLqQnN")
+_FLOAT_CODES = set("efd")
+_DTYPE_KINDS = {"i": "i", "u": "i", "f": "f", "c": "c"}
+
+
+def _sized(values: Iterable) -> Sequence:
+    return values if hasattr(values, "__len__") else list(values)
+
+
+def _kind(values: Iterable) -> Optional[str]:
+    """
+    Return kind of elements of typed buffer (array.array,
+    memoryview, numpy array or other object with dtype)
+
+    :return: "i" for integers, "f" for floats, "c" for complex,
+             None if elements are any python objects
+    """
+    if isinstance(values, array):
+        code = values.typecode
+    elif isinstance(values, memoryview):
+        code = values.format.lstrip("@=<>!")
+    elif hasattr(values, "dtype"):
+        return _DTYPE_KINDS.get(getattr(values.dtype, "kind", None))
+    else:
+        return None
+
+    if code in _INTEGER_CODES:
+        return "i"
+    if code in _FLOAT_CODES:
+        return "f"
+    return None
+
+
+# --- PRIMES ---
+
+
+class _PrimeSieve:
+    """
+    Sieve of Eratosthenes which grows when it needed
+    """
+
+    LIMIT = 2**24
+
+    def __init__(self):
+        self._sieve = bytearray(b"\x00\x00\x01\x01")
+
+    def __len__(self) -> int:
+        return len(self._sieve)
+
+    def grow(self, n: int):
+        """
+        Grow sieve to contain n (at least twice)
+        """
+        if n < len(self._sieve):
+            return
+        size = min(max(n + 1, 2 * len(self._sieve)), self.LIMIT)
+        sieve = bytearray(b"\x01") * size
+        sieve[0] = sieve[1] = 0
+        for i in range(2, isqrt(size - 1) + 1):
+            if sieve[i]:
+                sieve[i * i::i] = bytes(len(range(i * i, size, i)))
+        self._sieve = sieve
+
+    def __getitem__(self, n: int) -> int:
+        return self._sieve[n]
+
+
+_sieve = _PrimeSieve()
+
+# Miller–Rabin with these bases is deterministic for n < 3.3 * 10^24
+_MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def _miller_rabin(n: int) -> bool:
+    """
+    Miller–Rabin test for odd n > 41
+    """
+    for p in _MR_BASES:
+        if n % p == 0:
+            return False
+
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for a in _MR_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def is_prime(value: int) -> bool:
+    """
+    Check natural number is prime
+
+    Values less than _PrimeSieve.LIMIT are checked by sieve,
+    greater by Miller–Rabin (deterministic for 64-bit values
+    and values less than 3.3 * 10^24)
+    """
+    if value < 2:
+        return False
+    if value < _PrimeSieve.LIMIT:
+        _sieve.grow(value)
+        return bool(_sieve[value])
+    if value % 2 == 0:
+        return False
+    return _miller_rabin(value)
+
 
 # --- DEFAULT DOMAINS ---
 
 
-class DefaultDomain(Domain):
+class SingletonDomain(Domain):
+    """
+    Domain without parameters, every such domain class
+    has only one instance, so checks like `value in IntegerDomain()`
+    don't create new objects
+    """
+
+    def __new__(cls):
+        instance = cls.__dict__.get("_instance")
+        if instance is None:
+            instance = super().__new__(cls)
+            cls._instance = instance
+        return instance
+
+
+class DefaultDomain(SingletonDomain):
     """
     Default domain which alway return True
     """
@@ -35,8 +196,11 @@ class DefaultDomain(Domain):
     def __in_domain__(self, _) -> bool:
         return True
 
+    def contains_many(self, values: Iterable) -> list[bool]:
+        return [True] * len(_sized(values))
+
 
-class IntegerDomain(Domain):
+class IntegerDomain(SingletonDomain):
     """
     Domain for integer numbers
 
@@ -46,8 +210,15 @@ class IntegerDomain(Domain):
     def __in_domain__(self, value: int) -> bool:
         return isinstance(value, int)
 
+    def contains_many(self, values: Iterable) -> list[bool]:
+        values = _sized(values)
+        kind = _kind(values)
+        if kind is not None:
+            return [kind == "i"] * len(values)
+        return [isinstance(v, int) for v in values]
 
-class EvenDomain(Domain):
+
+class EvenDomain(SingletonDomain):
     """
     Domain for even numbers
     """
@@ -55,8 +226,17 @@ class EvenDomain(Domain):
     def __in_domain__(self, value: int) -> bool:
         return value in IntegerDomain() and value % 2 == 0
 
+    def contains_many(self, values: Iterable) -> list[bool]:
+        values = _sized(values)
+        kind = _kind(values)
+        if kind == "i":
+            return [v % 2 == 0 for v in values]
+        if kind is not None:
+            return [False] * len(values)
+        return super().contains_many(values)
+
 
-class OddDomain(Domain):
+class OddDomain(SingletonDomain):
     """
     Domain for odd numbers
     """
@@ -64,8 +244,17 @@ class OddDomain(Domain):
     def __in_domain__(self, value: int) -> bool:
         return value in IntegerDomain() and value % 2 != 0
 
+    def contains_many(self, values: Iterable) -> list[bool]:
+        values = _sized(values)
+        kind = _kind(values)
+        if kind == "i":
+            return [v % 2 != 0 for v in values]
+        if kind is not None:
+            return [False] * len(values)
+        return super().contains_many(values)
+
 
-class NaturalDomain(Domain):
+class NaturalDomain(SingletonDomain):
     """
     Domain for natural numbers
 
@@ -75,8 +264,17 @@ class NaturalDomain(Domain):
     def __in_domain__(self, value: int) -> bool:
         return value in IntegerDomain() and value >= 0
 
+    def contains_many(self, values: Iterable) -> list[bool]:
+        values = _sized(values)
+        kind = _kind(values)
+        if kind == "i":
+            return [v >= 0 for v in values]
+        if kind is not None:
+            return [False] * len(values)
+        return super().contains_many(values)
 
-class PrimeDomain(Domain):
+
+class PrimeDomain(SingletonDomain):
     """
     Domain for only positive prime numbers
 
@@ -87,26 +285,36 @@ class PrimeDomain(Domain):
         """
         Check natural number is prime
         """
-        if value < 2:
-            return False
-        if value == 2:
-            return True
-
-        if value in EvenDomain():
-            return False
-
-        i = 3
-        while i * i < value:
-            if value % i == 0:
-                return False
-            i += 2
-        return True
+        return is_prime(value)
 
     def __in_domain__(self, value: int) -> bool:
-        return value in NaturalDomain() and self.__is_prime__(value)
+        return isinstance(value, int) and value >= 0 and is_prime(value)
 
-
-class IntegerPrimeDomain(Domain):
+    def contains_many(self, values: Iterable) -> list[bool]:
+        """
+        Check every value is prime, sieve is grown once
+        for all small values
+        """
+        values = _sized(values)
+        kind = _kind(values)
+        if kind == "i":
+            values = [int(v) for v in values]
+        elif kind is not None:
+            return [False] * len(values)
+
+        small = [v for v in values if isinstance(v, int) and 0 <= v < _PrimeSieve.LIMIT]
+        if small:
+            _sieve.grow(max(small))
+
+        sieve = _sieve._sieve
+        size = len(sieve)
+        return [
+            isinstance(v, int) and v >= 0 and (sieve[v] == 1 if v < size else is_prime(v))
+            for v in values
+        ]
+
+
+class IntegerPrimeDomain(SingletonDomain):
     """
     Domain for positive and negative prime numbers
 
@@ -114,10 +322,19 @@ class IntegerPrimeDomain(Domain):
     """
 
     def __in_domain__(self, value: int) -> bool:
-        return abs(value) in PrimeDomain()
+        return value in IntegerDomain() and abs(value) in PrimeDomain()
 
+    def contains_many(self, values: Iterable) -> list[bool]:
+        values = _sized(values)
+        kind = _kind(values)
+        if kind == "i":
+            values = [int(v) for v in values]
+        elif kind is not None:
+            return [False] * len(values)
+        return PrimeDomain().contains_many([abs(v) if isinstance(v, int) else v for v in values])
 
-class RealDomain(Domain):
+
+class RealDomain(SingletonDomain):
     """
     Domain for real numbers
 
@@ -127,8 +344,15 @@ class RealDomain(Domain):
     def __in_domain__(self, value: float | int) -> bool:
         return isinstance(value, float) or value in IntegerDomain()
 
+    def contains_many(self, values: Iterable) -> list[bool]:
+        values = _sized(values)
+        kind = _kind(values)
+        if kind is not None:
+            return [kind in "if"] * len(values)
+        return [isinstance(v, (float, int)) for v in values]
+
 
-class ComplexDomain(Domain):
+class ComplexDomain(SingletonDomain):
     """
     Domain for complex numbers
 
@@ -138,6 +362,12 @@ class ComplexDomain(Domain):
     def __in_domain__(self, value: float | int | complex) -> bool:
         return value in RealDomain() or isinstance(value, complex)
 
+    def contains_many(self, values: Iterable) -> list[bool]:
+        values = _sized(values)
+        if _kind(values) is not None:
+            return [True] * len(values)
+        return [isinstance(v, (float, int, complex)) for v in values]
+
 
 # --- DEFAULT DOMAINS ---
 
@@ -158,12 +388,124 @@ class Zn(Domain):
             raise TypeError(f"Cannot implement Ring by modulo: `{type(n).__name__}`")
         self._modulo = n
 
-    def add(self, var1, var2):
-        return (var1.value + var2.value) % self._modulo
+    @property
+    def modulo(self) -> int:
+        return self._modulo
+
+    @property
+    def operations(self) -> dict:
+        """
+        Code of operations for compiler, result of every
+        operation is reduced by modulo, division is product by
+        modular inverse. FloorDiv is not defined in ring (see compile)
+        """
+        n = self._modulo
+        return {
+            Add: f"({{0}} + {{1}}) % {n}",
+            Sub: f"({{0}} - {{1}}) % {n}",
+            Mul: f"{{0}} * {{1}} % {n}",
+            Div: self.div,
+            Mod: f"{{0}} % {{1}} % {n}",
+            Pow: self.pow,
+        }
+
+    @staticmethod
+    def _value(x) -> int:
+        # Var or value
+        return getattr(x, "value", x)
+
+    def add(self, var1, var2) -> int:
+        return (self._value(var1) + self._value(var2)) % self._modulo
+
+    def sub(self, var1, var2) -> int:
+        return (self._value(var1) - self._value(var2)) % self._modulo
+
+    def mul(self, var1, var2) -> int:
+        return self._value(var1) * self._value(var2) % self._modulo
+
+    def pow(self, var, power: int) -> int:
+        power = self._value(power)
+        if power < 0:
+            return pow(self.inverse(var), -power, self._modulo)
+        return pow(self._value(var), power, self._modulo)
+
+    def inverse(self, var) -> int:
+        """
+        Return modular inverse
+
+        :raise ZeroDivisionError: if value is not invertible
+        """
+        try:
+            return pow(self._value(var), -1, self._modulo)
+        except ValueError:
+            raise ZeroDivisionError(f"({self._value(var)}) is not invertible in {self}")
+
+    def div(self, var1, var2) -> int:
+        return self._value(var1) * self.inverse(var2) % self._modulo
+
+    def _prepare(self, expr):
+        """
+        Replace exponents by functions which calculate them
+        as plain integers (exponent is not element of ring),
+        FloorDiv raises TypeError
+        """
+        from .compiler import compile_expression, variables
+        from .operation import OpVar, OpConst
+        from .var import Expression
+
+        def plain(node):
+            if not isinstance(node, Expression) or node._operation in (OpVar, OpConst):
+                return node
+            vars = sorted(variables(node), key=lambda v: v.name)
+            return Expression(compile_expression(node, vars), set(vars), vars)
+
+        def visit(node):
+            if not isinstance(node, Expression) or node._operation in (OpVar, OpConst):
+                return node
+            if node._operation is FloorDiv:
+                raise TypeError(f"Operation `//` is not defined in {self}, use `/`")
+            if node._operation is Pow:
+                operands = [visit(node._operands[0]), plain(node._operands[1])]
+            else:
+                operands = [visit(op) for op in node._operands]
+            return Expression(node._operation, node.vars, operands)
+
+        return visit(Expression.to_expression(expr))
+
+    def compile(self, expr, *vars):
+        """
+        Compile Expression to Kernel which calculates value in ring,
+        every operation is reduced by modulo, division is product
+        by modular inverse. Exponents are calculated as integers
+        without modulo. Kernel.batch evaluates many residues at once
+
+        Usage:
+        >>> f = Zp(7).compile(x ** 3 / y, x, y)
+        >>> f(3, 2)
+            3
+
+        :raise TypeError: if Expression contains `//`
+        """
+        from .compiler import compile_expression
+
+        expr = self._prepare(expr) % self._modulo
+        return compile_expression(expr, list(vars) if vars else None, self.operations)
+
+    def evaluate(self, expr, **values) -> int:
+        """
+        Calculate value of Expression in ring
+        """
+        return self.compile(expr).evaluate(**values)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._modulo})"
 
     def __in_domain__(self, value: int) -> bool:
         return value in IntegerDomain()
 
+    def contains_many(self, values: Iterable) -> list[bool]:
+        return IntegerDomain().contains_many(values)
+
 
 class Zp(Zn):
     """
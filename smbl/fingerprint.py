@@ -0,0 +1,337 @@
+"""
+This module implements probabilistic equivalence of Expressions
+
+Expressions are evaluated at random points, equal Expressions have
+equal values everywhere, different rational Expressions have equal
+values at random point of large prime field with probability at
+most degree / p (Schwartz–Zippel lemma). Values at fixed points are
+fingerprint of Expression, so corpus is deduplicated by one hash table
+
+Expressions which can't be evaluated modulo p (floats, callables,
+% and //, integers or exponents not less than p) are evaluated over
+floats and compared with tolerance
+"""
+from __future__ import annotations
+
+import random
+from fractions import Fraction
+from math import floor, isclose, log10
+from typing import Any, Iterable, Optional, Union
+
+from .var import Var, Expression
+from .compiler import Kernel, variables
+
+
+# Mersenne prime 2^61 - 1
+MODULUS = 2 ** 61 - 1
+
+
+class ModInt:
+    """
+    Integer modulo prime p
+
+    Usage:
+    >>> ModInt(3, 7) / 2
+        ModInt(5, 7)
+
+    Only integers and fractions less than p by absolute value
+    are converted to ModInt, operation with float, large integer
+    or exponent of ModInt type (or not less than p - 1) raises TypeError,
+    because result modulo p is not image of result over integers
+    """
+
+    __slots__ = ("value", "p")
+
+    def __init__(self, value: int, p: int = MODULUS):
+        self.value = value % p
+        self.p = p
+
+    def _convert(self, other: Any) -> Union[ModInt, Any]:
+        if isinstance(other, ModInt):
+            if other.p != self.p:
+                raise ValueError(f"Different moduli {self.p} and {other.p}")
+            return other
+        if isinstance(other, float) and other.is_integer():
+            other = int(other)
+        if isinstance(other, int):
+            if abs(other) >= self.p:
+                return NotImplemented
+            return ModInt(other, self.p)
+        if isinstance(other, Fraction):
+            if abs(other.numerator) >= self.p or other.denominator >= self.p:
+                return NotImplemented
+            return ModInt(other.numerator, self.p) / ModInt(other.denominator, self.p)
+        return NotImplemented
+
+    def inverse(self) -> ModInt:
+        if self.value == 0:
+            raise ZeroDivisionError("ModInt division by zero")
+        return ModInt(pow(self.value, -1, self.p), self.p)
+
+    def __add__(self, other):
+        other = self._convert(other)
+        if other is NotImplemented:
+            return other
+        return ModInt(self.value + other.value, self.p)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = self._convert(other)
+        if other is NotImplemented:
+            return other
+        return ModInt(self.value - other.value, self.p)
+
+    def __rsub__(self, other):
+        other = self._convert(other)
+        if other is NotImplemented:
+            return other
+        return ModInt(other.value - self.value, self.p)
+
+    def __mul__(self, other):
+        other = self._convert(other)
+        if other is NotImplemented:
+            return other
+        return ModInt(self.value * other.value, self.p)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = self._convert(other)
+        if other is NotImplemented:
+            return other
+        return self * other.inverse()
+
+    def __rtruediv__(self, other):
+        other = self._convert(other)
+        if other is NotImplemented:
+            return other
+        return other * self.inverse()
+
+    def __pow__(self, other):
+        if isinstance(other, float) and other.is_integer():
+            other = int(other)
+        if not isinstance(other, int) or abs(other) >= self.p - 1:
+            # exponent is not element of field, a^(p-1) = 1
+            return NotImplemented
+        if other < 0:
+            return self.inverse() ** -other
+        return ModInt(pow(self.value, other, self.p), self.p)
+
+    def __neg__(self) -> ModInt:
+        return ModInt(-self.value, self.p)
+
+    def __pos__(self) -> ModInt:
+        return self
+
+    def __eq__(self, other) -> bool:
+        other = self._convert(other) if isinstance(other, (int, Fraction, ModInt)) else NotImplemented
+        if other is NotImplemented:
+            return False
+        return self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __repr__(self) -> str:
+        return f"ModInt({self.value}, {self.p})"
+
+
+def _seeds(vars: Iterable[Var], seed: int) -> dict[Var, str]:
+    """
+    Seed of random points of every Var, seed depends only on name of
+    Var, so fingerprints of different calls are comparable. Different
+    Vars with equal names (from different Scopes) are seeded by identity
+    """
+    names: dict[str, list[Var]] = {}
+    for var in vars:
+        names.setdefault(var.name, []).append(var)
+    seeds = {}
+    for name, same in names.items():
+        for var in same:
+            seeds[var] = f"{seed}:{name}" if len(same) == 1 else f"{seed}:{name}:{id(var)}"
+    return seeds
+
+
+def _points(vars: Iterable[Var], count: int, seeds: dict[Var, str], modular: bool) -> list[list]:
+    """
+    Random points of every Var
+    """
+    columns = []
+    for var in vars:
+        rnd = random.Random(seeds[var])
+        if modular:
+            columns.append([ModInt(rnd.randrange(1, MODULUS)) for _ in range(count)])
+        else:
+            # positive points, so log and sqrt are defined
+            columns.append([rnd.uniform(0.5, 1.5) for _ in range(count)])
+    return columns
+
+
+def _round(value: Any, digits: int) -> Any:
+    """
+    Round float to significant digits for hashing
+    """
+    if isinstance(value, complex):
+        return complex(_round(value.real, digits), _round(value.imag, digits))
+    if not isinstance(value, float) or value != value or value in (float("inf"), float("-inf")):
+        return value
+    if abs(value) < 1e-12:
+        return 0.0
+    return round(value, digits - 1 - floor(log10(abs(value))))
+
+
+def _values(exprs: list[Expression], count: int, seeds: dict[Var, str], modular: bool) -> list[list]:
+    """
+    Values of every Expression at count points by one compiled batch
+    """
+    vars = sorted(variables(*exprs), key=lambda v: v.name)
+    kernel = Kernel(exprs, vars)
+    rows = kernel.batch(*_points(vars, count, seeds, modular)) if vars else [kernel()] * count
+    return [list(column) for column in zip(*rows)]
+
+
+def _modular(value: Any) -> Any:
+    if isinstance(value, ModInt):
+        return value.value
+    if isinstance(value, int) and abs(value) < MODULUS:
+        return value % MODULUS
+    raise TypeError(f"Value {value!r} is not element of Z_p")
+
+
+def _float_values(exprs: list[Expression], count: int, seeds: dict[Var, str]) -> list[Optional[list]]:
+    """
+    Float values of Expressions by one batch, or one by one if some
+    Expression overflows, values of such Expressions are None
+    """
+    try:
+        return _values(exprs, count, seeds, modular=False)
+    except ArithmeticError:
+        if len(exprs) == 1:
+            return [None]
+    return [_float_values([e], count, seeds)[0] for e in exprs]
+
+
+def _fingerprints(exprs: list[Expression], points: int, digits: int, seeds: dict[Var, str]) -> list[tuple]:
+    try:
+        columns = _values(exprs, points, seeds, modular=True)
+        return [("mod", tuple(map(_modular, column))) for column in columns]
+    except (TypeError, ValueError, ArithmeticError):
+        pass
+
+    if len(exprs) > 1:
+        # some Expression can't be evaluated modulo p, find it one by one
+        return [f for e in exprs for f in _fingerprints([e], points, digits, seeds)]
+
+    column = _float_values(exprs, points, seeds)[0]
+    if column is None:
+        # can't be compared, fingerprint is unique
+        return [("overflow", id(exprs[0]))]
+    return [("float", tuple(_round(v, digits) for v in column))]
+
+
+def fingerprints(exprs: Iterable[Expression],
+                 points: int = 3,
+                 digits: int = 9,
+                 seed: int = 0) -> list[tuple]:
+    """
+    Return fingerprints of Expressions
+
+    Fingerprint is ("mod", values modulo p) or ("float", rounded
+    float values) at random points, equal Expressions have equal
+    fingerprints of same kind (Expression which overflows over floats
+    has unique fingerprint ("overflow", id)). All Expressions are compiled to one
+    Kernel, so equal subtrees of corpus are evaluated once
+
+    :param points: count of random points
+    :param digits: significant digits of float values
+    """
+    exprs = [Expression.to_expression(e) for e in exprs]
+    if not exprs:
+        return []
+    return _fingerprints(exprs, points, digits, _seeds(variables(*exprs), seed))
+
+
+def fingerprint(expr: Expression, points: int = 3, digits: int = 9, seed: int = 0) -> tuple:
+    """
+    Return fingerprint of Expression (see fingerprints)
+    """
+    return fingerprints([expr], points, digits, seed)[0]
+
+
+def equivalent(e1: Expression, e2: Expression,
+               points: int = 3,
+               rel_tol: float = 1e-9,
+               abs_tol: float = 1e-12,
+               seed: int = 0) -> bool:
+    """
+    Check Expressions are equal for all values of Vars
+
+    If Expressions are evaluated modulo p, False is always right and
+    True is wrong with probability at most (degree / 2^61)^points,
+    else floats are compared by isclose (Expressions which overflow
+    over floats are not equivalent to other Expressions)
+
+    Usage:
+    >>> equivalent((x + y) * (x - y), x * x - y * y)
+        True
+    """
+    exprs = [Expression.to_expression(e1), Expression.to_expression(e2)]
+    seeds = _seeds(variables(*exprs), seed)
+    f1, f2 = _fingerprints(exprs, points, 9, seeds)
+    if f1[0] == f2[0] == "mod":
+        return f1 == f2
+    v1, v2 = _float_values(exprs, points, seeds)
+    if v1 is None or v2 is None:
+        return False
+    return all(isclose(a, b, rel_tol=rel_tol, abs_tol=abs_tol) for a, b in zip(v1, v2))
+
+
+def equivalence_classes(exprs: Iterable[Expression],
+                        points: int = 3,
+                        digits: int = 9,
+                        seed: int = 0) -> list[list[Expression]]:
+    """
+    Group Expressions by fingerprints in O(total size) time
+
+    If some Expressions can be evaluated only over floats,
+    float fingerprints of other classes are also compared with them
+    (classes which overflow over floats are not merged)
+    """
+    exprs = [Expression.to_expression(e) for e in exprs]
+    if not exprs:
+        return []
+    seeds = _seeds(variables(*exprs), seed)
+    prints = _fingerprints(exprs, points, digits, seeds)
+
+    classes: list[list[Expression]] = []
+    index: dict[tuple, int] = {}
+    for expr, key in zip(exprs, prints):
+        if key not in index:
+            index[key] = len(classes)
+            classes.append([])
+        classes[index[key]].append(expr)
+
+    if any(kind == "float" for kind, _ in prints) and any(kind == "mod" for kind, _ in prints):
+        # merge classes with equal float values, one Kernel for all classes
+        columns = _float_values([group[0] for group in classes], points, seeds)
+        merged: dict[tuple, int] = {}
+        groups: list[list[Expression]] = []
+        for group, column in zip(classes, columns):
+            if column is None:
+                groups.append(group)
+                continue
+            key = tuple(_round(v, digits) for v in column)
+            if key not in merged:
+                merged[key] = len(groups)
+                groups.append([])
+            groups[merged[key]].extend(group)
+        classes = groups
+    return classes
+
+
+def deduplicate(exprs: Iterable[Expression], points: int = 3, digits: int = 9, seed: int = 0) -> list[Expression]:
+    """
+    Return first Expression of every equivalence class in order of input
+    """
+    return [group[0] for group in equivalence_classes(exprs, points, digits, seed)]
@@ -0,0 +1,190 @@
+"""
+This module implements incremental evaluation of Expressions
+
+Value of every node is cached, when some Vars change only nodes
+which depend on them are recomputed, so update of one Var of
+balanced tree costs O(depth) instead of O(size)
+"""
+from __future__ import annotations
+
+from heapq import heappush, heappop
+from typing import Any, Union
+
+from .operation import Operation, OpVar, OpConst
+from .var import Var, Constant, Expression
+
+
+class IncrementalEvaluator:
+    """
+    Stateful evaluator of Expression (or list of Expressions)
+
+    Usage:
+    >>> ev = IncrementalEvaluator(x * y + z, x=1, y=2, z=3)
+    >>> ev.value
+        5
+    >>> ev.update(z=10)     # only z and + are recomputed
+        12
+    >>> ev.recomputed
+        1
+
+    Node is recomputed only if value of some of its operands is
+    changed (values are compared by !=). Var values are checked
+    by domains only when they are given, Vars themselves are not changed
+    """
+
+    def __init__(self, exprs: Union[Expression, list[Expression]], **values):
+        """
+        :param exprs: Expression or list of Expressions (value is tuple)
+        :param values: initial values of all Vars
+        """
+        self._single = not isinstance(exprs, (list, tuple))
+        exprs = [exprs] if self._single else list(exprs)
+
+        # nodes in topological order, operands before node
+        self._operations: list[Any] = []
+        self._operands: list[tuple[int, ...]] = []
+        self._parents: list[list[int]] = []
+        self._values: list[Any] = []
+        self._vars: dict[str, tuple[Var, int]] = {}
+
+        index: dict[int, int] = {}
+        self._roots = [self._build(Expression.to_expression(e), index) for e in exprs]
+        self.recomputed = 0
+        self.evaluate(**values)
+
+    def _node(self, operation: Any, operands: tuple[int, ...], value: Any = None) -> int:
+        i = len(self._values)
+        self._operations.append(operation)
+        self._operands.append(operands)
+        self._parents.append([])
+        self._values.append(value)
+        for j in operands:
+            self._parents[j].append(i)
+        return i
+
+    def _leaf(self, op: Any) -> int:
+        if isinstance(op, Var):
+            if op.name not in self._vars:
+                self._vars[op.name] = (op, self._node(None, ()))
+            return self._vars[op.name][1]
+        if isinstance(op, Constant):
+            return self._node(None, (), op())
+        return self._node(None, (), op)
+
+    def _build(self, root: Expression, index: dict[int, int]) -> int:
+        """
+        Add nodes of Expression (shared subtrees once)
+        without recursion, return index of root
+        """
+        stack = [(root, False)]
+        while stack:
+            node, ready = stack.pop()
+            if id(node) in index:
+                continue
+            if node._operation is OpVar or node._operation is OpConst:
+                index[id(node)] = self._leaf(node._operands[0])
+                continue
+            if not ready:
+                stack.append((node, True))
+                stack.extend((op, False) for op in node._operands if isinstance(op, Expression))
+                continue
+
+            operands = tuple(
+                index[id(op)] if isinstance(op, Expression) else self._leaf(op)
+                for op in node._operands
+            )
+            operation = node._operation
+            if isinstance(operation, Operation):
+                # skip check of operands count on every call
+                operation = operation._operation
+            index[id(node)] = self._node(operation, operands)
+        return index[id(root)]
+
+    @property
+    def vars(self) -> list[Var]:
+        return [var for var, _ in self._vars.values()]
+
+    @property
+    def size(self) -> int:
+        """
+        Count of different nodes
+        """
+        return len(self._values)
+
+    @property
+    def value(self) -> Any:
+        if self._single:
+            return self._values[self._roots[0]]
+        return tuple(self._values[i] for i in self._roots)
+
+    def _check(self, name: str, value: Any) -> int:
+        if name not in self._vars:
+            raise NameError(f"Variable `{name}` not used in Expression")
+        var, i = self._vars[name]
+        if value not in var.domain:
+            raise ValueError(f"({value}) not in {var.domain}")
+        return i
+
+    def evaluate(self, **values) -> Any:
+        """
+        Set values of all Vars and recompute all nodes
+        """
+        for name in self._vars:
+            if name not in values:
+                raise NameError(f"Variable `{name}` not given value")
+        leaves = [(self._check(name, values[name]), values[name]) for name in self._vars]
+
+        for i, value in leaves:
+            self._values[i] = value
+        vals = self._values
+        for i, operation in enumerate(self._operations):
+            if operation is not None:
+                vals[i] = operation(*[vals[j] for j in self._operands[i]])
+        self.recomputed = len(vals) - len(self._vars)
+        return self.value
+
+    def update(self, **values) -> Any:
+        """
+        Change values of some Vars and recompute only nodes
+        depending on changed values
+
+        If some operation raises, all values are restored
+        """
+        leaves = [(self._check(name, value), value) for name, value in values.items()]
+
+        vals = self._values
+        undo = []
+        heap = []
+        scheduled = set()
+        for i, value in leaves:
+            if vals[i] != value or type(vals[i]) is not type(value):
+                undo.append((i, vals[i]))
+                vals[i] = value
+                for p in self._parents[i]:
+                    if p not in scheduled:
+                        scheduled.add(p)
+                        heappush(heap, p)
+
+        recomputed = 0
+        try:
+            while heap:
+                i = heappop(heap)
+                new = self._operations[i](*[vals[j] for j in self._operands[i]])
+                recomputed += 1
+                if new != vals[i] or type(new) is not type(vals[i]):
+                    undo.append((i, vals[i]))
+                    vals[i] = new
+                    for p in self._parents[i]:
+                        if p not in scheduled:
+                            scheduled.add(p)
+                            heappush(heap, p)
+        except Exception:
+            for i, value in reversed(undo):
+                vals[i] = value
+            raise
+        self.recomputed = recomputed
+        return self.value
+
+    def __repr__(self) -> str:
+        vars = ", ".join(self._vars)
+        return f"IncrementalEvaluator(vars=({vars}), size={self.size})"
@@ -0,0 +1,272 @@
+"""
+This module implements interval arithmetic for guaranteed
+bounds of Expressions over boxes of Vars values
+
+Every float bound is rounded outward, so result interval
+always contains all values of Expression
+"""
+from __future__ import annotations
+
+import math
+from math import inf, floor, nextafter, pi
+from typing import Optional, Sequence, Union
+
+from .var import Var, Expression
+from .compiler import Kernel, compile_expression
+
+
+Number = Union[int, float]
+
+
+def _down(x: Number) -> Number:
+    return nextafter(x, -inf) if isinstance(x, float) and math.isfinite(x) else x
+
+
+def _up(x: Number) -> Number:
+    return nextafter(x, inf) if isinstance(x, float) and math.isfinite(x) else x
+
+
+class Interval:
+    """
+    Closed interval [lo, hi] of real numbers
+
+    Usage:
+    >>> Interval(1, 2) * Interval(-1, 3)
+        Interval(-2, 6)
+    """
+
+    __slots__ = ("lo", "hi")
+
+    def __init__(self, lo: Number, hi: Optional[Number] = None):
+        if hi is None:
+            hi = lo
+        if lo > hi:
+            raise ValueError(f"Invalid interval [{lo}, {hi}]")
+        self.lo = lo
+        self.hi = hi
+
+    @staticmethod
+    def to_interval(value: Union[Interval, Number]) -> Interval:
+        if isinstance(value, Interval):
+            return value
+        if isinstance(value, (int, float)):
+            return Interval(value)
+        raise TypeError(f"Invalid type `{type(value).__name__}` to convert to Interval")
+
+    @staticmethod
+    def _rounded(lo: Number, hi: Number) -> Interval:
+        return Interval(_down(lo), _up(hi))
+
+    @property
+    def width(self) -> Number:
+        return self.hi - self.lo
+
+    @property
+    def mid(self) -> float:
+        return (self.lo + self.hi) / 2
+
+    @property
+    def is_point(self) -> bool:
+        return self.lo == self.hi
+
+    def __contains__(self, value: Union[Interval, Number]) -> bool:
+        if isinstance(value, Interval):
+            return self.lo <= value.lo and value.hi <= self.hi
+        return self.lo <= value <= self.hi
+
+    def __add__(self, other) -> Interval:
+        other = Interval.to_interval(other)
+        return self._rounded(self.lo + other.lo, self.hi + other.hi)
+
+    def __sub__(self, other) -> Interval:
+        other = Interval.to_interval(other)
+        return self._rounded(self.lo - other.hi, self.hi - other.lo)
+
+    def __mul__(self, other) -> Interval:
+        other = Interval.to_interval(other)
+        p = (self.lo * other.lo, self.lo * other.hi, self.hi * other.lo, self.hi * other.hi)
+        # 0 * inf is nan, it means 0 for bounds
+        p = [0 if x != x else x for x in p]
+        return self._rounded(min(p), max(p))
+
+    def __truediv__(self, other) -> Interval:
+        other = Interval.to_interval(other)
+        if other.lo <= 0 <= other.hi:
+            if other.lo == other.hi == 0:
+                raise ZeroDivisionError("Division by zero interval")
+            return Interval(-inf, inf)
+        q = (self.lo / other.lo, self.lo / other.hi, self.hi / other.lo, self.hi / other.hi)
+        return self._rounded(min(q), max(q))
+
+    def __floordiv__(self, other) -> Interval:
+        q = self / other
+        return Interval(floor(q.lo) if math.isfinite(q.lo) else q.lo,
+                        floor(q.hi) if math.isfinite(q.hi) else q.hi)
+
+    def __mod__(self, other) -> Interval:
+        other = Interval.to_interval(other)
+        if other.lo > 0:
+            if other.is_point and math.isfinite(self.lo) and math.isfinite(self.hi):
+                m = other.lo
+                k = floor(self.lo / m)
+                if self.hi < (k + 1) * m:
+                    # interval is in one period
+                    return self._rounded(self.lo - k * m, self.hi - k * m)
+            return Interval(0, other.hi)
+        if other.hi < 0:
+            return Interval(other.lo, 0)
+        return Interval(-inf, inf)
+
+    def __pow__(self, other) -> Interval:
+        other = Interval.to_interval(other)
+        if other.is_point and float(other.lo).is_integer():
+            n = int(other.lo)
+            if n < 0:
+                return Interval(1) / self ** -n
+            lo, hi = self.lo ** n, self.hi ** n
+            if n % 2:
+                return self._rounded(lo, hi)
+            if self.lo <= 0 <= self.hi:
+                return self._rounded(0, max(lo, hi))
+            return self._rounded(min(lo, hi), max(lo, hi))
+
+        if self.lo < 0:
+            raise ValueError(f"Power of negative interval {self} by {other} is not real")
+        # x ^ y is monotone by x and y for x > 0, extremes are in corners
+        p = []
+        for x in (self.lo, self.hi):
+            for y in (other.lo, other.hi):
+                p.append(inf if x == 0 and y < 0 else x ** y)
+        return self._rounded(min(p), max(p))
+
+    def __neg__(self) -> Interval:
+        return Interval(-self.hi, -self.lo)
+
+    def __radd__(self, other) -> Interval:
+        return Interval.to_interval(other) + self
+
+    def __rsub__(self, other) -> Interval:
+        return Interval.to_interval(other) - self
+
+    def __rmul__(self, other) -> Interval:
+        return Interval.to_interval(other) * self
+
+    def __rtruediv__(self, other) -> Interval:
+        return Interval.to_interval(other) / self
+
+    def __rfloordiv__(self, other) -> Interval:
+        return Interval.to_interval(other) // self
+
+    def __rmod__(self, other) -> Interval:
+        return Interval.to_interval(other) % self
+
+    def __rpow__(self, other) -> Interval:
+        return Interval.to_interval(other) ** self
+
+    def __eq__(self, other) -> bool:
+        other = Interval.to_interval(other)
+        return self.lo == other.lo and self.hi == other.hi
+
+    def __hash__(self) -> int:
+        return hash((self.lo, self.hi))
+
+    def __repr__(self) -> str:
+        return f"Interval({self.lo}, {self.hi})"
+
+
+# --- FUNCTIONS ---
+
+
+def log(x: Interval) -> Interval:
+    x = Interval.to_interval(x)
+    if x.hi <= 0:
+        raise ValueError(f"Logarithm of non-positive interval {x}")
+    lo = math.log(x.lo) if x.lo > 0 else -inf
+    return Interval(_down(lo), _up(math.log(x.hi)))
+
+
+def exp(x: Interval) -> Interval:
+    x = Interval.to_interval(x)
+    return Interval(max(0.0, _down(math.exp(x.lo))), _up(math.exp(x.hi)))
+
+
+def sqrt(x: Interval) -> Interval:
+    x = Interval.to_interval(x)
+    if x.hi < 0:
+        raise ValueError(f"Square root of negative interval {x}")
+    return Interval(max(0.0, _down(math.sqrt(max(x.lo, 0)))), _up(math.sqrt(x.hi)))
+
+
+def sin(x: Interval) -> Interval:
+    x = Interval.to_interval(x)
+    if not (math.isfinite(x.lo) and math.isfinite(x.hi)) or x.hi - x.lo >= 2 * pi:
+        return Interval(-1.0, 1.0)
+    values = [math.sin(x.lo), math.sin(x.hi)]
+    lo, hi = _down(min(values)), _up(max(values))
+    # extremes of sin are in pi/2 + 2k pi and 3pi/2 + 2k pi
+    k = math.ceil((x.lo - pi / 2) / (2 * pi))
+    if pi / 2 + 2 * k * pi <= x.hi:
+        hi = 1.0
+    k = math.ceil((x.lo - 3 * pi / 2) / (2 * pi))
+    if 3 * pi / 2 + 2 * k * pi <= x.hi:
+        lo = -1.0
+    return Interval(max(lo, -1.0), min(hi, 1.0))
+
+
+def cos(x: Interval) -> Interval:
+    return sin(Interval.to_interval(x) + pi / 2)
+
+
+# Interval versions of functions used in Expressions
+FUNCTIONS = {
+    math.log: log,
+    math.exp: exp,
+    math.sqrt: sqrt,
+    math.sin: sin,
+    math.cos: cos,
+}
+
+
+def compile_interval(expr: Expression, vars: Optional[list[Var]] = None) -> Kernel:
+    """
+    Compile Expression to Kernel which takes Intervals
+    and returns Interval containing all values
+    """
+    return compile_expression(expr, vars, FUNCTIONS)
+
+
+def evaluate_interval(expr: Expression, **bindings) -> Interval:
+    """
+    Return Interval containing all values of Expression
+    when Vars values are in given intervals
+
+    Usage:
+    >>> evaluate_interval(x * x - x, x=Interval(0, 1))
+        Interval(-1, 1)
+    """
+    kernel = compile_interval(expr)
+    return Interval.to_interval(kernel.evaluate(
+        **{name: Interval.to_interval(value) for name, value in bindings.items()}
+    ))
+
+
+def evaluate_boxes(expr: Union[Expression, Kernel],
+                   lo: dict[str, Sequence[Number]],
+                   hi: dict[str, Sequence[Number]]) -> tuple[list[Number], list[Number]]:
+    """
+    Return bounds of Expression over many boxes
+
+    Box i is lo[name][i] <= name <= hi[name][i] for every Var name,
+    columns can be lists, arrays or numpy arrays
+
+    :return: (lower bounds, upper bounds) for every box
+    """
+    kernel = expr if isinstance(expr, Kernel) else compile_interval(expr)
+    columns = []
+    for var in kernel.vars:
+        if var.name not in lo or var.name not in hi:
+            raise NameError(f"Variable `{var.name}` not given value")
+        columns.append([Interval(a, b) for a, b in zip(lo[var.name], hi[var.name])])
+
+    result = [Interval.to_interval(r) for r in kernel.batch(*columns)]
+    return [r.lo for r in result], [r.hi for r in result]
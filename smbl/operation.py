@@ -1,17 +1,39 @@
-from typing import Any, Callable
+from typing import Any, Callable, Optional
+
+
+# name -> registered Operation
+_registry: dict[str, "Operation"] = {}
+
+
+def registered(name: str) -> "Operation":
+    """
+    Return Operation registered with name
+    """
+    try:
+        return _registry[name]
+    except KeyError:
+        raise NameError(f"Operation with name `{name}` not registered") from None
 
 
 class Operation:
-    def __init__(self, symbol: str, operation: Callable, operand_count: int = 2):
+    def __init__(self, symbol: str, operation: Callable, operand_count: int = 2, name: Optional[str] = None):
         """
         :param symbol: symbol of Operation
         :param operation: python function to calculate operation from
                           int, float or complex (or other)
         :param operand_count: operands for operation
+        :param name: unique name to register Operation, registered
+                     Operation is pickled by name, so unpickled Expressions
+                     use the same object (operations are compared by identity)
         """
         self._symbol = symbol
         self._operation = operation
         self._operand_count = operand_count
+        self._name = name
+        if name is not None:
+            if name in _registry:
+                raise ValueError(f"Operation with name `{name}` already registered")
+            _registry[name] = self
 
     def __call__(self, *operands) -> Any:
         if len(operands) < self._operand_count:
@@ -21,6 +43,15 @@ class Operation:
         else:
             return self._operation(*operands)
 
+    @property
+    def name(self) -> Optional[str]:
+        return self._name
+
+    def __reduce__(self):
+        if self._name is not None:
+            return registered, (self._name,)
+        return super().__reduce__()
+
     def __repr__(self) -> str:
         return f'{type(self).__name__}(symbol="{self._symbol}")'
 
@@ -29,27 +60,27 @@ class Operation:
 
 
 class UnaryOperation(Operation):
-    def __init__(self, symbol: str, operation: Callable):
-        super().__init__(symbol, operation, operand_count=1)
+    def __init__(self, symbol: str, operation: Callable, name: Optional[str] = None):
+        super().__init__(symbol, operation, operand_count=1, name=name)
 
 
 class BinaryOperation(Operation):
-    def __init__(self, symbol: str, operation: Callable):
-        super().__init__(symbol, operation, operand_count=2)
+    def __init__(self, symbol: str, operation: Callable, name: Optional[str] = None):
+        super().__init__(symbol, operation, operand_count=2, name=name)
 
 
 # --- DEFAULT OPERATIONS ---
-OpVar = UnaryOperation("VAR", lambda a: a())
-OpConst = UnaryOperation("CONST", lambda a: a())
+OpVar = UnaryOperation("VAR", lambda a: a(), name="OpVar")
+OpConst = UnaryOperation("CONST", lambda a: a(), name="OpConst")
 
 
 # TODO: Make +,-,*,/,//,%,^ operation classes
 
-Add = BinaryOperation("+", lambda a, b: a + b)
-Sub = BinaryOperation("-", lambda a, b: a - b)
-Mul = BinaryOperation("*", lambda a, b: a * b)
-Div = BinaryOperation("/", lambda a, b: a / b)
-FloorDiv = BinaryOperation("//", lambda a, b: a // b)
-Mod = BinaryOperation("%", lambda a, b: a % b)
-Pow = BinaryOperation("^", lambda a, b: a**b)
+Add = BinaryOperation("+", lambda a, b: a + b, name="Add")
+Sub = BinaryOperation("-", lambda a, b: a - b, name="Sub")
+Mul = BinaryOperation("*", lambda a, b: a * b, name="Mul")
+Div = BinaryOperation("/", lambda a, b: a / b, name="Div")
+FloorDiv = BinaryOperation("//", lambda a, b: a // b, name="FloorDiv")
+Mod = BinaryOperation("%", lambda a, b: a % b, name="Mod")
+Pow = BinaryOperation("^", lambda a, b: a**b, name="Pow")
 # --- DEFAULT OPERATIONS ---
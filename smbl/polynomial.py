@@ -0,0 +1,519 @@
+"""
+This module implements sparse multivariate polynomials
+
+Polynomial is dict {exponents: coefficient}, exponents is tuple of
+powers of Vars of polynomial. It is used to expand and collect
+polynomial subtrees of Expressions (see Expression.simplify)
+"""
+from __future__ import annotations
+
+from math import prod
+from operator import mul
+from typing import Any, Iterable, Optional, Union
+
+from .operation import OpVar, OpConst
+from .operation import Add, Sub, Mul, Div, Pow
+from .var import Var, Constant, Expression
+from .scope import Scope
+
+
+Number = Union[int, float, complex]
+
+
+def _sorted(vars: Iterable[Var]) -> tuple[Var, ...]:
+    return tuple(sorted(set(vars), key=lambda v: v.name))
+
+
+class Polynomial:
+    """
+    Sparse multivariate polynomial
+
+    Usage:
+    >>> p = Polynomial.from_expression((x + y) * (x - y))
+    >>> p
+        Polynomial(x^2 - y^2)
+    >>> p.derivative(x)
+        Polynomial(2 * x)
+    >>> p(x=3, y=1)
+        8
+    """
+
+    def __init__(self, terms: dict[tuple[int, ...], Number], vars: Iterable[Var] = ()):
+        """
+        :param terms: {exponents: coefficient}, exponents in order of vars
+        :param vars: Vars of polynomial
+        """
+        self.vars = tuple(vars)
+        self.terms = {e: c for e, c in terms.items() if c != 0}
+        for e in self.terms:
+            if len(e) != len(self.vars):
+                raise ValueError(f"Exponents {e} not match vars {[v.name for v in self.vars]}")
+        self._horner = None
+
+    @classmethod
+    def constant(cls, value: Number, vars: Iterable[Var] = ()) -> Polynomial:
+        vars = tuple(vars)
+        return cls({(0,) * len(vars): value}, vars)
+
+    @classmethod
+    def variable(cls, var: Var, vars: Optional[Iterable[Var]] = None) -> Polynomial:
+        vars = tuple(vars) if vars is not None else (var,)
+        return cls({tuple(int(v is var) for v in vars): 1}, vars)
+
+    @classmethod
+    def from_expression(cls, expr: Union[Expression, Var, Number],
+                        vars: Optional[Iterable[Var]] = None) -> Polynomial:
+        """
+        Expand Expression to Polynomial
+
+        :param vars: Vars of polynomial (default: used Vars sorted by name)
+        :raise ValueError: if Expression is not polynomial
+        """
+        poly = _to_polynomial(Expression.to_expression(expr), {})
+        if poly is None:
+            raise ValueError(f"Expression {expr} is not polynomial")
+        return poly.with_vars(vars) if vars is not None else poly
+
+    def with_vars(self, vars: Iterable[Var]) -> Polynomial:
+        """
+        Return same polynomial with exponents in order of given vars
+        """
+        vars = tuple(vars)
+        if vars == self.vars:
+            return self
+        index = {v: i for i, v in enumerate(vars)}
+        terms = {}
+        for e, c in self.terms.items():
+            new = [0] * len(vars)
+            for v, p in zip(self.vars, e):
+                if not p:
+                    continue
+                if v not in index:
+                    raise ValueError(f"Polynomial depends on `{v.name}`, which is not in vars")
+                new[index[v]] = p
+            terms[tuple(new)] = c
+        return Polynomial(terms, vars)
+
+    def _aligned(self, other: Polynomial) -> tuple[Polynomial, Polynomial]:
+        if self.vars == other.vars:
+            return self, other
+        vars = _sorted(self.vars + other.vars)
+        return self.with_vars(vars), other.with_vars(vars)
+
+    @staticmethod
+    def to_polynomial(value) -> Polynomial:
+        if isinstance(value, Polynomial):
+            return value
+        if isinstance(value, (int, float, complex)):
+            return Polynomial.constant(value)
+        return Polynomial.from_expression(value)
+
+    @property
+    def degree(self) -> int:
+        """
+        Total degree, -1 for zero polynomial
+        """
+        return max((sum(e) for e in self.terms), default=-1)
+
+    @property
+    def is_constant(self) -> bool:
+        return all(not any(e) for e in self.terms)
+
+    @property
+    def constant_term(self) -> Number:
+        return self.terms.get((0,) * len(self.vars), 0)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __add__(self, other) -> Polynomial:
+        a, b = self._aligned(Polynomial.to_polynomial(other))
+        terms = dict(a.terms)
+        for e, c in b.terms.items():
+            terms[e] = terms.get(e, 0) + c
+        return Polynomial(terms, a.vars)
+
+    def __neg__(self) -> Polynomial:
+        return Polynomial({e: -c for e, c in self.terms.items()}, self.vars)
+
+    def __sub__(self, other) -> Polynomial:
+        return self + -Polynomial.to_polynomial(other)
+
+    def __mul__(self, other) -> Polynomial:
+        if isinstance(other, (int, float, complex)):
+            return Polynomial({e: c * other for e, c in self.terms.items()}, self.vars)
+        a, b = self._aligned(Polynomial.to_polynomial(other))
+        if not a.terms or not b.terms:
+            return Polynomial({}, a.vars)
+        n = len(a.vars)
+
+        # Kronecker substitution: exponents are packed to one int,
+        # so product of monomials is addition of ints
+        bounds = [
+            max(e[i] for e in a.terms) + max(e[i] for e in b.terms) + 1
+            for i in range(n)
+        ]
+        weights = [prod(bounds[:i]) for i in range(n)]
+
+        def pack(terms: dict) -> list[tuple[int, Number]]:
+            return [(sum(map(mul, e, weights)), c) for e, c in terms.items()]
+
+        packed_b = pack(b.terms)
+        result: dict[int, Number] = {}
+        get = result.get
+        for ka, ca in pack(a.terms):
+            for kb, cb in packed_b:
+                k = ka + kb
+                result[k] = get(k, 0) + ca * cb
+
+        terms = {}
+        for k, c in result.items():
+            e = []
+            for bound in bounds:
+                k, p = divmod(k, bound)
+                e.append(p)
+            terms[tuple(e)] = c
+        return Polynomial(terms, a.vars)
+
+    def __truediv__(self, other: Number) -> Polynomial:
+        if not isinstance(other, (int, float, complex)):
+            raise TypeError("Polynomial can be divided only by number")
+        return Polynomial({e: c / other for e, c in self.terms.items()}, self.vars)
+
+    def __pow__(self, n: int) -> Polynomial:
+        if not isinstance(n, int) or n < 0:
+            raise ValueError(f"Invalid power {n} of polynomial")
+        result, base = Polynomial.constant(1, self.vars), self
+        while n:
+            if n & 1:
+                result = result * base
+            n >>= 1
+            if n:
+                base = base * base
+        return result
+
+    def __radd__(self, other) -> Polynomial:
+        return self + other
+
+    def __rsub__(self, other) -> Polynomial:
+        return -self + other
+
+    def __rmul__(self, other) -> Polynomial:
+        return self * other
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (int, float, complex)):
+            other = Polynomial.constant(other)
+        if not isinstance(other, Polynomial):
+            return False
+        a, b = self._aligned(other)
+        return a.terms == b.terms
+
+    def derivative(self, var: Var) -> Polynomial:
+        if var not in self.vars:
+            return Polynomial({}, self.vars)
+        i = self.vars.index(var)
+        terms = {}
+        for e, c in self.terms.items():
+            if e[i]:
+                terms[e[:i] + (e[i] - 1,) + e[i + 1:]] = c * e[i]
+        return Polynomial(terms, self.vars)
+
+    # -- EVALUATION --
+
+    @staticmethod
+    def _nested(terms: list[tuple[tuple, Number]], i: int, n: int):
+        """
+        Horner scheme: polynomial by var i is list of (power, polynomial
+        of next vars) by decreasing power, constant for i == n
+        """
+        if i == n:
+            return sum(c for _, c in terms)
+        groups: dict[int, list] = {}
+        for e, c in terms:
+            groups.setdefault(e[i], []).append((e, c))
+        return [(p, Polynomial._nested(groups[p], i + 1, n)) for p in sorted(groups, reverse=True)]
+
+    @property
+    def horner(self):
+        if self._horner is None:
+            self._horner = self._nested(list(self.terms.items()), 0, len(self.vars))
+        return self._horner
+
+    def evaluate(self, *values) -> Number:
+        """
+        Calculate value by Horner scheme, values in order of vars
+        """
+        if len(values) != len(self.vars):
+            raise TypeError(f"Polynomial takes {len(self.vars)} values, {len(values)} given")
+
+        def value(node, i: int):
+            if i == len(values):
+                return node
+            v = values[i]
+            result, last = 0, None
+            for p, sub in node:
+                if last is not None:
+                    result *= v ** (last - p)
+                result += value(sub, i + 1)
+                last = p
+            return result * v ** last if last else result
+
+        return value(self.horner, 0)
+
+    def __call__(self, **values) -> Number:
+        args = []
+        for var in self.vars:
+            if var.name not in values:
+                raise NameError(f"Variable `{var.name}` not given value")
+            args.append(values[var.name])
+        return self.evaluate(*args)
+
+    # -- CONVERSION --
+
+    def _monomial(self, e: tuple[int, ...], c: Number) -> Expression:
+        factors = []
+        for v, p in zip(self.vars, e):
+            if p == 1:
+                factors.append(Expression.to_expression(v))
+            elif p > 1:
+                factors.append(v ** p)
+        if not factors:
+            return Expression.to_expression(c)
+        result = factors[0]
+        for f in factors[1:]:
+            result = result * f
+        return result if c == 1 else c * result
+
+    def to_expression(self, horner: bool = False) -> Expression:
+        """
+        Convert Polynomial to Expression
+
+        :param horner: return Horner scheme (fast to evaluate),
+                       default is sum of monomials by decreasing degree
+        """
+        if not self.terms:
+            return Expression.to_expression(0)
+        if horner:
+            return self._horner_expression(self.horner, 0)
+
+        result = None
+        for e in self._order():
+            c = self.terms[e]
+            if result is None:
+                result = self._monomial(e, c)
+            elif isinstance(c, (int, float)) and c < 0:
+                result = result - self._monomial(e, -c)
+            else:
+                result = result + self._monomial(e, c)
+        return result
+
+    def _horner_expression(self, node, i: int) -> Expression:
+        if i == len(self.vars):
+            return Expression.to_expression(node)
+        v = self.vars[i]
+
+        def times(expr: Expression, p: int) -> Expression:
+            factor = v if p == 1 else v ** p
+            if expr._operation is OpConst and expr._operands[0]() == 1:
+                return Expression.to_expression(factor)
+            return expr * factor
+
+        result, last = None, None
+        for p, sub in node:
+            sub = self._horner_expression(sub, i + 1)
+            result = sub if result is None else times(result, last - p) + sub
+            last = p
+        return times(result, last) if last else result
+
+    def _order(self) -> list[tuple[int, ...]]:
+        """
+        Exponents by decreasing degree
+        """
+        return sorted(self.terms, key=lambda e: (-sum(e), tuple(-p for p in e)))
+
+    def __str__(self) -> str:
+        s = ""
+        for e in self._order():
+            c = self.terms[e]
+            factors = [v.name if p == 1 else f"{v.name}^{p}" for v, p in zip(self.vars, e) if p]
+            sign = " + "
+            if isinstance(c, (int, float)) and c < 0:
+                sign, c = " - ", -c
+            if c != 1 or not factors:
+                factors.insert(0, str(c))
+            s += sign + " * ".join(factors)
+        if not s:
+            return "0"
+        return s[3:] if s.startswith(" + ") else "-" + s[3:]
+
+    def __repr__(self) -> str:
+        return f"Polynomial({self})"
+
+
+# -- CONVERSION OF EXPRESSIONS --
+
+
+def _leaf(op: Any) -> Optional[Polynomial]:
+    if isinstance(op, Var):
+        return Polynomial.variable(op)
+    if isinstance(op, Constant):
+        return Polynomial.constant(op())
+    if isinstance(op, (int, float, complex)):
+        return Polynomial.constant(op)
+    return None
+
+
+def _natural(p: Polynomial) -> Optional[int]:
+    if not p.is_constant:
+        return None
+    value = p.constant_term
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return value if isinstance(value, int) and value >= 0 else None
+
+
+def _combine(operation, operands: list[Optional[Polynomial]]) -> Optional[Polynomial]:
+    """
+    Return Polynomial of node with polynomial operands
+    or None if node is not polynomial
+    """
+    if any(p is None for p in operands):
+        return None
+    if operation is OpVar or operation is OpConst:
+        return operands[0]
+    if len(operands) != 2:
+        return None
+    a, b = operands
+    if operation is Add:
+        return a + b
+    if operation is Sub:
+        return a - b
+    if operation is Mul:
+        return a * b
+    if operation is Div and b.is_constant and b.constant_term != 0:
+        return a / b.constant_term
+    if operation is Pow:
+        n = _natural(b)
+        if n is not None:
+            return a ** n
+    return None
+
+
+def _to_polynomial(expr: Expression, memo: dict) -> Optional[Polynomial]:
+    """
+    Return Polynomial of Expression or None, Polynomials
+    of all subtrees are saved in memo by id
+    """
+    if id(expr) in memo:
+        return memo[id(expr)][1]
+    operands = []
+    for op in expr._operands:
+        operands.append(_to_polynomial(op, memo) if isinstance(op, Expression) else _leaf(op))
+    poly = _combine(expr._operation, operands)
+    # keep expr in memo, so its id is not reused
+    memo[id(expr)] = (expr, poly)
+    return poly
+
+
+def _replace(expr: Expression, atoms: dict[Var, Expression], memo: dict) -> Expression:
+    """
+    Replace placeholder Vars of Expression by atoms
+    """
+    if id(expr) in memo:
+        return memo[id(expr)]
+    if expr._operation is OpVar and expr._operands[0] in atoms:
+        result = atoms[expr._operands[0]]
+    else:
+        operands, vars = [], set()
+        for op in expr._operands:
+            if isinstance(op, Expression):
+                op = _replace(op, atoms, memo)
+                vars |= op.vars
+            elif isinstance(op, Var):
+                vars.add(op)
+            operands.append(op)
+        result = Expression(expr._operation, vars, operands)
+    memo[id(expr)] = result
+    return result
+
+
+def simplify(expr: Expression) -> Expression:
+    """
+    Expand and collect Expression as polynomial, every non-polynomial
+    subtree (function, division by Expression, ...) is simplified
+    separately and used as one variable of polynomial
+
+    Usage:
+    >>> simplify(x + x + x)
+        '(3 * x)'
+    >>> simplify(log((x + 1) * (x - 1)) + x * x - x * x)
+        'log(((x ^ 2) - 1))'
+    """
+    expr = Expression.to_expression(expr)
+    # equal atoms (by structure) are replaced by one placeholder
+    placeholders: dict[int, Var] = {}
+    atoms: dict[Var, Expression] = {}
+    # all memos keep nodes, so their ids are not reused
+    polys: dict[int, tuple[Expression, Polynomial]] = {}
+    results: dict[int, tuple[Expression, Expression]] = {}
+    structures: dict[int, tuple[Any, int]] = {}
+    keys: dict[tuple, int] = {}
+
+    def structure(node: Any) -> int:
+        """
+        Number of structure of simplified node, different
+        Vars and callables with equal names are different
+        """
+        if id(node) in structures:
+            return structures[id(node)][1]
+        if isinstance(node, Expression) and (node._operation is OpVar or node._operation is OpConst):
+            key = (None, structure(node._operands[0]))
+        elif isinstance(node, Expression):
+            key = (node._operation, *(structure(op) for op in node._operands))
+        elif isinstance(node, Constant):
+            key = ("const", type(node()), node())
+        elif isinstance(node, Var):
+            key = ("var", node)
+        else:
+            key = ("const", type(node), node)
+        number = keys.setdefault(key, len(keys))
+        structures[id(node)] = (node, number)
+        return number
+
+    def expand(node: Expression) -> Polynomial:
+        if id(node) in polys:
+            return polys[id(node)][1]
+        operands = []
+        for op in node._operands:
+            operands.append(expand(op) if isinstance(op, Expression) else _leaf(op))
+        poly = _combine(node._operation, operands) if None not in operands else None
+        if poly is None:
+            atom_operands, vars = [], set()
+            for op in node._operands:
+                if isinstance(op, Expression):
+                    op = simplified(op)
+                    vars |= op.vars
+                elif isinstance(op, Var):
+                    vars.add(op)
+                atom_operands.append(op)
+            atom = Expression(node._operation, vars, atom_operands)
+            key = structure(atom)
+            if key not in placeholders:
+                placeholders[key] = Var(f"_atom{len(placeholders)}")
+                atoms[placeholders[key]] = atom
+            poly = Polynomial.variable(placeholders[key])
+        polys[id(node)] = (node, poly)
+        return poly
+
+    def simplified(node: Expression) -> Expression:
+        # subtrees of node are expanded once, memo is shared
+        if id(node) in results:
+            return results[id(node)][1]
+        result = _replace(expand(node).to_expression(), atoms, {})
+        results[id(node)] = (node, result)
+        return result
+
+    # placeholders live only in own scope
+    with Scope():
+        return simplified(expr)
@@ -0,0 +1,328 @@
+"""
+This module implements opt-in profiling of Expression evaluation
+
+Profiler replaces Expression.__call__ by instrumented version only
+while it is enabled, so when profiling is off evaluation runs original
+code and costs nothing
+
+Usage:
+>>> with Profiler(nodes=True) as prof:
+...     e(x=1, y=2)
+>>> print(prof.report())
+>>> prof.export_collapsed("e.folded")     # for flamegraph.pl or speedscope
+"""
+from __future__ import annotations
+
+import threading
+from time import perf_counter
+from typing import Any, Optional, Union
+
+from .var import Var, Constant, Expression
+from .operation import Operation, OpVar, OpConst
+
+
+_lock = threading.Lock()
+_active: Optional[Profiler] = None
+_original_call = Expression.__call__
+
+
+def label(expr: Expression) -> str:
+    """
+    Return name of node of Expression for reports
+    """
+    operation = expr._operation
+    if operation is OpVar:
+        return f"VAR {expr._operands[0]}"
+    if operation is OpConst:
+        return "CONST"
+    if isinstance(operation, Operation):
+        return str(operation)
+    return getattr(operation, "__name__", repr(operation))
+
+
+class OperationStats:
+    """
+    Calls count and time of one Operation
+
+    total is time of node with its operands,
+    self is time of node without time of its operands
+    """
+
+    __slots__ = ("calls", "total", "self")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.self = 0.0
+
+    def __repr__(self) -> str:
+        return f"OperationStats(calls={self.calls}, total={self.total:.6f}, self={self.self:.6f})"
+
+
+class NodeTiming:
+    """
+    Time of evaluation of one node of Expression
+    """
+
+    __slots__ = ("expr", "label", "total", "self", "children")
+
+    def __init__(self, expr: Expression):
+        self.expr = expr
+        self.label = label(expr)
+        self.total = 0.0
+        self.self = 0.0
+        self.children: list[NodeTiming] = []
+
+    def walk(self, depth: int = 0):
+        """
+        Iterate over (depth, node) of all nodes in pre-order
+        """
+        stack = [(depth, self)]
+        while stack:
+            d, node = stack.pop()
+            yield d, node
+            stack.extend((d + 1, child) for child in reversed(node.children))
+
+    def __repr__(self) -> str:
+        return f"NodeTiming({self.label}, total={self.total:.6f}, children={len(self.children)})"
+
+
+class _Frame:
+    __slots__ = ("label", "path", "children_time", "node")
+
+    def __init__(self, label: str, path: tuple, node: Optional[NodeTiming]):
+        self.label = label
+        self.path = path
+        self.children_time = 0.0
+        self.node = node
+
+
+class Profiler:
+    """
+    Collect per-Operation counts and time of Expression evaluation
+
+    Only calls of thread where Profiler is enabled are counted,
+    Expression.__call__ is replaced globally, but other threads
+    run original code
+
+    :param nodes: also save timing of every node of every
+                  top-level call (see Profiler.calls), it
+                  needs memory proportional to evaluated nodes
+    """
+
+    def __init__(self, nodes: bool = False):
+        self.nodes = nodes
+        self._thread: Optional[int] = None
+        self._stats_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.stats: dict[str, OperationStats] = {}
+        self.calls: list[NodeTiming] = []
+        # path of labels from root -> self time
+        self.stacks: dict[tuple, float] = {}
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        return _active is self
+
+    def enable(self):
+        global _active
+        with _lock:
+            if _active is self:
+                return
+            if _active is not None:
+                raise RuntimeError("Other Profiler is already enabled")
+            _active = self
+            self._thread = threading.get_ident()
+            Expression.__call__ = _instrumented_call
+
+    def disable(self):
+        global _active
+        with _lock:
+            if _active is not self:
+                return
+            Expression.__call__ = _original_call
+            _active = None
+            self._thread = None
+
+    def __enter__(self) -> Profiler:
+        self.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def _stack(self) -> list[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, expr: Expression) -> _Frame:
+        stack = self._stack()
+        name = label(expr)
+        parent = stack[-1] if stack else None
+        node = NodeTiming(expr) if self.nodes else None
+        if node is not None:
+            if parent is None:
+                with self._stats_lock:
+                    self.calls.append(node)
+            else:
+                parent.node.children.append(node)
+        frame = _Frame(name, (parent.path if parent else ()) + (name,), node)
+        stack.append(frame)
+        return frame
+
+    def _exit(self, frame: _Frame, elapsed: float):
+        stack = self._stack()
+        stack.pop()
+        if stack:
+            stack[-1].children_time += elapsed
+        self_time = elapsed - frame.children_time
+
+        with self._stats_lock:
+            stats = self.stats.get(frame.label)
+            if stats is None:
+                stats = self.stats[frame.label] = OperationStats()
+            stats.calls += 1
+            stats.total += elapsed
+            stats.self += self_time
+            self.stacks[frame.path] = self.stacks.get(frame.path, 0.0) + self_time
+        if frame.node is not None:
+            frame.node.total = elapsed
+            frame.node.self = self_time
+
+    def report(self, sort: str = "self") -> str:
+        """
+        Return table of Operations stats sorted by self time
+        (or by "total" or "calls")
+        """
+        rows = sorted(self.stats.items(), key=lambda item: getattr(item[1], sort), reverse=True)
+        width = max([len(name) for name in self.stats] + [9])
+        lines = [f"{'operation':<{width}} {'calls':>10} {'total, s':>12} {'self, s':>12}"]
+        for name, s in rows:
+            lines.append(f"{name:<{width}} {s.calls:>10} {s.total:>12.6f} {s.self:>12.6f}")
+        return "\n".join(lines)
+
+    def collapsed(self, unit: float = 1e-6) -> list[str]:
+        """
+        Return stacks in collapsed format of flamegraph:
+        "root;child;grandchild value", value is self time in units
+        (default: microseconds), stacks with zero value are skipped
+        """
+        lines = []
+        for path, time in sorted(self.stacks.items()):
+            value = round(time / unit)
+            if value > 0:
+                lines.append(f"{';'.join(path)} {value}")
+        return lines
+
+    def export_collapsed(self, path: str, unit: float = 1e-6):
+        """
+        Save collapsed stacks to file (see Profiler.collapsed)
+        """
+        with open(path, "w") as file:
+            for line in self.collapsed(unit):
+                file.write(line + "\n")
+
+
+def _instrumented_call(self: Expression, **vars) -> Any:
+    profiler = _active
+    if profiler is None or profiler._thread != threading.get_ident():
+        return _original_call(self, **vars)
+    frame = profiler._enter(self)
+    start = perf_counter()
+    try:
+        return _original_call(self, **vars)
+    finally:
+        profiler._exit(frame, perf_counter() - start)
+
+
+def profile_call(expr: Expression, **values) -> tuple[Any, NodeTiming]:
+    """
+    Evaluate Expression and return its value
+    with timing of every node
+
+    Usage:
+    >>> value, timing = profile_call(x * y + x, x=2, y=3)
+    >>> for depth, node in timing.walk():
+    ...     print("  " * depth, node.label, node.total)
+    """
+    with Profiler(nodes=True) as profiler:
+        value = expr(**values)
+    return value, profiler.calls[-1]
+
+
+class TreeStats:
+    """
+    Statistics of Expression tree
+
+    size - count of nodes of tree (shared nodes are counted every time),
+    depth - count of nodes in longest path from root,
+    objects - count of different Expression objects,
+    unique - count of structurally different subtrees
+    """
+
+    __slots__ = ("size", "depth", "objects", "unique")
+
+    def __init__(self, size: int, depth: int, objects: int, unique: int):
+        self.size = size
+        self.depth = depth
+        self.objects = objects
+        self.unique = unique
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TreeStats) and (
+            (self.size, self.depth, self.objects, self.unique)
+            == (other.size, other.depth, other.objects, other.unique)
+        )
+
+    def __repr__(self) -> str:
+        return (f"TreeStats(size={self.size}, depth={self.depth}, "
+                f"objects={self.objects}, unique={self.unique})")
+
+
+def _leaf_key(op: Union[Var, Constant, Any]) -> tuple:
+    if isinstance(op, Var):
+        return ("var", op.name)
+    if isinstance(op, Constant):
+        return ("const", type(op()).__name__, op())
+    return ("object", id(op))
+
+
+def tree_stats(expr: Expression) -> TreeStats:
+    """
+    Return TreeStats of Expression, tree is walked
+    without recursion, so deep trees are supported
+    """
+    # id(node) -> (size, depth, structural key id)
+    memo: dict[int, tuple[int, int, int]] = {}
+    keys: dict[tuple, int] = {}
+
+    stack = [(expr, False)]
+    while stack:
+        node, ready = stack.pop()
+        if id(node) in memo:
+            continue
+        children = [op for op in node._operands if isinstance(op, Expression)]
+        if not ready:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children if id(child) not in memo)
+            continue
+
+        size, depth, key = 1, 0, [node._operation]
+        for op in node._operands:
+            if isinstance(op, Expression):
+                s, d, k = memo[id(op)]
+                size += s
+                depth = max(depth, d)
+                key.append(k)
+            else:
+                key.append(_leaf_key(op))
+        key = tuple(key)
+        memo[id(node)] = (size, depth + 1, keys.setdefault(key, len(keys)))
+
+    size, depth, _ = memo[id(expr)]
+    return TreeStats(size, depth, len(memo), len(keys))
@@ -1,3 +1,5 @@
-from .relation import Relation
+from .relation import Relation, join_all
 from .binary_relation import BinaryRelation
+from .storage import MappedPairs
+from .reachability import ReachabilityIndex
 from . import properties
@@ -4,6 +4,7 @@ for work with binary relation
 """
 from __future__ import annotations
 from .relation import Relation
+from .storage import MappedPairs
 
 
 class BinaryRelation(Relation):
@@ -18,7 +19,41 @@ class BinaryRelation(Relation):
         :param M: set with relation elements
         """
         super().__init__(relation, M)
-        
+
+    @classmethod
+    def load(cls, path: str) -> BinaryRelation:
+        """
+        Open relation saved by BinaryRelation.save
+
+        Pairs are not read from file, they are memory-mapped,
+        so relation of any size opens in constant time.
+        File is released by close or at exit of with block
+
+        Usage:
+        >>> with BinaryRelation.load("p.rel") as p:
+        ...     (1, 2) in p
+        """
+        return cls(MappedPairs(path))
+
+    def close(self) -> None:
+        """
+        Release file of relation opened by BinaryRelation.load
+        """
+        if isinstance(self._relation, MappedPairs):
+            self._relation.close()
+
+    def __enter__(self) -> BinaryRelation:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def save(self, path: str) -> None:
+        """
+        Save relation to file in memory-mapped format
+        """
+        MappedPairs.dump(path, self._relation, self.M).close()
+
     @property
     def matrix(self) -> list[list[int]]:
         mat = [ [0 for _ in self.M] for _ in self.M]
@@ -42,6 +77,8 @@ class BinaryRelation(Relation):
         Let p = { (a_1, b_1), (a_2, b_2), ... }
         :return: first projection of relation {a_1, a_2, ...}
         """
+        if isinstance(self._relation, MappedPairs):
+            return self._relation.projection(0)
         pr1 = set()
         for a, _ in self._relation:
             pr1.add(a)
@@ -53,6 +90,8 @@ class BinaryRelation(Relation):
         Let p = { (a_1, b_1), (a_2, b_2), ... }
         :return: second projection of relation {b_1, b_2, ...}
         """
+        if isinstance(self._relation, MappedPairs):
+            return self._relation.projection(1)
         pr2 = set()
         for _, b in self.pairs:
             pr2.add(b)
@@ -69,6 +108,8 @@ class BinaryRelation(Relation):
         """
         Return all pairs which starts with [s]
         """
+        if isinstance(self._relation, MappedPairs):
+            return self._relation.startswith(s)
         st = set()
         for a, b in self.pairs:
             if a == s:
@@ -113,20 +154,37 @@ class BinaryRelation(Relation):
         (a, b) in (p1 * p2) <=>  E c: (a, c) in p1 and (c, b) in p2 
         """
         res = set()
-        for a, b in self.pairs:
-            for _, d in relation.startswith(b):
-                res.add((a, d))
+        if isinstance(relation._relation, MappedPairs):
+            # binary search in sorted pairs of file
+            for a, b in self._relation:
+                res.update((a, d) for _, d in relation._relation.startswith(b))
+            return BinaryRelation(res)
+
+        # hash join of second column of self with first column of relation
+        index = relation.index((0,))
+        for a, b in self._relation:
+            matched = index.get((b,))
+            if matched:
+                res.update((a, d) for _, d in matched)
         return BinaryRelation(res)
 
     def __invert__(self) -> BinaryRelation:
         return self.r
 
+    def reachability_index(self, labels: int = 2):
+        """
+        Return index for queries (a, b) in transitive closure
+        without building closure (see smbl.relations.reachability)
+        """
+        from .reachability import ReachabilityIndex
+        return ReachabilityIndex(self, labels)
+
     def transitive_closure(self) -> BinaryRelation:
         """
         Return transitive closure of relation p
         is the smallest relation on M that contains p and is transitive
         """
-        transitive_closure_pairs = self.pairs
+        transitive_closure_pairs = set(self.pairs)
 
         for a, b in self.pairs:
             for _, c in self.startswith(b):
@@ -0,0 +1,299 @@
+"""
+This module implements index for reachability queries in
+fixed binary relation without materializing transitive closure
+
+Strongly connected components are contracted to one node, so
+condensation is DAG. Every node of DAG has labels of randomized
+depth-first traversals (interval labeling), labels answer most
+queries in constant time:
+    - component of b is after component of a in topological order
+    - postorder interval of b is inside interval of a in DFS tree (reachable)
+    - interval [low, rank] of b is not inside interval of a (unreachable)
+Other queries are answered by depth-first search pruned by labels
+
+Index size is O(|M| * labels + |p|)
+"""
+from __future__ import annotations
+
+import random
+from typing import Any, Iterable, Union
+
+from .binary_relation import BinaryRelation
+
+
+class ReachabilityIndex:
+    """
+    Index for queries `b is reachable from a` (a, b) in transitive closure
+
+    Usage:
+    >>> index = ReachabilityIndex(BinaryRelation({(1, 2), (2, 3)}))
+    >>> index.reachable(1, 3)
+        True
+    >>> (3, 1) in index
+        False
+    >>> index.reachable_many([(1, 3), (3, 1)])
+        [True, False]
+    """
+
+    def __init__(self, relation: Union[BinaryRelation, Iterable[tuple]], labels: int = 2, seed: int = 0):
+        """
+        :param relation: BinaryRelation or pairs
+        :param labels: count of randomized interval labels
+        :param seed: seed of random order of traversals
+        """
+        if labels < 1:
+            raise ValueError(f"Invalid count of labels {labels}")
+        pairs = relation._relation if isinstance(relation, BinaryRelation) else relation
+
+        self._ids: dict[Any, int] = {}
+        edges: list[list[int]] = []
+        loops = set()
+        for a, b in pairs:
+            ia = self._id(a, edges)
+            ib = self._id(b, edges)
+            if ia == ib:
+                loops.add(ia)
+            edges[ia].append(ib)
+
+        self._components = self._strong_components(edges)
+        count = max(self._components, default=-1) + 1
+
+        # component contains cycle: it has many elements or loop
+        sizes = [0] * count
+        for c in self._components:
+            sizes[c] += 1
+        self._cyclic = [size > 1 for size in sizes]
+        for i in loops:
+            self._cyclic[self._components[i]] = True
+
+        dag = [set() for _ in range(count)]
+        for u, vs in enumerate(edges):
+            cu = self._components[u]
+            for v in vs:
+                cv = self._components[v]
+                if cu != cv:
+                    dag[cu].add(cv)
+        self._dag = [list(vs) for vs in dag]
+        self._edges = sum(len(vs) for vs in self._dag)
+
+        rnd = random.Random(seed)
+        self._labels = [self._label(rnd) for _ in range(labels)]
+        # postorder rank before traversal of subtree of first DFS tree
+        self._first = self._labels[0][2]
+        self.searches = 0
+        # sources with more targets are answered by one search
+        self._batch_search = 16
+
+    def _id(self, elem: Any, edges: list[list[int]]) -> int:
+        i = self._ids.get(elem)
+        if i is None:
+            i = self._ids[elem] = len(edges)
+            edges.append([])
+        return i
+
+    @staticmethod
+    def _strong_components(edges: list[list[int]]) -> list[int]:
+        """
+        Tarjan algorithm without recursion, components are numbered
+        in reverse topological order (edges go to smaller numbers)
+        """
+        n = len(edges)
+        index = [-1] * n
+        low = [0] * n
+        component = [-1] * n
+        stack = []
+        counter = 0
+        components = 0
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                u, i = work.pop()
+                if i == 0:
+                    index[u] = low[u] = counter
+                    counter += 1
+                    stack.append(u)
+                elif component[edges[u][i - 1]] == -1:
+                    # returned from child
+                    low[u] = min(low[u], low[edges[u][i - 1]])
+                while i < len(edges[u]):
+                    v = edges[u][i]
+                    i += 1
+                    if index[v] == -1:
+                        work.append((u, i))
+                        work.append((v, 0))
+                        break
+                    if component[v] == -1:
+                        low[u] = min(low[u], index[v])
+                else:
+                    if low[u] == index[u]:
+                        while True:
+                            v = stack.pop()
+                            component[v] = components
+                            if v == u:
+                                break
+                        components += 1
+        return component
+
+    def _label(self, rnd: random.Random) -> tuple[list[int], list[int], list[int]]:
+        """
+        Randomized DFS of condensation
+
+        :return: (low, rank, first), rank is postorder number,
+                 low is minimum rank of reachable components,
+                 first is minimum rank of subtree of DFS tree
+        """
+        n = len(self._dag)
+        rank = [-1] * n
+        low = [0] * n
+        first = [0] * n
+        children = [rnd.sample(vs, len(vs)) for vs in self._dag]
+        counter = 0
+        for root in rnd.sample(range(n), n):
+            if rank[root] != -1:
+                continue
+            first[root] = counter
+            rank[root] = -2     # in progress
+            work = [(root, 0)]
+            while work:
+                u, i = work.pop()
+                vs = children[u]
+                while i < len(vs):
+                    v = vs[i]
+                    i += 1
+                    if rank[v] == -1:
+                        first[v] = counter
+                        rank[v] = -2
+                        work.append((u, i))
+                        work.append((v, 0))
+                        break
+                else:
+                    rank[u] = counter
+                    counter += 1
+                    low[u] = min([first[u], *(low[v] for v in vs)])
+        return low, rank, first
+
+    @property
+    def components(self) -> int:
+        """
+        Count of strongly connected components
+        """
+        return len(self._dag)
+
+    @property
+    def size(self) -> int:
+        """
+        Count of stored numbers (elements, labels and edges of condensation)
+        """
+        return len(self._components) + len(self._dag) * (1 + 3 * len(self._labels)) + self._edges
+
+    def _excluded(self, ca: int, cb: int) -> bool:
+        """
+        Labels prove that cb is not reachable from ca
+        """
+        if cb >= ca:
+            return True
+        for low, rank, _ in self._labels:
+            if low[cb] < low[ca] or rank[cb] > rank[ca]:
+                return True
+        return False
+
+    def _tree(self, ca: int, cb: int) -> bool:
+        """
+        cb is in subtree of ca in first DFS tree
+        """
+        rank = self._labels[0][1]
+        return self._first[ca] <= rank[cb] < rank[ca]
+
+    def _components_reachable(self, ca: int, cb: int) -> bool:
+        if ca == cb:
+            return self._cyclic[ca]
+        if self._excluded(ca, cb):
+            return False
+        if self._tree(ca, cb):
+            return True
+
+        self.searches += 1
+        visited = {ca}
+        stack = [ca]
+        while stack:
+            for v in self._dag[stack.pop()]:
+                if v == cb or self._tree(v, cb):
+                    return True
+                if v not in visited and not self._excluded(v, cb):
+                    visited.add(v)
+                    stack.append(v)
+        return False
+
+    def reachable(self, a: Any, b: Any) -> bool:
+        """
+        Check b is reachable from a by path of length 1 or more
+        """
+        ia = self._ids.get(a)
+        ib = self._ids.get(b)
+        if ia is None or ib is None:
+            return False
+        return self._components_reachable(self._components[ia], self._components[ib])
+
+    def __contains__(self, pair: tuple) -> bool:
+        return self.reachable(*pair)
+
+    def reachable_many(self, pairs: Iterable[tuple]) -> list[bool]:
+        """
+        Answer many queries, queries not answered by labels
+        are grouped by source, source with few targets is answered
+        by pruned search for every target, else one search pruned
+        by labels of all targets is done
+        """
+        result = []
+        pending: dict[int, dict[int, list[int]]] = {}
+        for k, (a, b) in enumerate(pairs):
+            ia = self._ids.get(a)
+            ib = self._ids.get(b)
+            if ia is None or ib is None:
+                result.append(False)
+                continue
+            ca, cb = self._components[ia], self._components[ib]
+            if ca == cb:
+                result.append(self._cyclic[ca])
+            elif self._excluded(ca, cb):
+                result.append(False)
+            elif self._tree(ca, cb):
+                result.append(True)
+            else:
+                result.append(False)
+                pending.setdefault(ca, {}).setdefault(cb, []).append(k)
+
+        for ca, targets in pending.items():
+            if len(targets) <= self._batch_search:
+                for cb, ks in targets.items():
+                    if self._components_reachable(ca, cb):
+                        for k in ks:
+                            result[k] = True
+                continue
+
+            self.searches += 1
+            # component is skipped if labels exclude all targets:
+            # targets have smaller numbers than all their ancestors,
+            # low of ancestor is not greater and rank is greater
+            bound = min(targets)
+            bounds = [(max(low[t] for t in targets), min(rank[t] for t in targets))
+                      for low, rank, _ in self._labels]
+            visited = {ca}
+            stack = [ca]
+            while stack and targets:
+                for v in self._dag[stack.pop()]:
+                    if v in visited or v < bound:
+                        continue
+                    visited.add(v)
+                    for k in targets.pop(v, ()):
+                        result[k] = True
+                    if any(low[v] > max_low or rank[v] < min_rank
+                           for (low, rank, _), (max_low, min_rank) in zip(self._labels, bounds)):
+                        continue
+                    stack.append(v)
+        return result
+
+    def __repr__(self) -> str:
+        return f"ReachabilityIndex(elements={len(self._components)}, components={self.components})"
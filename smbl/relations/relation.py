@@ -5,20 +5,62 @@ for work with relations
 
 from __future__ import annotations
 from copy import copy
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Optional, Sequence, Union
+from .storage import MappedPairs
+
+
+Column = Union[int, str]
+
+
+def _getter(columns: Sequence[int]) -> Callable[[tuple], Any]:
+    """
+    Function of tuple to key of columns
+    """
+    if not columns:
+        return lambda t: ()
+    if len(columns) == 1:
+        i = columns[0]
+        return lambda t: (t[i],)
+    return itemgetter(*columns)
 
 
 class Relation:
+    """
+    Set of tuples with relational algebra operations
+
+    Columns are referenced by index or by name if relation
+    is created with names of columns
+
+    Usage:
+    >>> p = Relation({(1, "a"), (2, "b")}, columns=("id", "name"))
+    >>> q = Relation({(1, 10), (1, 20)}, columns=("id", "price"))
+    >>> p.join(q).relation
+        {(1, "a", 10), (1, "a", 20)}
+    """
     def __init__(self, 
                  relation: set[tuple] = set(),
-                 M: set = set()):
+                 M: set = set(),
+                 columns: Optional[Sequence[str]] = None):
+        """
+        :param relation: set of tuples
+        :param M: set with relation elements
+        :param columns: names of columns
+        """
         self._relation = relation
-        if M == set():
+        self._columns = tuple(columns) if columns is not None else None
+        # columns -> {key: tuples}, built on first use
+        self._indexes: dict[tuple[int, ...], dict[tuple, list[tuple]]] = {}
+        if M != set():
+            self._M = M
+        elif isinstance(relation, MappedPairs):
+            # element dictionary is loaded only when it needed
+            self._M = None
+        else:
             self._M = set()
             for s in self._relation:
                 for a in s:
                     self._M.add(a)
-        else:
-            self._M = M
 
     def __contains__(self, rel: tuple) -> bool:
         """
@@ -38,6 +80,8 @@ class Relation:
         """
         :return: set of relation elements
         """
+        if self._M is None:
+            self._M = self._relation.elements
         return copy(self._M)
 
     def __or__(self, relation: Relation) -> Relation:
@@ -52,8 +96,198 @@ class Relation:
         """
         return type(self)(self._relation & relation._relation)
 
+    def __len__(self) -> int:
+        return len(self._relation)
+
+    @property
+    def columns(self) -> Optional[tuple[str, ...]]:
+        """
+        :return: names of columns or None
+        """
+        return self._columns
+
+    @property
+    def arity(self) -> int:
+        """
+        :return: count of columns (0 for empty relation without names)
+        """
+        if self._columns is not None:
+            return len(self._columns)
+        for t in self._relation:
+            return len(t)
+        return 0
+
+    def _column(self, column: Column) -> int:
+        if isinstance(column, str):
+            if self._columns is None or column not in self._columns:
+                raise KeyError(f"Relation has not column `{column}`")
+            return self._columns.index(column)
+        return column
+
+    def index(self, columns: Sequence[Column]) -> dict[tuple, list[tuple]]:
+        """
+        Hash index of tuples by values of columns,
+        index is built once and kept with relation
+        (except memory-mapped relation)
+        """
+        columns = tuple(self._column(c) for c in columns)
+        index = self._indexes.get(columns)
+        if index is None:
+            index = {}
+            key = _getter(columns)
+            for t in self._relation:
+                index.setdefault(key(t), []).append(t)
+            # index of memory-mapped relation is not kept in memory
+            if not isinstance(self._relation, MappedPairs):
+                self._indexes[columns] = index
+        return index
+
+    def distinct(self, column: Column) -> int:
+        """
+        :return: count of different values of column
+        """
+        return len(self.index((column,)))
+
+    def _same_type(self, tuples: set[tuple]) -> Relation:
+        """
+        Relation of the same type and columns with other tuples
+        """
+        if type(self) is Relation:
+            return Relation(tuples, columns=self._columns)
+        return type(self)(tuples)
+
+    def select(self,
+               predicate: Optional[Callable[[tuple], bool]] = None,
+               where: Optional[dict[Column, Any]] = None) -> Relation:
+        """
+        Tuples which satisfy predicate and have given values of columns
+
+        Equality conditions are answered by hash index
+
+        :param predicate: function of tuple
+        :param where: {column: value}
+        """
+        tuples: Iterable[tuple] = self._relation
+        if where:
+            columns = list(where)
+            key = tuple(where[c] for c in columns)
+            tuples = self.index(columns).get(key, ())
+        if predicate is not None:
+            tuples = filter(predicate, tuples)
+        return self._same_type(set(tuples))
+
+    def project(self, *columns: Column) -> Relation:
+        """
+        Relation of given columns (generalization of Pr1 and Pr2),
+        equal tuples are merged
+        """
+        indices = [self._column(c) for c in columns]
+        key = _getter(indices)
+        names = None
+        if self._columns is not None:
+            names = tuple(self._columns[i] for i in indices)
+        return Relation({key(t) for t in self._relation}, columns=names)
+
+    def _on(self, other: Relation, on: Optional[Iterable[tuple[Column, Column]]]) -> tuple[list[int], list[int]]:
+        if on is None:
+            if self._columns is None or other._columns is None:
+                raise ValueError("Natural join needs names of columns")
+            common = [c for c in self._columns if c in other._columns]
+            on = [(c, c) for c in common]
+        left, right = [], []
+        for a, b in on:
+            left.append(self._column(a))
+            right.append(other._column(b))
+        return left, right
+
+    def join(self, other: Relation, on: Optional[Iterable[tuple[Column, Column]]] = None) -> Relation:
+        """
+        Equi join, tuples of result are tuple of self and
+        columns of other which are not in join condition
+
+        Hash index is built for smaller relation (or taken from cache)
+        and other relation is scanned once, so cost is O(|p| + |q| + |result|)
+
+        :param on: pairs (column of self, column of other), default
+                   is natural join by equal names of columns
+        """
+        left, right = self._on(other, on)
+        rest = [j for j in range(other.arity) if j not in right]
+        tail = _getter(rest)
+        result = set()
+        if len(self) <= len(other):
+            index = self.index(left)
+            key = _getter(right)
+            for r in other._relation:
+                matched = index.get(key(r))
+                if matched:
+                    t = tail(r)
+                    result.update(l + t for l in matched)
+        else:
+            index = other.index(right)
+            key = _getter(left)
+            for l in self._relation:
+                matched = index.get(key(l))
+                if matched:
+                    result.update(l + tail(r) for r in matched)
+
+        names = None
+        if self._columns is not None and other._columns is not None:
+            names = self._columns + tuple(other._columns[j] for j in rest)
+        return Relation(result, columns=names)
+
+    def difference(self, other: Relation) -> Relation:
+        """
+        Tuples of self which are not in other
+        """
+        return self._same_type({t for t in self._relation if t not in other._relation})
+
+    def __sub__(self, relation: Relation) -> Relation:
+        return self.difference(relation)
+
     def __str__(self) -> str:
         return str(self._relation)
 
 
+def _estimate(p: Relation, q: Relation, common: list[str]) -> float:
+    """
+    Estimation of size of natural join by sizes and
+    counts of different values of common columns
+    """
+    size = len(p) * len(q)
+    for c in common:
+        size /= max(p.distinct(c), q.distinct(c), 1)
+    return size
+
+
+def join_all(*relations: Relation) -> Relation:
+    """
+    Natural join of many relations with names of columns
+
+    Order of joins is chosen greedily, smallest connected relation
+    first and then relation with smallest estimated result, relations
+    without common columns with result are joined last (cross product)
+    """
+    if not relations:
+        raise ValueError("No relations to join")
+    for p in relations:
+        if p.columns is None:
+            raise ValueError("Natural join needs names of columns")
+
+    rest = list(relations)
+
+    def isolated(p: Relation) -> bool:
+        return not any(c in q.columns for q in rest if q is not p for c in p.columns)
+    result = min(rest, key=lambda p: (isolated(p), len(p)))
+    rest.remove(result)
+    while rest:
+        def cost(q: Relation) -> tuple[bool, float]:
+            common = [c for c in result.columns if c in q.columns]
+            return not common, _estimate(result, q, common)
+        best = min(rest, key=cost)
+        rest.remove(best)
+        result = result.join(best)
+    return result
+
+
 
@@ -0,0 +1,218 @@
+"""
+This module implements file-backed storage
+for very large binary relations
+"""
+from __future__ import annotations
+
+import mmap
+import pickle
+import struct
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Set
+from typing import Iterable, Iterator
+
+
+_MAGIC = b"SMBLREL\x01"
+_HEADER = struct.Struct("<8sQQQ")
+
+
+class MappedPairs(Set):
+    """
+    Read-only set of pairs stored in memory-mapped file
+
+    File layout:
+        header      magic, index size, pairs count, dictionary size
+        first       column with indices of first elements of pairs
+        second      column with indices of second elements of pairs
+        dictionary  pickled list of relation elements
+
+    Pairs are sorted by (first, second), so membership test
+    is binary search and opening file does not read pairs at all.
+    Columns are written in native byte order.
+
+    File is released by close, at exit of with block
+    or when storage is garbage collected
+
+    WARNING: dictionary is unpickled, don't open untrusted files
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: path to file created by MappedPairs.dump
+        """
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, itemsize, count, dict_size = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC:
+            raise ValueError(f"`{path}` is not a relation file")
+
+        fmt = "i" if itemsize == array("i").itemsize else "q"
+        start = _HEADER.size
+        size = count * itemsize
+
+        self._path = path
+        self._count = count
+        self._view = memoryview(self._mmap)
+        self._first = self._view[start:start + size].cast(fmt)
+        self._second = self._view[start + size:start + 2 * size].cast(fmt)
+        self._dict = self._view[start + 2 * size:start + 2 * size + dict_size]
+        self._elems = None
+        self._index = None
+        self._finalizer = weakref.finalize(
+            self, _release, self._first, self._second, self._dict, self._view, self._mmap
+        )
+
+    @staticmethod
+    def dump(path: str, pairs: Iterable[tuple], M: Iterable = ()) -> MappedPairs:
+        """
+        Write pairs to file and return storage opened from it
+
+        :param path: path of file
+        :param pairs: pairs of relation
+        :param M: relation elements (elements of pairs are added automatically)
+        """
+        index = {}
+        for e in M:
+            index.setdefault(e, len(index))
+
+        ids = set()
+        for a, b in pairs:
+            ia = index.setdefault(a, len(index))
+            ib = index.setdefault(b, len(index))
+            ids.add((ia, ib))
+        ids = sorted(ids)
+
+        fmt = "i" if len(index) <= 2**31 - 1 else "q"
+        first = array(fmt, (a for a, _ in ids))
+        second = array(fmt, (b for _, b in ids))
+        dictionary = pickle.dumps(list(index), protocol=pickle.HIGHEST_PROTOCOL)
+
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, first.itemsize, len(ids), len(dictionary)))
+            first.tofile(file)
+            second.tofile(file)
+            file.write(dictionary)
+
+        return MappedPairs(path)
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable) -> set:
+        # Result of set operations is ordinary in-memory set
+        return set(it)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def elems(self) -> list:
+        """
+        :return: list of elements, element index is position in list
+        """
+        if self._elems is None:
+            self._elems = pickle.loads(self._dict)
+        return self._elems
+
+    @property
+    def elements(self) -> set:
+        """
+        :return: set of relation elements
+        """
+        return set(self.elems)
+
+    def _id(self, elem) -> int:
+        if self._index is None:
+            self._index = {e: i for i, e in enumerate(self.elems)}
+        return self._index.get(elem, -1)
+
+    def _range(self, i: int) -> tuple[int, int]:
+        """
+        :return: bounds of pairs which starts with element of index [i]
+        """
+        lo = bisect_left(self._first, i)
+        return lo, bisect_right(self._first, i, lo)
+
+    def __contains__(self, pair: tuple) -> bool:
+        try:
+            a, b = pair
+            ia, ib = self._id(a), self._id(b)
+        except (TypeError, ValueError):
+            return False
+        if ia < 0 or ib < 0:
+            return False
+
+        lo, hi = self._range(ia)
+        j = bisect_left(self._second, ib, lo, hi)
+        return j < hi and self._second[j] == ib
+
+    def __iter__(self) -> Iterator[tuple]:
+        elems = self.elems
+        for a, b in zip(self._first, self._second):
+            yield elems[a], elems[b]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __copy__(self) -> MappedPairs:
+        # Storage is read-only, so it can be shared
+        return self
+
+    def startswith(self, s) -> set[tuple]:
+        """
+        Return all pairs which starts with [s]
+        """
+        i = self._id(s)
+        if i < 0:
+            return set()
+        elems = self.elems
+        lo, hi = self._range(i)
+        return {(s, elems[b]) for b in self._second[lo:hi]}
+
+    def projection(self, column: int) -> set:
+        """
+        Return projection of relation on [column] (0 or 1)
+        """
+        elems = self.elems
+        if column == 0:
+            # column is sorted, so jump over runs of equal values
+            pr = set()
+            i = 0
+            while i < self._count:
+                a = self._first[i]
+                pr.add(elems[a])
+                i = bisect_right(self._first, a, i)
+            return pr
+        elif column == 1:
+            return {elems[b] for b in set(self._second)}
+        raise IndexError(f"Invalid projection column: {column}")
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def close(self):
+        """
+        Release memory-mapped file
+        """
+        self._finalizer()
+
+    def __enter__(self) -> MappedPairs:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f'MappedPairs("{self._path}", pairs={self._count})'
+
+
+def _release(*buffers):
+    # views are released before memory-mapped file
+    for buffer in buffers:
+        if isinstance(buffer, memoryview):
+            buffer.release()
+        else:
+            buffer.close()
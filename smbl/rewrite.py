@@ -0,0 +1,465 @@
+"""
+This module implements pattern matching and rewriting of Expressions
+
+Patterns are Expressions with Wildcards, rules are indexed by
+discrimination tree (trie of patterns in preorder), so only rules
+which can match node are checked, not all rules. Rewriting is bottom-up
+and every structure is normalized once (normal forms are memoized by
+structure of subtree, not by identity of node)
+
+Usage:
+>>> a = Wildcard("a")
+>>> rules = Rewriter([Rule(a * 1, a), Rule(a + 0, a)])
+>>> rules.rewrite((x * 1 + 0) * y)
+    '(x * y)'
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Optional, Union
+
+from .operation import OpVar, OpConst
+from .var import Var, Constant, Expression
+
+
+KINDS = ("any", "var", "const")
+
+Bindings = dict[str, Expression]
+
+
+class Wildcard(Var):
+    """
+    Variable of pattern, matches any subtree (or only Var or Constant)
+
+    Wildcard is registered in Scope with name `?name`, so it doesn't
+    replace Var with the same name. All occurrences of Wildcard in
+    pattern must match equal subtrees
+    """
+
+    def __new__(cls, name: str, kind: str = "any"):
+        """
+        :param name: name of Wildcard in bindings
+        :param kind: `any`, `var` or `const`
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Invalid kind of Wildcard `{kind}`, expected one of {KINDS}")
+        self = super().__new__(cls, f"?{name}")
+        if not isinstance(self, Wildcard):
+            raise NameError(f"Variable `?{name}` is not Wildcard")
+        if not hasattr(self, "_kind"):
+            self._label = name
+            self._kind = kind
+        elif self._kind != kind:
+            raise ValueError(f"Wildcard `{name}` already exist with kind `{self._kind}`")
+        return self
+
+    def __reduce__(self):
+        return type(self), (self._label, self._kind)
+
+    @property
+    def label(self) -> str:
+        return self._label
+
+    @property
+    def kind(self) -> str:
+        return self._kind
+
+    def __repr__(self) -> str:
+        return f'Wildcard("{self._label}", kind="{self._kind}")'
+
+
+def _unwrap(node: Any) -> tuple[str, Any]:
+    """
+    Return (`var`, Var), (`const`, value) or (`op`, Expression)
+    """
+    if isinstance(node, Expression):
+        if node._operation is OpVar:
+            return "var", node._operands[0]
+        if node._operation is OpConst:
+            return "const", node._operands[0]()
+        return "op", node
+    if isinstance(node, Var):
+        return "var", node
+    if isinstance(node, Constant):
+        return "const", node()
+    if isinstance(node, (int, float, complex)):
+        return "const", node
+    raise TypeError(f"{type(node)} not valid type of operand")
+
+
+def _key(node: Any) -> tuple[tuple, list]:
+    """
+    Return key of node in discrimination tree and its operands
+    """
+    kind, obj = _unwrap(node)
+    if kind == "op":
+        return ("op", obj._operation, len(obj._operands)), obj._operands
+    if kind == "var" and isinstance(obj, Wildcard):
+        return ("*", obj.kind), []
+    return (kind, obj), []
+
+
+def _build(operation: Any, operands: list) -> Expression:
+    vars = set()
+    for op in operands:
+        if isinstance(op, Expression):
+            vars |= op.vars
+        elif isinstance(op, Var):
+            vars.add(op)
+    return Expression(operation, vars, operands)
+
+
+def _wildcards(pattern: Any) -> set[Wildcard]:
+    result = set()
+    stack = [pattern]
+    while stack:
+        kind, obj = _unwrap(stack.pop())
+        if kind == "op":
+            stack.extend(obj._operands)
+        elif kind == "var" and isinstance(obj, Wildcard):
+            result.add(obj)
+    return result
+
+
+def match(pattern: Any, term: Any, bindings: Optional[Bindings] = None) -> Optional[Bindings]:
+    """
+    Match pattern with Expression
+
+    :return: bindings of Wildcards labels to subtrees or None
+    """
+    bindings = {} if bindings is None else bindings
+    stack = [(pattern, term)]
+    while stack:
+        pattern, term = stack.pop()
+        pkind, pobj = _unwrap(pattern)
+        tkind, tobj = _unwrap(term)
+        if pkind == "var" and isinstance(pobj, Wildcard):
+            if pobj.kind != "any" and pobj.kind != tkind:
+                return None
+            term = Expression.to_expression(term)
+            bound = bindings.get(pobj.label)
+            if bound is None:
+                bindings[pobj.label] = term
+            elif bound is not term and bound != term:
+                return None
+        elif pkind != tkind:
+            return None
+        elif pkind == "var":
+            if pobj is not tobj:
+                return None
+        elif pkind == "const":
+            if pobj != tobj:
+                return None
+        else:
+            if pobj._operation is not tobj._operation or len(pobj._operands) != len(tobj._operands):
+                return None
+            stack.extend(zip(pobj._operands, tobj._operands))
+    return bindings
+
+
+def substitute(template: Any, bindings: Bindings) -> Expression:
+    """
+    Replace Wildcards of template by bound subtrees,
+    subtrees without Wildcards are not copied
+    """
+    kind, obj = _unwrap(template)
+    if kind == "var" and isinstance(obj, Wildcard):
+        return bindings[obj.label]
+    if kind != "op":
+        return Expression.to_expression(template)
+    operands = [substitute(op, bindings) for op in obj._operands]
+    if all(a is b for a, b in zip(operands, obj._operands)):
+        return obj
+    return _build(obj._operation, operands)
+
+
+class Rule:
+    """
+    Rewrite rule pattern -> replacement
+
+    Usage:
+    >>> a, c = Wildcard("a"), Wildcard("c", kind="const")
+    >>> Rule(a * c + a, a * (c + 1))
+    >>> Rule(a / c, lambda b: b["a"] * (1 / b["c"]()), condition=lambda b: b["c"]() != 0)
+
+    Replacement is Expression with Wildcards of pattern or function
+    of bindings (labels of Wildcards -> bound subtrees)
+    """
+
+    __slots__ = ("pattern", "replacement", "condition", "name")
+
+    def __init__(self,
+                 pattern: Any,
+                 replacement: Any,
+                 condition: Optional[Callable[[Bindings], bool]] = None,
+                 name: Optional[str] = None):
+        """
+        :param pattern: Expression with Wildcards
+        :param replacement: Expression with Wildcards of pattern or function of bindings
+        :param condition: rule is applied only if condition(bindings) is true
+        """
+        self.pattern = Expression.to_expression(pattern)
+        if isinstance(replacement, (Var, Expression, Constant, int, float, complex)):
+            unknown = _wildcards(replacement) - _wildcards(self.pattern)
+            if unknown:
+                names = ", ".join(sorted(w.label for w in unknown))
+                raise ValueError(f"Wildcards ({names}) of replacement not in pattern")
+        elif not callable(replacement):
+            raise TypeError(f"Invalid type `{type(replacement).__name__}` of replacement")
+        self.replacement = replacement
+        self.condition = condition
+        self.name = name or f"{self.pattern} -> {replacement}"
+
+    def match(self, expr: Any) -> Optional[Bindings]:
+        bindings = match(self.pattern, expr)
+        if bindings is None or (self.condition is not None and not self.condition(bindings)):
+            return None
+        return bindings
+
+    def instantiate(self, bindings: Bindings) -> Expression:
+        if isinstance(self.replacement, (Var, Expression, Constant, int, float, complex)):
+            return substitute(self.replacement, bindings)
+        return Expression.to_expression(self.replacement(bindings))
+
+    def apply(self, expr: Any) -> Optional[Expression]:
+        """
+        Rewrite root of Expression, return None if rule doesn't match
+        """
+        bindings = self.match(expr)
+        return None if bindings is None else self.instantiate(bindings)
+
+    def __repr__(self) -> str:
+        return f"Rule({self.name})"
+
+
+class _TrieNode:
+    __slots__ = ("children", "wildcards", "values")
+
+    def __init__(self):
+        self.children: dict[tuple, _TrieNode] = {}
+        self.wildcards: dict[str, _TrieNode] = {}
+        self.values: list[tuple[int, Any]] = []
+
+
+class DiscriminationTree:
+    """
+    Index of patterns, trie of keys of pattern nodes in preorder
+
+    Lookup walks term and trie together, Wildcard edge skips whole
+    subtree of term, so only patterns which can match are returned
+    and cost doesn't depend on count of other patterns. Repeated
+    Wildcards are not checked (candidates must be matched)
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._size = 0
+
+    def insert(self, pattern: Any, value: Any):
+        node = self._root
+        stack = [pattern]
+        while stack:
+            key, operands = _key(stack.pop())
+            if key[0] == "*":
+                node = node.wildcards.setdefault(key[1], _TrieNode())
+            else:
+                node = node.children.setdefault(key, _TrieNode())
+            stack.extend(reversed(operands))
+        node.values.append((self._size, value))
+        self._size += 1
+
+    def candidates(self, term: Any) -> list:
+        """
+        Return values of patterns which can match term in order of insertion
+        """
+        found = []
+        # pending subtrees of term are linked list (node, rest)
+        stack = [(self._root, (term, None))]
+        while stack:
+            node, pending = stack.pop()
+            if pending is None:
+                found.extend(node.values)
+                continue
+            term, rest = pending
+            key, operands = _key(term)
+            child = node.children.get(key)
+            if child is not None:
+                pending = rest
+                for op in reversed(operands):
+                    pending = (op, pending)
+                stack.append((child, pending))
+            for kind, child in node.wildcards.items():
+                if kind == "any" or kind == key[0]:
+                    stack.append((child, rest))
+        found.sort(key=lambda item: item[0])
+        return [value for _, value in found]
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class _Normalizer:
+    """
+    Bottom-up rewriting with memo of normal forms by structure
+    """
+
+    def __init__(self, rewriter: Rewriter, max_steps: int):
+        self.rewriter = rewriter
+        self.max_steps = max_steps
+        self.steps = 0
+        self.structures: dict[tuple, int] = {}
+        self.normal: dict[int, Expression] = {}         # structure -> normal form
+        self.sids: dict[int, tuple[Any, int]] = {}      # id of node -> (node, structure)
+        self.done: dict[int, tuple[Any, Expression]] = {}   # id of node -> (node, normal form)
+
+    def structure(self, node: Any) -> int:
+        """
+        Number of structure of node, operands must have structure
+        """
+        entry = self.sids.get(id(node))
+        if entry is not None:
+            return entry[1]
+        kind, obj = _unwrap(node)
+        if kind == "op":
+            key = (obj._operation, *(self.structure(op) for op in obj._operands))
+        elif kind == "const":
+            key = ("const", type(obj), obj)
+        else:
+            key = ("var", obj)
+        sid = self.structures.setdefault(key, len(self.structures))
+        self.sids[id(node)] = (node, sid)
+        return sid
+
+    def __call__(self, root: Any) -> Expression:
+        stack = [(root, False)]
+        while stack:
+            node, ready = stack.pop()
+            if id(node) in self.done:
+                continue
+            kind, obj = _unwrap(node)
+            if kind == "op" and not ready:
+                stack.append((node, True))
+                stack.extend((op, False) for op in obj._operands)
+                continue
+            if kind == "op":
+                operands = [self.done[id(op)][1] for op in obj._operands]
+                if all(a is b for a, b in zip(operands, obj._operands)):
+                    current = node
+                else:
+                    current = _build(obj._operation, operands)
+            else:
+                current = Expression.to_expression(node)
+            self.done[id(node)] = (node, self.reduce(current))
+        return self.done[id(root)][1]
+
+    def reduce(self, node: Expression) -> Expression:
+        """
+        Rewrite root of node with normal operands until no rule matches
+        """
+        chain = []
+        while True:
+            sid = self.structure(node)
+            if sid in self.normal:
+                node = self.normal[sid]
+                break
+            if sid in chain:
+                raise RuntimeError(f"Rewrite rules have cycle at {node}")
+            chain.append(sid)
+
+            new = self.rewriter._apply(node)
+            if new is None:
+                break
+            self.steps += 1
+            if self.steps > self.max_steps:
+                raise RuntimeError(f"Rewriting is not finished in {self.max_steps} steps")
+
+            kind, obj = _unwrap(new)
+            if kind == "op":
+                operands = [self(op) for op in obj._operands]
+                if not all(a is b for a, b in zip(operands, obj._operands)):
+                    new = _build(obj._operation, operands)
+            if self.structure(new) == sid:
+                # rule doesn't change structure
+                break
+            node = new
+
+        for sid in chain:
+            self.normal[sid] = node
+        self.done[id(node)] = (node, node)
+        return node
+
+
+class Rewriter:
+    """
+    Set of rewrite rules indexed by discrimination tree
+
+    Rules are tried in order of adding, first matched rule is applied
+    """
+
+    def __init__(self, rules: Iterable[Rule] = ()):
+        self.rules: list[Rule] = []
+        self._index = DiscriminationTree()
+        self.steps = 0
+        for rule in rules:
+            self.add(rule)
+
+    def add(self,
+            rule: Union[Rule, Any],
+            replacement: Any = None,
+            condition: Optional[Callable[[Bindings], bool]] = None) -> Rule:
+        """
+        Add Rule or Rule(pattern, replacement, condition)
+        """
+        if not isinstance(rule, Rule):
+            rule = Rule(rule, replacement, condition)
+        self.rules.append(rule)
+        self._index.insert(rule.pattern, rule)
+        return rule
+
+    def candidates(self, expr: Any) -> list[Rule]:
+        """
+        Rules which can match root of Expression (see DiscriminationTree)
+        """
+        return self._index.candidates(expr)
+
+    def matches(self, expr: Any) -> list[tuple[Rule, Bindings]]:
+        """
+        Rules which match root of Expression with bindings
+        """
+        result = []
+        for rule in self._index.candidates(expr):
+            bindings = rule.match(expr)
+            if bindings is not None:
+                result.append((rule, bindings))
+        return result
+
+    def _apply(self, expr: Expression) -> Optional[Expression]:
+        for rule in self._index.candidates(expr):
+            new = rule.apply(expr)
+            if new is not None:
+                return new
+        return None
+
+    def rewrite(self, expr: Any, max_steps: int = 100000) -> Expression:
+        """
+        Rewrite Expression bottom-up to normal form
+
+        :param max_steps: maximum count of applied rules
+        :raise RuntimeError: if rules don't terminate
+        """
+        normalizer = _Normalizer(self, max_steps)
+        result = normalizer(expr)
+        self.steps = normalizer.steps
+        return result
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __repr__(self) -> str:
+        return f"Rewriter(rules={len(self.rules)})"
+
+
+def rewrite(expr: Any, rules: Iterable[Rule], max_steps: int = 100000) -> Expression:
+    """
+    Rewrite Expression by rules (see Rewriter)
+    """
+    return Rewriter(rules).rewrite(expr, max_steps)
@@ -0,0 +1,111 @@
+"""
+This module implements namespaces of variables
+
+Every Var is registered in current Scope. By default it is global
+scope which keeps variables forever, scope created by user keeps
+only weak references, so variables of short-lived Expressions are
+removed from it with Expressions. Long-running code creating
+many variables should work in its own Scope
+"""
+from __future__ import annotations
+
+import threading
+import weakref
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+
+class Scope:
+    """
+    Namespace of variables
+
+    Usage:
+    >>> with Scope():
+    ...     x = Var("x", domain=NaturalDomain())   # visible only in this scope
+    ...     e = x + 1
+    >>> Var.exist("x")
+        False
+
+    Scope is current in context (thread or asyncio task) where it is
+    entered, reading is lock-free, registration is under lock
+    """
+
+    def __init__(self, weak: bool = True):
+        """
+        :param weak: keep weak references to variables
+        """
+        self._vars = weakref.WeakValueDictionary() if weak else {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[Any]:
+        return self._vars.get(name)
+
+    def register(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Return variable with name, create it by factory
+        if it is not exist
+        """
+        var = self._vars.get(name)
+        if var is not None:
+            return var
+        with self._lock:
+            var = self._vars.get(name)
+            if var is None:
+                var = factory()
+                self._vars[name] = var
+            return var
+
+    def remove(self, name: str, var: Optional[Any] = None):
+        """
+        Remove variable by name, if var is given
+        remove only if it is this var
+        """
+        with self._lock:
+            current = self._vars.get(name)
+            if current is None:
+                raise NameError(f"Variable with name `{name}` not exist")
+            if var is None or current is var:
+                del self._vars[name]
+
+    def __contains__(self, name: str) -> bool:
+        return self._vars.get(name) is not None
+
+    def __getitem__(self, name: str) -> Any:
+        var = self._vars.get(name)
+        if var is None:
+            raise KeyError(name)
+        return var
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._vars.keys()))
+
+    def __len__(self) -> int:
+        return len(self._vars)
+
+    def __enter__(self) -> Scope:
+        # stack of outer scopes is stored in context too,
+        # so one scope can be entered in many threads
+        _outer.set(_outer.get() + (_current.get(),))
+        _current.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        outer = _outer.get()
+        _current.set(outer[-1])
+        _outer.set(outer[:-1])
+
+    def __repr__(self) -> str:
+        return f"Scope(vars={len(self)})"
+
+
+GLOBAL_SCOPE = Scope(weak=False)
+
+_current: ContextVar[Scope] = ContextVar("smbl_scope", default=GLOBAL_SCOPE)
+_outer: ContextVar[tuple[Scope, ...]] = ContextVar("smbl_outer_scopes", default=())
+
+
+def current_scope() -> Scope:
+    """
+    Return scope of variables of current context
+    """
+    return _current.get()
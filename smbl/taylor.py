@@ -0,0 +1,299 @@
+"""
+This module implements truncated power series (jets) arithmetic
+and Taylor expansion of Expressions
+
+Jet of order n keeps Taylor coefficients c_0, ..., c_n of function
+around a point, every operation on jets costs O(n^2), so Taylor
+polynomial is calculated in one pass over Expression instead of
+n calls of derivative, which grows tree exponentially
+"""
+from __future__ import annotations
+
+import math
+from math import factorial, floor, sumprod
+from operator import add, sub
+from typing import Sequence, Union
+
+from .var import Var, Expression
+from .compiler import compile_expression
+
+
+Number = Union[int, float, complex]
+
+
+class Jet:
+    """
+    Truncated power series c_0 + c_1 t + ... + c_n t^n
+
+    Usage:
+    >>> t = Jet.variable(1.0, order=3)      # x = 1 + t
+    >>> t * t
+        Jet(1.0, 2.0, 1.0, 0.0)
+    """
+
+    __slots__ = ("coefficients",)
+
+    def __init__(self, coefficients: Sequence[Number]):
+        if not coefficients:
+            raise ValueError("Jet needs at least one coefficient")
+        self.coefficients = list(coefficients)
+
+    @classmethod
+    def variable(cls, point: Number, order: int) -> Jet:
+        """
+        Jet of independent variable x = point + t
+        """
+        return cls([point, 1] + [0] * (order - 1) if order else [point])
+
+    @classmethod
+    def constant(cls, value: Number, order: int) -> Jet:
+        return cls([value] + [0] * order)
+
+    @property
+    def order(self) -> int:
+        return len(self.coefficients) - 1
+
+    @property
+    def value(self) -> Number:
+        return self.coefficients[0]
+
+    @property
+    def is_constant(self) -> bool:
+        return not any(self.coefficients[1:])
+
+    def derivatives(self) -> list[Number]:
+        """
+        Return derivatives f(point), f'(point), ..., f^(n)(point)
+        """
+        return [c * factorial(k) for k, c in enumerate(self.coefficients)]
+
+    def _pair(self, other) -> tuple[list, list]:
+        if isinstance(other, Jet):
+            n = min(len(self.coefficients), len(other.coefficients))
+            return self.coefficients[:n], other.coefficients[:n]
+        if isinstance(other, (int, float, complex)):
+            return self.coefficients, [other] + [0] * self.order
+        return NotImplemented, NotImplemented
+
+    def __add__(self, other) -> Jet:
+        a, b = self._pair(other)
+        if a is NotImplemented:
+            return NotImplemented
+        return Jet(list(map(add, a, b)))
+
+    def __sub__(self, other) -> Jet:
+        a, b = self._pair(other)
+        if a is NotImplemented:
+            return NotImplemented
+        return Jet(list(map(sub, a, b)))
+
+    def __mul__(self, other) -> Jet:
+        if isinstance(other, (int, float, complex)):
+            return Jet([c * other for c in self.coefficients])
+        a, b = self._pair(other)
+        if a is NotImplemented:
+            return NotImplemented
+        # Cauchy product
+        return Jet([sumprod(a[:k + 1], b[k::-1]) for k in range(len(a))])
+
+    def __truediv__(self, other) -> Jet:
+        if isinstance(other, (int, float, complex)):
+            return Jet([c / other for c in self.coefficients])
+        a, b = self._pair(other)
+        if a is NotImplemented:
+            return NotImplemented
+        if b[0] == 0:
+            raise ZeroDivisionError("Division by jet with zero value")
+        # a = b * c  =>  c_k = (a_k - sum b_j c_{k-j}, j = 1..k) / b_0
+        c = []
+        for k in range(len(a)):
+            c.append((a[k] - sumprod(b[1:k + 1], c[::-1])) / b[0])
+        return Jet(c)
+
+    def __floordiv__(self, other) -> Jet:
+        a, b = self._pair(other)
+        if a is NotImplemented:
+            return NotImplemented
+        # floor is piecewise constant
+        return Jet.constant(floor(a[0] / b[0]), len(a) - 1)
+
+    def __mod__(self, other) -> Jet:
+        a, b = self._pair(other)
+        if a is NotImplemented:
+            return NotImplemented
+        q = floor(a[0] / b[0])
+        return Jet(a) - Jet(b) * q
+
+    def __pow__(self, other) -> Jet:
+        if isinstance(other, Jet):
+            if not other.is_constant:
+                # f^g = exp(g log f)
+                return exp(other * log(self))
+            other = other.value
+
+        a = self.coefficients
+        if isinstance(other, float) and other.is_integer():
+            other = int(other)
+        if isinstance(other, int) and (other >= 0 or a[0] != 0):
+            if other < 0:
+                return Jet.constant(1, self.order) / self ** -other
+            result, base = Jet.constant(1, self.order), self
+            while other:
+                if other & 1:
+                    result = result * base
+                base = base * base
+                other >>= 1
+            return result
+
+        if a[0] == 0:
+            raise ValueError(f"Power {other} of jet with zero value is not analytic")
+        # b = a^p  =>  k a_0 b_k = sum (p j - k + j) a_j b_{k-j}, j = 1..k
+        b = [a[0] ** other]
+        for k in range(1, len(a)):
+            s = sum((other * j - k + j) * a[j] * b[k - j] for j in range(1, k + 1))
+            b.append(s / (k * a[0]))
+        return Jet(b)
+
+    def __neg__(self) -> Jet:
+        return Jet([-c for c in self.coefficients])
+
+    def __radd__(self, other) -> Jet:
+        return self + other
+
+    def __rsub__(self, other) -> Jet:
+        return -self + other
+
+    def __rmul__(self, other) -> Jet:
+        return self * other
+
+    def __rtruediv__(self, other) -> Jet:
+        return Jet.constant(other, self.order) / self
+
+    def __rfloordiv__(self, other) -> Jet:
+        return Jet.constant(other, self.order) // self
+
+    def __rmod__(self, other) -> Jet:
+        return Jet.constant(other, self.order) % self
+
+    def __rpow__(self, other) -> Jet:
+        return Jet.constant(other, self.order) ** self
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Jet) and self.coefficients == other.coefficients
+
+    def __repr__(self) -> str:
+        return f"Jet({', '.join(map(repr, self.coefficients))})"
+
+
+# --- FUNCTIONS ---
+
+
+# operands which not depend on expansion variable are plain numbers
+
+
+def log(x: Union[Jet, Number]) -> Union[Jet, Number]:
+    if not isinstance(x, Jet):
+        return math.log(x)
+    a = x.coefficients
+    if a[0] == 0:
+        raise ValueError("Logarithm of jet with zero value")
+    # a b' = a'  =>  b_k = (a_k - sum j b_j a_{k-j} / k, j = 1..k-1) / a_0
+    b = [math.log(a[0])]
+    for k in range(1, len(a)):
+        s = sum(j * b[j] * a[k - j] for j in range(1, k))
+        b.append((a[k] - s / k) / a[0])
+    return Jet(b)
+
+
+def exp(x: Union[Jet, Number]) -> Union[Jet, Number]:
+    if not isinstance(x, Jet):
+        return math.exp(x)
+    a = x.coefficients
+    # b' = a' b  =>  b_k = sum j a_j b_{k-j} / k, j = 1..k
+    b = [math.exp(a[0])]
+    for k in range(1, len(a)):
+        b.append(sum(j * a[j] * b[k - j] for j in range(1, k + 1)) / k)
+    return Jet(b)
+
+
+def _sin_cos(x: Jet) -> tuple[Jet, Jet]:
+    a = x.coefficients
+    s, c = [math.sin(a[0])], [math.cos(a[0])]
+    for k in range(1, len(a)):
+        ja = [j * a[j] for j in range(1, k + 1)]
+        s.append(sumprod(ja, c[::-1]) / k)
+        c.append(-sumprod(ja, s[-2::-1]) / k)
+    return Jet(s), Jet(c)
+
+
+def sin(x: Union[Jet, Number]) -> Union[Jet, Number]:
+    return _sin_cos(x)[0] if isinstance(x, Jet) else math.sin(x)
+
+
+def cos(x: Union[Jet, Number]) -> Union[Jet, Number]:
+    return _sin_cos(x)[1] if isinstance(x, Jet) else math.cos(x)
+
+
+def sqrt(x: Union[Jet, Number]) -> Union[Jet, Number]:
+    return x ** 0.5 if isinstance(x, Jet) else math.sqrt(x)
+
+
+# Jet versions of functions used in Expressions
+FUNCTIONS = {
+    math.log: log,
+    math.exp: exp,
+    math.sqrt: sqrt,
+    math.sin: sin,
+    math.cos: cos,
+}
+
+
+def taylor_coefficients(expr: Expression,
+                        var: Var,
+                        point: Number,
+                        order: int,
+                        **values) -> list[Number]:
+    """
+    Return Taylor coefficients c_0, ..., c_order of Expression
+    by var around point, f(point + t) = sum c_k t^k + O(t^(order+1))
+
+    :param values: values of other Vars of Expression
+    """
+    if order < 0:
+        raise ValueError(f"Invalid order {order} of Taylor series")
+    kernel = compile_expression(expr, operations=FUNCTIONS)
+    args = []
+    for v in kernel.vars:
+        if v is var:
+            args.append(Jet.variable(point, order))
+        elif v.name in values:
+            args.append(values[v.name])
+        else:
+            raise NameError(f"Variable `{v.name}` not given value")
+    result = kernel(*args)
+    if not isinstance(result, Jet):
+        result = Jet.constant(result, order)
+    return result.coefficients
+
+
+def taylor(expr: Expression,
+           var: Var,
+           point: Number = 0,
+           order: int = 5,
+           **values) -> Expression:
+    """
+    Return Taylor polynomial of Expression by var around point
+    as Expression in Horner form
+
+    Usage:
+    >>> taylor(x * x * x, x, point=1, order=3)
+        '(1 + ((x - 1) * (3 + ((x - 1) * (3 + ((x - 1) * 1))))))'
+    """
+    c = taylor_coefficients(expr, var, point, order, **values)
+    while len(c) > 1 and c[-1] == 0:
+        c.pop()
+    t = var - point if point else Expression.to_expression(var)
+    result = Expression.to_expression(c[-1])
+    for coefficient in reversed(c[:-1]):
+        result = coefficient + t * result
+    return result
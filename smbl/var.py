@@ -4,8 +4,9 @@ from .domain import Domain, DefaultDomain
 from .operation import Operation, UnaryOperation, BinaryOperation
 from .operation import OpVar, OpConst
 from .operation import Add, Sub, Mul, Div, FloorDiv, Mod, Pow
+from .scope import Scope, current_scope
 
-from typing import Any, Callable, Optional, Union
+from typing import Any, Callable, Iterable, Optional, Union
 import math  # for log(x) function
 
 
@@ -115,20 +116,29 @@ class VarMeta(type):
     """
 
     def __getattr__(cls, var_name: str):
-        if not cls.exist(var_name):
+        if var_name.startswith("__") and var_name.endswith("__"):
+            # special attributes are looked up by pickle, copy, ...
+            raise AttributeError(var_name)
+        var = current_scope().get(var_name)
+        if var is None:
             raise NameError(f"Variable with name `{var_name}` not exist")
-        return cls.__defined_vars__[var_name]
+        return var
+
+    @property
+    def __defined_vars__(cls) -> Scope:
+        """
+        Variables of current scope
+        """
+        return current_scope()
 
     def exist(cls, var: str):
         """
         Check var is exist by name
         """
-        return var in cls.__defined_vars__
+        return var in current_scope()
 
     def delete(cls, var: str):
-        if not cls.exist(var):
-            raise NameError(f"Variable with name `{var}` not exist")
-        del cls.__defined_vars__[var]
+        current_scope().remove(var)
 
     def vars(cls, vars_str: str):
         vars_names = vars_str.split()
@@ -140,33 +150,34 @@ class Var(OperationHandler, metaclass=VarMeta):
     """
     Variable class
 
-    __defined_vars__: dict[str, Var] Dict with every variable by name
+    Variables are registered by name in current Scope (see smbl.scope)
     """
 
-    __defined_vars__ = {}
-
     def __new__(cls, name: str, value: Any = None, domain: Domain = DefaultDomain()):
         """
         Singleton pattern
 
-        Create new varible and save it in storage of all variables
+        Create new varible and save it in scope of variables
         """
-        if name not in cls.__defined_vars__:
-            self = super().__new__(cls)
-            self._name = name
-
+        def create() -> Var:
             if value is not None and value not in domain:
                 raise ValueError(f"({value}) not in {domain}")
 
+            self = super(Var, cls).__new__(cls)
+            self._name = name
             self._value = value
             self._domain = domain
+            return self
 
-            cls.__defined_vars__[name] = self
-        return cls.__defined_vars__[name]
+        return current_scope().register(name, create)
 
     def __call__(self) -> Any:
         return self.value
 
+    def __reduce__(self):
+        # Var is registered by name in current scope of unpickling process
+        return type(self), (self._name, self._value, self._domain)
+
     @property
     def name(self) -> str:
         return self._name
@@ -186,6 +197,19 @@ class Var(OperationHandler, metaclass=VarMeta):
     def domain(self):
         return self._domain
 
+    def validate_many(self, values: Iterable) -> None:
+        """
+        Check all values are in domain of Var by one vectorized
+        check (see Domain.contains_many)
+
+        :raise ValueError: with index of first value not in domain
+        """
+        if not hasattr(values, "__getitem__"):
+            values = list(values)
+        i = self._domain.first_invalid(values)
+        if i is not None:
+            raise ValueError(f"({values[i]}) not in {self.domain} (index {i})")
+
     def __repr__(self) -> str:
         return f'Var("{self.name}", value={self.value}, domain={self.domain})'
 
@@ -198,9 +222,6 @@ class Var(OperationHandler, metaclass=VarMeta):
     def __set__(self, other):
         self.value = other
 
-    def __del__(self):
-        Var.delete(self.name)
-
     def __eq__(self, other):
         return self is other
 
@@ -301,9 +322,25 @@ class Expression(OperationHandler):
 
         return self._operation(*operands)
 
+    def compile(self, *vars: Var):
+        """
+        Compile Expression to python function (see smbl.compiler)
+
+        Usage:
+        >>> e = x * y + x
+        >>> f = e.compile(x, y)
+        >>> f(2, 3)
+            8
+        >>> f.batch([1, 2], [3, 3])
+            [4, 8]
+        """
+        from .compiler import compile_expression
+        return compile_expression(self, list(vars) if vars else None)
+
     def simplify(self) -> Expression:
         """
-        Simplify expression
+        Simplify expression, polynomial subtrees are
+        expanded and collected (see smbl.polynomial)
 
         Example:
         >>> e = x + x + x
@@ -311,8 +348,22 @@ class Expression(OperationHandler):
         >>> e.simplify()
             '(3 * x)'
         """
-        # TODO:
-        pass
+        from .polynomial import simplify
+        return simplify(self)
+
+    def equivalent(self, other: Expression) -> bool:
+        """
+        Check Expressions are equal for all values of Vars
+        by evaluation at random points (see smbl.fingerprint)
+
+        Example:
+        >>> (x + y) == (y + x)
+            False
+        >>> (x + y).equivalent(y + x)
+            True
+        """
+        from .fingerprint import equivalent
+        return equivalent(self, other)
 
     def substitude(self, **params) -> Expression:
         """
@@ -346,56 +397,120 @@ class Expression(OperationHandler):
                 operands.append(op)
         return Expression(self._operation, vars, operands)
 
-    def derivative(self, var: Var):
+    def derivative(self, var: Var) -> Expression:
         """
         Take partial derivative from expression
 
+        Derivative of every shared subtree is taken once, so result
+        shares subtrees too, zero and one factors are not written
+
         Usage:
         >>> e = x ** 2
             '(x ^ 2)'
         >>> e.derivative(x)     # take partial by 'x' varible
-            '((x ^ 2) * ((0 * log(x)) + (2 / x)))'
+            '(2 * x)'
         >>> e.dx                # you can also use this syntax sugar (! register sensetive)
-            '((x ^ 2) * ((0 * log(x)) + (2 / x)))'
+            '(2 * x)'
         """
-        # TODO: Implement derivative for funciton
+        return self._differentiate(var, {})
 
-        if self._operation not in [Add, Sub, Mul, Div, Pow, OpVar, OpConst]:
-            raise Exception(f"Invalid operation {self._operation} to take derivative")
+    def _differentiate(self, var: Var, memo: dict) -> Expression:
+        """
+        :param memo: id of node -> (node, derivative of node by var)
+        """
+        key = id(self)
+        if key in memo:
+            return memo[key][1]
+        result = self._derivative_node(var, memo)
+        memo[key] = (self, result)
+        return result
+
+    def _derivative_node(self, var: Var, memo: dict) -> Expression:
+        operation = self._operation
+        if operation not in _DERIVATIVE_OPERATIONS and not (
+            operation in _FUNCTION_DERIVATIVES and len(self._operands) == 1
+        ):
+            raise Exception(f"Invalid operation {operation} to take derivative")
         if var not in self._vars:
-            return Expression.to_expression(0)
+            return _ZERO
 
-        if self._operation is OpVar:
-            return Expression.to_expression(1)
-        elif self._operation is OpConst:
-            return Expression.to_expression(0)
+        if operation is OpVar:
+            return _ONE if self._operands[0] is var else _ZERO
+        elif operation is OpConst:
+            return _ZERO
+
+        if operation in _FUNCTION_DERIVATIVES:
+            f = Expression.to_expression(self._operands[0])
+            fd = self._derivative(f, var, memo)
+            return _mul(_FUNCTION_DERIVATIVES[operation](f, self), fd)
 
         f, g = self._operands
-        fd = self._derivative(f, var)
-        gd = self._derivative(g, var)
-
-        x = Var("x") if not Var.exist("x") else Var.x
-        ln = Expression.from_callable(math.log, {x})
-
-        if self._operation is Add:
-            return fd + gd
-        elif self._operation is Sub:
-            return fd - gd
-        elif self._operation is Mul:
-            return f * gd + g * fd
-        elif self._operation is Div:
-            return (f * gd - g * fd) / g**2
-        elif self._operation is Pow:
-            return f**g * (gd * ln.substitude(x=f) + g / f)
-
-    def _derivative(self, expr: Expression, var: Var):
+        fd = self._derivative(f, var, memo)
+        gd = self._derivative(g, var, memo)
+
+        if operation is Add:
+            return _add(fd, gd)
+        elif operation is Sub:
+            return fd if _is_const(gd, 0) else fd - gd
+        elif operation is Mul:
+            return _add(_mul(f, gd), _mul(g, fd))
+        elif operation is Div:
+            if _is_const(gd, 0):
+                return fd if _is_const(fd, 0) else fd / g
+            return (_mul(f, gd) - _mul(g, fd)) / g**2
+        elif operation is Pow:
+            if _is_const(gd, 0):
+                # (f^c)' = c f^(c - 1) f'
+                if g._operation is OpConst:
+                    c = g._operands[0]()
+                    if c == 1:
+                        return fd
+                    power = f if c - 1 == 1 else f ** (c - 1)
+                else:
+                    power = f ** (g - 1)
+                return _mul(_mul(g, power), fd)
+            # (f^g)' = f^g (g' log(f) + g f' / f),
+            # log(f) without registering new variable
+            ln_f = Expression(math.log, set(f.vars), [f])
+            return _mul(self, _add(_mul(gd, ln_f), _mul(g, fd) / f))
+
+    def _derivative(self, expr: Expression, var: Var, memo: Optional[dict] = None):
         if isinstance(expr, Expression):
-            return expr.derivative(var)
+            return expr._differentiate(var, {} if memo is None else memo)
         elif isinstance(expr, Var) and expr is var:
             return Expression.to_expression(1)
         else:
             return Expression.to_expression(0)
 
+    def nth_derivative(self, var: Var, n: int) -> Expression:
+        """
+        Take derivative n times, every derivative is DAG with
+        shared subtrees, so derivatives of repeated subtrees are taken
+        once. Size still can grow exponentially with n (products
+        double terms on every step), but much slower than tree
+        """
+        if n < 0:
+            raise ValueError(f"Invalid order of derivative {n}")
+        result = self
+        for _ in range(n):
+            result = result.derivative(var)
+        return result
+
+    def hessian(self, vars: list[Var]):
+        """
+        Return matrix of second derivatives (see smbl.algebra.symbolic.hessian)
+        """
+        from .algebra.symbolic import hessian
+        return hessian(self, vars)
+
+    def hessian_vector_product(self, vars: list[Var]):
+        """
+        Return function (point, v) -> H(point) v without
+        forming Hessian (see smbl.algebra.symbolic.HessianVectorProduct)
+        """
+        from .algebra.symbolic import HessianVectorProduct
+        return HessianVectorProduct(self, vars)
+
     def __eq__(self, other) -> bool:
         if not isinstance(other, Expression):
             return False
@@ -448,3 +563,47 @@ class Expression(OperationHandler):
             return self.derivative(var)
         else:
             raise AttributeError(attr)
+
+
+# -- DERIVATIVE HELPERS --
+
+_DERIVATIVE_OPERATIONS = (Add, Sub, Mul, Div, Pow, OpVar, OpConst)
+
+_ZERO = Expression.from_const(0)
+_ONE = Expression.from_const(1)
+
+
+def _is_const(expr: Expression, value) -> bool:
+    return expr._operation is OpConst and expr._operands[0]() == value
+
+
+def _add(a: Expression, b: Expression) -> Expression:
+    if _is_const(a, 0):
+        return b
+    if _is_const(b, 0):
+        return a
+    return a + b
+
+
+def _mul(a: Expression, b: Expression) -> Expression:
+    if _is_const(a, 0) or _is_const(b, 0):
+        return _ZERO
+    if _is_const(a, 1):
+        return Expression.to_expression(b)
+    if _is_const(b, 1):
+        return Expression.to_expression(a)
+    return a * b
+
+
+def _call(func, f: Expression) -> Expression:
+    return Expression(func, set(f.vars), [f])
+
+
+# derivatives of functions of one argument: (f, func(f)) -> func'(f)
+_FUNCTION_DERIVATIVES = {
+    math.log: lambda f, e: 1 / f,
+    math.exp: lambda f, e: e,
+    math.sqrt: lambda f, e: 0.5 / e,
+    math.sin: lambda f, e: _call(math.cos, f),
+    math.cos: lambda f, e: 0 - _call(math.sin, f),
+}
@@ -0,0 +1,108 @@
+from smbl import Var, Expression
+from smbl.algebra import Vector, Matrix, ortogonalize, qr, orthogonality_error
+from smbl.algebra import SymbolicVector, gradient, jacobian, hessian, HessianVectorProduct
+from math import isclose
+import math
+
+
+def test_vector():
+    a = Vector(1, 2, 3)
+    b = Vector(4, 5, 6)
+
+    assert a + b == Vector(5, 7, 9), "Invalid vectors sum"
+    assert b - a == Vector(3, 3, 3), "Invalid vectors difference"
+    assert a * b == 32, "Invalid dot product"
+    assert 2 * a == Vector(2, 4, 6), "Invalid product by scalar"
+    assert -a == Vector(-1, -2, -3), "Invalid inverse vector"
+
+
+def test_matrix():
+    A = Matrix([Vector(2, 1), Vector(1, 3)])
+    B = Matrix([[1, 2], [3, 4]])
+
+    assert A @ Vector(1, 1) == Vector(3, 4), "Invalid product by vector"
+    assert A @ B == Matrix([[5, 8], [10, 14]]), "Invalid product of matrices"
+    assert B.T == Matrix([[1, 3], [2, 4]]), "Invalid transposed matrix"
+    assert isclose(A.det, 5), "Invalid determinant"
+    assert Matrix([[1, 2], [2, 4]]).det == 0, "Determinant of singular matrix is 0"
+
+    x = A.solve(Vector(3, 5))
+    assert all(isclose(a, b) for a, b in zip(A @ x, (3, 5))), "Invalid solution of system"
+
+    assert 2 * B == B * 2 == Matrix([[2, 4], [6, 8]]), "Invalid product by scalar"
+    for other in (B, Vector(1, 1)):
+        try:
+            B * other
+        except TypeError:
+            pass
+        else:
+            assert False, "Elementwise product by matrix or vector is not rejected"
+
+
+def test_ortogonalize():
+    a = [Vector(1, 1, 0), Vector(1, 0, 1), Vector(2, 1, 1)]
+    for method in ("classical", "modified", "householder"):
+        e = ortogonalize(a, method=method)
+        assert all(isclose(x, y) for x, y in zip(e[1], (0.5, -0.5, 1))), f"Invalid {method} vector"
+        assert all(isclose(x, 0) for x in e[2]), f"Dependent vector is not zero for {method}"
+
+    eps = 1e-8
+    a = [Vector(1, eps, 0, 0), Vector(1, 0, eps, 0), Vector(1, 0, 0, eps)]
+    assert orthogonality_error(ortogonalize(a, normalize=True)) < 1e-7, "Modified Gram–Schmidt is unstable"
+    assert orthogonality_error(ortogonalize(a, method="householder")) < 1e-15, "Householder is unstable"
+
+
+def test_qr():
+    A = Matrix([[1, 2], [3, 4], [5, 7]])
+    Q, R = qr(A)
+    assert R[1][0] == 0, "R is not upper triangular"
+    assert all(isclose(a, b) for x, y in zip(Q @ R, A) for a, b in zip(x, y)), "A != QR"
+    assert orthogonality_error([Vector(*c) for c in Q.columns]) < 1e-15, "Q is not orthogonal"
+
+
+def test_symbolic():
+    x, y = Var.vars("x y")
+    v = SymbolicVector(x * y, x * y + x, 2)
+
+    assert v.evaluate(x=2, y=3) == Vector(6, 8, 2), "Invalid value of symbolic vector"
+    kernel_source = v.compile(x, y).source.split("def _batch")[0]
+    assert kernel_source.count("*") == 1, "Common subexpression is computed twice"
+    assert v.compile(x, y).batch([1, 2], 3) == [(3, 4, 2), (6, 8, 2)], "Invalid batch evaluation"
+
+    J = jacobian([x * y, x + y * y], [x, y])
+    assert J.evaluate(x=2, y=3) == Matrix([[3, 2], [1, 6]]), "Invalid Jacobian"
+    assert gradient(x * x * y, [x, y]).evaluate(x=1, y=2) == Vector(4, 1), "Invalid gradient"
+
+
+def test_derivative():
+    x, y = Var.vars("x y")
+    assert isclose(((x + 1) ** 2).derivative(x)(x=1), 4), "Invalid derivative of power of expression"
+    assert isclose((x ** y).derivative(x)(x=2, y=3), 12), "Invalid derivative of power by base"
+    assert isclose((x ** y).derivative(y)(x=2, y=3), 8 * math.log(2)), "Invalid derivative of power by exponent"
+
+    log = Expression.from_callable(math.log, {x})
+    sin = Expression.from_callable(math.sin, {x})
+    assert isclose(log.derivative(x)(x=4), 0.25), "Invalid derivative of log"
+    assert isclose((sin * x).derivative(x)(x=1), math.sin(1) + math.cos(1)), "Invalid derivative of sin"
+
+    assert isclose((x ** 3).nth_derivative(x, 2)(x=-2), -12), "Invalid second derivative"
+    assert (x ** 3).nth_derivative(x, 4)(x=5) == 0, "Invalid fourth derivative"
+    assert isclose((x ** y).nth_derivative(x, 2)(x=2, y=3), 12), "Invalid second derivative of power"
+
+
+def test_hessian():
+    x, y, z = Var.vars("x y z")
+    e = x * x * y + y * y * z + x * z * z * z
+    H = hessian(e, [x, y, z])
+    exact = [[2 * 2, 2 * 1, 3 * 3 * 3], [2 * 1, 2 * 3, 2 * 2], [3 * 3 * 3, 2 * 2, 6 * 1 * 3]]
+    values = dict(x=1, y=2, z=3)
+    for i in range(3):
+        for j in range(3):
+            assert isclose(H[i][j](**values), exact[i][j]), "Invalid Hessian"
+            assert H[i][j] is H[j][i], "Hessian entries are not shared"
+
+    hvp = HessianVectorProduct(e, [x, y])
+    v = [0.5, -2.0]
+    expected = [sum(exact[i][j] * v[j] for j in range(2)) for i in range(2)]
+    result = hvp([1, 2], v, z=3)
+    assert all(isclose(a, b) for a, b in zip(result, expected)), "Invalid Hessian-vector product"
@@ -0,0 +1,15 @@
+from benchmarks import CASES
+from benchmarks.run import compare
+
+
+def test_cases_run():
+    for name, (setup, sizes) in CASES.items():
+        assert sizes, f"Case {name} has no sizes"
+        setup(sizes[0])()
+
+
+def test_compare():
+    rows = compare({"a[1]": 2.0, "b[1]": 1.0, "c[1]": 1.0, "d[1]": 1.0},
+                   {"a[1]": 1.0, "b[1]": 1.1, "c[1]": 2.0}, threshold=1.25)
+    status = {name: s for name, _, _, s in rows}
+    assert status == {"a[1]": "REGRESSION", "b[1]": "ok", "c[1]": "faster", "d[1]": "new"}, "Invalid statuses"
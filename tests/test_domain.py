@@ -1,6 +1,10 @@
 from smbl.domain import DefaultDomain
 from smbl.domain import OddDomain, EvenDomain
 from smbl.domain import PrimeDomain, IntegerPrimeDomain
+from smbl.domain import IntegerDomain, NaturalDomain, RealDomain
+from smbl.domain import Zn, Zp
+from smbl import Var
+from array import array
 
 
 def test_default_domain():
@@ -36,3 +40,74 @@ def test_integer_prime_domain():
     assert 0 not in IntegerPrimeDomain(), "0 is not Integer Prime Number"
     assert -3301 in IntegerPrimeDomain(), "-3301 is Integer Prime Number"
 
+
+def test_prime_squares_and_large_primes():
+    for n in (4, 9, 25, 49, 121, 561, 3301 * 3301):
+        assert n not in PrimeDomain(), f"{n} is not Prime Number"
+    for n in (2**31 - 1, 2**61 - 1, 2**89 - 1):
+        assert n in PrimeDomain(), f"{n} is Prime Number"
+    assert 2**64 + 1 not in PrimeDomain(), "2^64 + 1 is not Prime Number"
+
+
+def test_contains_many():
+    values = [0, 1, 2, 9, 11, 2**61 - 1, -3, 7.0]
+    expected = [False, False, True, False, True, True, False, False]
+    assert PrimeDomain().contains_many(values) == expected, "Invalid mask of primes"
+    assert OddDomain().contains_many([1, 2, 3]) == [True, False, True], "Invalid mask of odd numbers"
+
+
+def test_vectorized_domains():
+    assert IntegerDomain() is IntegerDomain(), "Default domains must be singletons"
+
+    ints = array("q", [2, 3, -4])
+    floats = array("d", [0.5, 2.0])
+    assert IntegerDomain().contains_many(ints) == [True] * 3, "Invalid mask for integer buffer"
+    assert IntegerDomain().contains_many(floats) == [False] * 2, "Invalid mask for float buffer"
+    assert RealDomain().contains_many(memoryview(floats)) == [True] * 2, "Invalid mask for memoryview"
+    assert NaturalDomain().first_invalid(ints) == 2, "Invalid first offending index"
+    assert IntegerPrimeDomain().first_invalid([2, -3, 5]) is None, "All values are integer primes"
+
+    n = Var("n", domain=NaturalDomain())
+    try:
+        n.validate_many([1, 2, -1])
+        assert False, "-1 is not Natural Number"
+    except ValueError as e:
+        assert "index 2" in str(e), "Invalid index in error"
+    del n
+
+
+def test_modular_arithmetic():
+    Z7 = Zp(7)
+    assert Z7.add(5, 4) == 2, "Invalid modular sum"
+    assert Z7.inverse(3) == 5, "Invalid modular inverse"
+    assert Z7.div(1, 3) == 5, "Invalid modular division"
+    try:
+        Zn(8).inverse(2)
+        assert False, "2 is not invertible modulo 8"
+    except ZeroDivisionError:
+        pass
+
+    a, b = Var.vars("a b")
+    f = Z7.compile(a ** 3 / b + a * b - 10, a, b)
+    assert f(3, 2) == (27 * 4 + 6 - 10) % 7, "Invalid value of Expression in Zp"
+    assert f.batch(range(7), 2) == [(x**3 * 4 + 2 * x - 10) % 7 for x in range(7)], \
+        "Invalid batch evaluation in Zp"
+
+    p = 2**127 - 1
+    assert Zp(p).evaluate(a ** (p - 1), a=123456789) == 1, "Invalid Fermat little theorem"
+
+    # exponent is integer, not residue
+    assert Z7.compile(a ** (b * b), a, b)(3, 3) == 3 ** 9 % 7, "Exponent reduced by modulo"
+    assert Z7.compile(a ** (b + 1), a, b)(2, 6) == 2 ** 7 % 7, "Exponent reduced by modulo"
+    assert Z7.compile(a ** (b - 3), a, b)(3, 1) == 5 ** 2 % 7, "Invalid negative exponent"
+    for e in (1 / a, a ** (b - 3)):
+        try:
+            Zn(8).compile(e, a, b)(2, 1)
+            assert False, "2 is not invertible modulo 8"
+        except ZeroDivisionError:
+            pass
+    try:
+        Z7.compile(a // b, a, b)
+        assert False, "FloorDiv is not defined in ring"
+    except TypeError:
+        pass
@@ -0,0 +1,76 @@
+from smbl import Var, Expression, Scope
+from smbl.fingerprint import ModInt, MODULUS, fingerprint, equivalent, equivalence_classes, deduplicate
+import math
+
+
+def test_mod_int():
+    a = ModInt(3, 7)
+    assert a / 2 == ModInt(5, 7), "Invalid division"
+    assert a ** -1 * a == 1, "Invalid inverse"
+    assert -a + 3 == 0, "Invalid negation"
+    assert ModInt(1) / 3 == ModInt(MODULUS + 1) / 3, "Invalid reduction"
+    try:
+        ModInt(0, 7).inverse()
+        assert False, "Zero has not inverse"
+    except ZeroDivisionError:
+        pass
+    try:
+        a ** a
+        assert False, "Exponent of ModInt type is not valid"
+    except TypeError:
+        pass
+
+
+def test_equivalent():
+    x, y = Var.vars("x y")
+    assert (x + y).equivalent(y + x), "Sum is commutative"
+    assert equivalent((x + y) * (x - y), x * x - y * y), "Invalid difference of squares"
+    assert equivalent(1 / x + 1 / y, (x + y) / (x * y)), "Invalid sum of fractions"
+    assert equivalent((x + 1) ** 3, x ** 3 + 3 * x ** 2 + 3 * x + 1), "Invalid cube"
+    assert not equivalent((x + y) ** 2, x * x + y * y), "Different Expressions are equivalent"
+    assert not equivalent(x / y, y / x), "Different fractions are equivalent"
+
+    # floats and callables are compared over floats
+    assert fingerprint(x * 0.5)[0] == "float", "Float Expression evaluated modulo p"
+    assert equivalent(x * 0.5 + x * 0.5, x), "Float Expressions are not equivalent"
+    log = Expression.from_callable(math.log, {x})
+    exp = Expression.from_callable(math.exp, {y})
+    assert equivalent(2 * log, log + log), "Equal logs are not equivalent"
+    assert not equivalent(log, exp), "Log and exp are equivalent"
+
+
+def test_deduplicate():
+    x, y = Var.vars("x y")
+    log = Expression.from_callable(math.log, {x})
+    exprs = [
+        x + y, y + x, x * (y + 1), x * y + x,
+        x - y, (x - y) * 1, x * 0.5 * 2,
+        log * 2, log + log,
+    ]
+    classes = equivalence_classes(exprs)
+    groups = sorted(sorted(exprs.index(e) for e in group) for group in classes)
+    assert groups == [[0, 1], [2, 3], [4, 5], [6], [7, 8]], "Invalid equivalence classes"
+    assert deduplicate(exprs) == [exprs[0], exprs[2], exprs[4], exprs[6], exprs[7]], \
+        "Invalid deduplicated Expressions"
+
+    # x * 0.5 * 2 is evaluated only over floats, but it is equivalent to x
+    assert len(deduplicate([x, x * 0.5 * 2, y])) == 2, "Float and modular classes are not merged"
+
+
+def test_fingerprint_limits():
+    x = Var("x")
+    sin = Expression.from_callable(math.sin, {x})
+    # integers and exponents not less than p are not reduced
+    assert not equivalent(x * 2 ** 61, x), "Constant reduced modulo p"
+    assert not equivalent(x ** (2 ** 61 - 1), x), "Exponent reduced modulo p"
+    assert fingerprint(x ** (2 ** 61))[0] != "mod", "Large exponent evaluated modulo p"
+
+    # overflow over floats
+    assert not equivalent(x ** 3000, sin), "Overflowed Expression is equivalent"
+    classes = equivalence_classes([x ** 3000, sin, sin + 0])
+    assert sorted(map(len, classes)) == [1, 2], "Invalid classes with overflow"
+
+    with Scope():
+        x2 = Var("x")
+        assert not equivalent(x2 + 0, x + 0), "Different Vars with equal names are equivalent"
+        assert len(deduplicate([x2 + 0, x + 0, 0 + x])) == 2, "Different Vars with equal names merged"
@@ -0,0 +1,51 @@
+from smbl import Var, Expression, Scope
+from smbl.domain import NaturalDomain
+from smbl.incremental import IncrementalEvaluator
+import math
+import random
+
+
+def test_incremental_update():
+    x, y, z = Var.vars("x y z")
+    e = x * y + z + Expression.from_callable(math.sqrt, {z})
+    ev = IncrementalEvaluator(e, x=1, y=2, z=4)
+    assert ev.value == 8, "Invalid initial value"
+    assert ev.update(z=9) == 14, "Invalid value after update"
+    assert ev.recomputed == 3, "Not only dependent nodes are recomputed"
+    assert ev.update(x=1) == 14 and ev.recomputed == 0, "Not changed value is recomputed"
+
+    try:
+        ev.update(x=1, y="a", z=16)
+    except TypeError:
+        pass
+    assert ev.value == 14 and ev.update(z=9) == 14, "Values are not restored after error"
+
+
+def test_incremental_random_updates():
+    with Scope():
+        vs = [Var(f"v{i}") for i in range(64)]
+        terms = [v * (v + i) for i, v in enumerate(vs)]
+        while len(terms) > 1:
+            terms = [a + b for a, b in zip(terms[::2], terms[1::2])]
+        e = terms[0]
+
+        values = {v.name: 1 for v in vs}
+        ev = IncrementalEvaluator([e, e - 1], **values)
+        random.seed(0)
+        for _ in range(100):
+            changed = {random.choice(vs).name: random.randint(-5, 5) for _ in range(2)}
+            values.update(changed)
+            assert ev.update(**changed) == (e(**values), e(**values) - 1), "Invalid value after update"
+            assert ev.recomputed <= 2 * 9, "Update is not O(depth)"
+
+
+def test_incremental_validation():
+    n = Var("inc_n", domain=NaturalDomain())
+    ev = IncrementalEvaluator(n * 2, inc_n=1)
+    for bad in ({"inc_n": -1}, {"other": 1}):
+        try:
+            ev.update(**bad)
+        except (ValueError, NameError):
+            pass
+        else:
+            assert False, f"Invalid update {bad} is accepted"
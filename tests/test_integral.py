@@ -0,0 +1,108 @@
+from smbl import Var
+from smbl.operation import Add, UnaryOperation
+from smbl.calculus import stieltjes_integral, riman_integral, multiple_integral
+from smbl.calculus.quadrature import gauss_kronrod, simpson
+from math import sin, cos, exp, pi, isclose
+from operator import neg
+import pickle
+
+
+def test_adaptive_quadrature():
+    for method in (gauss_kronrod, simpson):
+        value, error = method(sin, (0, 1))
+        assert isclose(value, 1 - cos(1), abs_tol=1e-10), f"Invalid {method.__name__} value"
+        assert error < 1e-10, f"Invalid {method.__name__} error estimation"
+
+    value, _ = gauss_kronrod(lambda x: exp(-x * x), (-10, 10))
+    assert isclose(value, pi**0.5, abs_tol=1e-10), "Invalid integral of exp(-x^2)"
+
+    for method in (gauss_kronrod, simpson):
+        # tolerance below rounding error is clamped
+        value, _ = method(sin, (0, 1), tol=0)
+        assert isclose(value, 1 - cos(1), abs_tol=1e-14), f"Invalid {method.__name__} value for tol=0"
+
+
+def test_riman_integral():
+    calls = 0
+
+    def f(x):
+        nonlocal calls
+        calls += 1
+        return sin(x)
+
+    assert isclose(riman_integral(f, (0, 1)), 1 - cos(1), abs_tol=1e-12), "Invalid integral of sin"
+    assert calls < 100, "Too many evaluations for smooth function"
+    assert isclose(riman_integral(cos, (1, 0)), -sin(1), abs_tol=1e-12), "Invalid reversed segment"
+    assert isclose(riman_integral(lambda x: x, (0, 1), dx=1e-3), 0.5, abs_tol=1e-3), "Invalid Riman sum"
+
+
+def test_stieltjes_integral():
+    value = stieltjes_integral(cos, sin, (0, pi / 2), dx=1e-4)
+    assert isclose(value, pi / 4, abs_tol=1e-4), "Invalid Riman-Stieltjes integral"
+
+
+def test_stieltjes_evaluations():
+    points = []
+
+    def g(x):
+        points.append(x)
+        return x * x
+
+    class Batch:
+        calls = 0
+
+        def __call__(self, x):
+            return 2 * x
+
+        def batch(self, xs):
+            self.calls += 1
+            return [2 * x for x in xs]
+
+    f = Batch()
+    value = stieltjes_integral(f, g, (0, 1), dx=1e-3, chunk=100)
+    assert isclose(value, 4 / 3, abs_tol=1e-2), "Invalid Riman-Stieltjes integral"
+    assert len(points) == 1000 + 10, "g must be evaluated once per grid point"
+    assert f.calls == 10, "f must be evaluated once per chunk"
+
+
+def test_expression_integral():
+    x, y = Var.vars("x y")
+    e = x * x + 1
+
+    assert isclose(riman_integral(e, (0, 1)), 4 / 3, abs_tol=1e-12), "Invalid integral of Expression"
+    assert isclose(riman_integral(e, (0, 1), dx=1e-4), 4 / 3, abs_tol=1e-3), "Invalid Riman sum of Expression"
+    assert isclose(stieltjes_integral(x, x * x, (0, 1), dx=1e-4, var=x), 2 / 3, abs_tol=1e-3), \
+        "Invalid Riman-Stieltjes integral of Expression"
+    assert isclose(multiple_integral(x * y + y, {x: (0, 1), y: (0, 2)}), 3, abs_tol=1e-10), \
+        "Invalid multiple integral"
+
+
+def test_parallel_integral():
+    f = lambda x: sin(x) * exp(x)
+    values = {stieltjes_integral(f, exp, (pi, 0), dx=1e-4, chunk=1000, workers=w) for w in (1, 2, 4)}
+    assert len(values) == 1, "Result depends on count of workers"
+
+    values = {riman_integral(f, (0, 3), workers=w) for w in (1, 3)}
+    assert len(values) == 1, "Result depends on count of workers"
+    exact = (exp(3) * (sin(3) - cos(3)) + 1) / 2
+    assert isclose(values.pop(), exact, abs_tol=1e-9), "Invalid parallel integral"
+
+
+def test_process_integral():
+    x = Var("x")
+    e = x * x + 1
+    k = e.compile(x)
+    assert pickle.loads(pickle.dumps(k))(3) == 10, "Invalid unpickled Kernel"
+    assert pickle.loads(pickle.dumps(Add)) is Add, "Default Operation is not unpickled by name"
+    op = UnaryOperation("neg", neg, name="test_neg")
+    assert pickle.loads(pickle.dumps(op)) is op, "Registered Operation is not unpickled by name"
+
+    value = riman_integral(e, (0, 1), workers=2, parts=4, executor="process")
+    assert value == riman_integral(e, (0, 1), workers=1, parts=4), "Result depends on executor"
+    value = stieltjes_integral(e, x, (0, 1), dx=1e-3, chunk=200, workers=2, executor="process")
+    assert value == stieltjes_integral(e, x, (0, 1), dx=1e-3, chunk=200), \
+        "Riman-Stieltjes sum in processes differs from serial"
+    assert value == stieltjes_integral(e, x, (0, 1), dx=1e-3, chunk=200, workers=1), \
+        "Riman-Stieltjes sum depends on workers"
+    value = stieltjes_integral(x, x * x, (0, 1), dx=1e-3, chunk=200, var=x, workers=2, executor="process")
+    assert isclose(value, 2 / 3, abs_tol=1e-2), "Invalid Riman-Stieltjes sum in processes"
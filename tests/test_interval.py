@@ -0,0 +1,30 @@
+from smbl import Var, Expression
+from smbl.interval import Interval, evaluate_interval, evaluate_boxes
+import math
+import random
+
+
+def test_interval_arithmetic():
+    a, b = Interval(1, 2), Interval(-1, 3)
+
+    assert a + b == Interval(0, 5), "Invalid sum of intervals"
+    assert a - b == Interval(-2, 3), "Invalid difference of intervals"
+    assert a * b == Interval(-2, 6), "Invalid product of intervals"
+    assert b ** 2 == Interval(0, 9), "Invalid even power of interval"
+    assert Interval(5, 6) % 4 == Interval(1, 2), "Invalid modulo of interval"
+    assert 1 / 3 in Interval(1) / Interval(3), "Rounding is not outward"
+
+
+def test_evaluate_interval():
+    x, y = Var.vars("x y")
+    e = x * x - x * y + Expression.from_callable(math.log, {y})
+
+    box = {"x": Interval(-1, 2), "y": Interval(1, 3)}
+    bounds = evaluate_interval(e, **box)
+    random.seed(1)
+    for _ in range(1000):
+        xv, yv = random.uniform(-1, 2), random.uniform(1, 3)
+        assert e(x=xv, y=yv) in bounds, "Value is not in bounds"
+
+    lo, hi = evaluate_boxes(x * y, {"x": [0, -1], "y": [1, 1]}, {"x": [1, 1], "y": [2, 2]})
+    assert (lo, hi) == ([0, -2], [2, 2]), "Invalid bounds of boxes"
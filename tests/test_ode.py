@@ -0,0 +1,45 @@
+from smbl import Var
+from smbl.calculus import solve_ode, solve_ode_batch
+import math
+
+
+def test_ode_rk45():
+    t, u, v = Var.vars("t u v")
+    sol = solve_ode([-2 * u], (0, 1), [1.0], t=t, y=[u])
+    assert abs(sol.final[0] - math.exp(-2)) < 1e-6, "Invalid solution of y' = -2y"
+
+    # harmonic oscillator, batch of initial phases
+    starts = [(math.cos(a), math.sin(a)) for a in (0.0, 0.5, 1.0, 2.0)]
+    sol = solve_ode_batch([v, -1 * u], (0, 2 * math.pi), starts, t=t, y=[u, v], rtol=1e-9, atol=1e-12)
+    for start, final in zip(starts, sol.final):
+        assert max(abs(a - b) for a, b in zip(start, final)) < 1e-7, "Invalid period of oscillator"
+
+    single = solve_ode(lambda s, y: (y[1], -y[0]), (0, 2 * math.pi), starts[1], rtol=1e-9, atol=1e-12)
+    assert max(abs(a - b) for a, b in zip(single.final, sol.final[1])) < 1e-7, \
+        "Batch solution differs from single"
+
+    back = solve_ode([t * u], (1, 0), [1.0], t=t, y=[u])
+    assert abs(back.final[0] - math.exp(-0.5)) < 1e-6, "Invalid backward integration"
+
+
+def test_ode_stiff():
+    t, u, v = Var.vars("t u v")
+    f = [-1e6 * (u - t * t) + 2 * t]
+    stiff = solve_ode(f, (0, 1), [1.0], t=t, y=[u], method="rosenbrock", rtol=1e-5, atol=1e-8)
+    assert abs(stiff.final[0] - 1) < 1e-5, "Invalid solution of stiff equation"
+    assert stiff.steps < 5000, "Stiff method makes too many steps"
+    try:
+        solve_ode(f, (0, 1), [1.0], t=t, y=[u], rtol=1e-5, atol=1e-8, max_steps=5000)
+    except RuntimeError:
+        pass
+    else:
+        assert False, "Explicit method solved stiff equation with few steps"
+
+    # batch of stiff linear systems with Jacobian given by function
+    sol = solve_ode_batch(
+        lambda s, y: (-1000 * y[0] + y[1], -y[1]), (0, 2), [(1.0, 1.0), (0.0, 2.0)],
+        method="rosenbrock", rtol=1e-8, atol=1e-10, jac=lambda s, y: [(-1000, 1, 0), (0, -1, 0)],
+    )
+    for (_, w0), (a, b) in zip([(1.0, 1.0), (0.0, 2.0)], sol.final):
+        assert abs(b - w0 * math.exp(-2)) < 1e-5, "Invalid slow component"
+        assert abs(a - b / 999) < 1e-5, "Invalid fast component"
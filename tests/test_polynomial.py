@@ -0,0 +1,78 @@
+from smbl import Var, Expression, Scope
+from smbl.polynomial import Polynomial
+import math
+import random
+
+
+def test_polynomial_arithmetic():
+    x, y = Var.vars("x y")
+    p = Polynomial.from_expression((x + y) * (x - y))
+    assert p == Polynomial.from_expression(x * x - y ** 2), "Invalid expansion"
+    assert str(p) == "x^2 - y^2", "Invalid string of polynomial"
+    assert p.derivative(x) == Polynomial.from_expression(2 * x), "Invalid derivative"
+    assert p.derivative(Var("z")) == 0, "Derivative by other var is not zero"
+    assert (p - p).terms == {}, "Difference with itself is not zero"
+    assert Polynomial.from_expression((x + 1) / 2) == Polynomial.from_expression(0.5 * x + 0.5), \
+        "Invalid division by constant"
+
+    for e in (x / y, x ** y, x ** -1, Expression.from_callable(math.log, {x})):
+        try:
+            Polynomial.from_expression(e)
+        except ValueError:
+            pass
+        else:
+            assert False, f"{e} is not polynomial"
+
+
+def test_polynomial_evaluation():
+    x, y, z = Var.vars("x y z")
+    e = (x + 2 * y - z + 1) ** 4 * (x * y - 3)
+    p = Polynomial.from_expression(e)
+    random.seed(0)
+    for _ in range(20):
+        values = {"x": random.randint(-5, 5), "y": random.randint(-5, 5), "z": random.randint(-5, 5)}
+        assert p(**values) == e(**values), "Invalid value by Horner scheme"
+        assert p.to_expression()(**values) == e(**values), "Invalid expanded Expression"
+        assert p.to_expression(horner=True)(**values) == e(**values), "Invalid Horner Expression"
+
+    a = Polynomial({(i, 1000 - i): i + 1 for i in range(0, 1000, 7)}, (x, y))
+    b = Polynomial({(i % 13, i): 1 for i in range(1000)}, (x, y))
+    assert (a * b)(x=2, y=-1) == a(x=2, y=-1) * b(x=2, y=-1), "Invalid product"
+
+
+def test_simplify():
+    x, y = Var.vars("x y")
+    assert str((x + x + x).simplify()) == "(3 * x)", "Invalid simplification of sum"
+    assert str((x * y - y * x + 1).simplify()) == "1", "Invalid cancellation"
+
+    log = Expression(math.log, {x}, [(x + 1) * (x - 1)])
+    e = (log + x * x - x * x).simplify()
+    assert str(e) == "log(((x ^ 2) - 1))", "Invalid simplification of tree"
+    assert e.vars == {x}, "Invalid vars of simplified Expression"
+    assert e(x=3) == math.log(8), "Simplification changed value"
+
+    e = (x / y + y * x / y - x / y).simplify()
+    assert str(e) == "((x * y) / y)", "Equal atoms are not collected"
+
+
+def test_simplify_atoms():
+    x = Var("x")
+    # nested atoms are expanded once, time is not exponential
+    e = x
+    for _ in range(200):
+        e = Expression(math.log, {x}, [e + 1 - 1])
+    assert str(e.simplify()).count("log") == 200, "Invalid simplify of nested atoms"
+
+    # atoms with equal names are different
+    def f(a):
+        return a
+    g = (lambda: lambda a: -a)()
+    g.__name__ = "f"
+    e = Expression.from_callable(f, {x}) - Expression.from_callable(g, {x})
+    assert str(e.simplify()) != "0", "Different callables are merged"
+
+    with Scope():
+        y = Var("x")
+        e = Expression.from_callable(math.exp, {x}) - Expression.from_callable(math.exp, {y})
+        assert str(e.simplify()) != "0", "Different Vars are merged"
+        assert str((e + e).simplify()).count("exp") == 2, "Equal atoms are not merged"
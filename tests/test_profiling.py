@@ -0,0 +1,73 @@
+import threading
+
+from smbl import Var, Expression
+from smbl.profiling import Profiler, profile_call, tree_stats, TreeStats
+
+
+x, y = Var("x"), Var("y")
+
+
+def test_profiler():
+    original = Expression.__call__
+    e = x * y + x * y
+
+    with Profiler() as prof:
+        assert Expression.__call__ is not original, "Profiler is not enabled"
+        assert e(x=2, y=3) == 12, "Invalid value under profiler"
+    assert Expression.__call__ is original, "Disabled profiler is not removed"
+
+    assert prof.stats["+"].calls == 1, "Invalid count of +"
+    assert prof.stats["*"].calls == 2, "Invalid count of *"
+    assert prof.stats["VAR x"].calls == 2, "Invalid count of x"
+    assert prof.stats["+"].total >= prof.stats["*"].total, "Total time of root less than of child"
+
+    lines = prof.collapsed(unit=1e-9)
+    assert all(line.startswith("+") for line in lines), "Stack not starts with root"
+    assert "+;*;VAR x" in {line.rsplit(" ", 1)[0] for line in lines}, "Invalid stack"
+
+
+def test_profiler_thread():
+    e = x * y
+    done = threading.Event()
+    stop = threading.Event()
+
+    def worker():
+        while not stop.is_set():
+            e(x=1, y=2)
+            done.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    try:
+        done.wait()
+        with Profiler() as prof:
+            done.clear()
+            done.wait()
+            assert e(x=2, y=3) == 6, "Invalid value under profiler"
+            done.clear()
+            done.wait()
+    finally:
+        stop.set()
+        thread.join()
+    assert prof.stats["*"].calls == 1, "Calls of other thread are counted"
+
+
+def test_profile_call():
+    value, timing = profile_call(x * y + x, x=2, y=3)
+    assert value == 8, "Invalid value"
+    labels = [(d, node.label) for d, node in timing.walk()]
+    assert labels == [(0, "+"), (1, "*"), (2, "VAR x"), (2, "VAR y"), (1, "VAR x")], "Invalid nodes"
+    assert abs(timing.total - timing.self - sum(c.total for c in timing.children)) < 1e-9, \
+        "Self time is not total without children"
+
+
+def test_tree_stats():
+    a = x * y
+    e = a + a
+    assert tree_stats(e) == TreeStats(size=7, depth=3, objects=4, unique=4), "Invalid stats of shared tree"
+    assert tree_stats(x * y + x * y).unique == 4, "Equal subtrees are not unique once"
+
+    chain = x
+    for i in range(5000):
+        chain = chain + i
+    assert tree_stats(chain).depth == 5001, "Invalid depth of deep tree"
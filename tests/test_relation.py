@@ -0,0 +1,100 @@
+from smbl.relations import BinaryRelation, MappedPairs, Relation, ReachabilityIndex, join_all
+import random
+
+
+def test_mapped_relation(tmp_path):
+    p = BinaryRelation({(1, 2), (2, 3), (3, 1), (1, "a")}, {1, 2, 3, "a", "b"})
+    path = str(tmp_path / "p.rel")
+    p.save(path)
+
+    q = BinaryRelation.load(path)
+    assert isinstance(q.pairs, MappedPairs), "Loaded relation is not memory-mapped"
+    assert len(q.pairs) == 4, "Invalid count of pairs"
+    assert (1, 2) in q, "(1, 2) in relation"
+    assert (1, "a") in q, "(1, 'a') in relation"
+    assert (2, 1) not in q, "(2, 1) not in relation"
+    assert ("b", 1) not in q, "('b', 1) not in relation"
+    assert q.M == p.M, "Invalid relation elements"
+    assert q.Pr1 == p.Pr1, "Invalid first projection"
+    assert q.Pr2 == p.Pr2, "Invalid second projection"
+    assert (q * q).pairs == (p * p).pairs, "Invalid multiplication"
+    assert (q | p).pairs == p.pairs, "Invalid union"
+    assert not q._indexes, "Index of memory-mapped relation is kept in memory"
+
+    with q:
+        pass
+    assert q.pairs.closed, "File is not released at exit of with block"
+    with BinaryRelation.load(path) as q:
+        assert (1, 2) in q, "(1, 2) in reopened relation"
+    storage = MappedPairs(path)
+    finalizer = storage._finalizer
+    del storage
+    assert not finalizer.alive, "File of collected storage is not released"
+
+
+def test_relation_algebra():
+    p = Relation({(1, "a", 5), (2, "b", 5), (3, "a", 7)}, columns=("id", "name", "size"))
+    q = Relation({(1, 10), (1, 20), (3, 30), (4, 40)}, columns=("id", "price"))
+
+    assert p.select(where={"name": "a"}).relation == {(1, "a", 5), (3, "a", 7)}, "Invalid selection by value"
+    assert p.select(lambda t: t[2] > 5).relation == {(3, "a", 7)}, "Invalid selection by predicate"
+    assert p.project("name").relation == {("a",), ("b",)}, "Invalid projection"
+    assert p.project(2, 1).columns == ("size", "name"), "Invalid names of projection"
+
+    pq = p.join(q)
+    assert pq.columns == ("id", "name", "size", "price"), "Invalid columns of natural join"
+    assert pq.relation == {(1, "a", 5, 10), (1, "a", 5, 20), (3, "a", 7, 30)}, "Invalid natural join"
+    assert q.join(p).relation == {(1, 10, "a", 5), (1, 20, "a", 5), (3, 30, "a", 7)}, "Invalid join order"
+    assert p.join(q, on=[(2, 0)]).relation == set(), "Invalid equi join"
+    assert len(p.join(q, on=[])) == 12, "Invalid cross product"
+    assert (q - q.select(where={"id": 1})).relation == {(3, 30), (4, 40)}, "Invalid difference"
+
+    r = BinaryRelation({(1, 2), (2, 3), (2, 4), (4, 1)})
+    assert (r * r).pairs == {(1, 3), (1, 4), (2, 1), (4, 2)}, "Invalid composition"
+    assert r.project(1, 0).relation == r.r.pairs, "Invalid inverse by projection"
+    assert isinstance(r - r.select(where={0: 1}), BinaryRelation), "Difference changed type of relation"
+
+
+def test_join_all():
+    edges = {(a, b) for a in range(30) for b in range(30) if (a * 7 + b) % 5 == 0}
+    p = Relation(edges, columns=("a", "b"))
+    q = Relation(edges, columns=("b", "c"))
+    r = Relation({(0,), (1,)}, columns=("a",))
+    s = Relation({("x",), ("y",)}, columns=("d",))
+
+    result = join_all(p, q, s, r)
+    expected = {(a, b, c, d) for a, b in edges for b2, c in edges if b == b2 and a in (0, 1) for d in "xy"}
+    order = [result.columns.index(c) for c in ("a", "b", "c", "d")]
+    assert {tuple(t[i] for i in order) for t in result.relation} == expected, "Invalid multi-way join"
+    assert result.columns[0] == "a", "Smallest relation is not joined first"
+
+
+def _closure(pairs: set[tuple]) -> set[tuple]:
+    closure = set(pairs)
+    while True:
+        new = {(a, d) for a, b in closure for c, d in closure if b == c} - closure
+        if not new:
+            return closure
+        closure |= new
+
+
+def test_reachability_index():
+    p = BinaryRelation({(1, 2), (2, 3), (3, 1), (3, 4), (4, 5), (6, 6), (7, 5)})
+    index = p.reachability_index()
+    assert index.components == 5, "Invalid count of strongly connected components"
+    assert index.reachable(1, 5) and (2, 1) in index, "Reachable pair not found"
+    assert (1, 1) in index and (6, 6) in index, "Element of cycle is not reachable from itself"
+    assert (4, 4) not in index and (5, 1) not in index, "Not reachable pair found"
+    assert (1, "x") not in index, "Unknown element is reachable"
+
+    for seed in range(5):
+        rnd = random.Random(seed)
+        n = 60
+        pairs = {(rnd.randrange(n), rnd.randrange(n)) for _ in range(80)}
+        closure = _closure(pairs)
+        index = ReachabilityIndex(BinaryRelation(pairs), labels=seed % 3 + 1, seed=seed)
+        queries = [(a, b) for a in range(n) for b in range(n)]
+        expected = [q in closure for q in queries]
+        assert [index.reachable(a, b) for a, b in queries] == expected, "Invalid reachability"
+        assert index.reachable_many(queries) == expected, "Invalid batch of queries"
+        assert index.reachable_many(queries[::7]) == expected[::7], "Invalid batch of few queries per source"
@@ -0,0 +1,95 @@
+from smbl import Var, Expression, Scope
+from smbl.profiling import tree_stats
+from smbl.rewrite import Wildcard, Rule, Rewriter, DiscriminationTree, match, rewrite
+import math
+
+
+def test_match():
+    x, y = Var.vars("x y")
+    a, b = Wildcard("a"), Wildcard("b")
+    c = Wildcard("c", kind="const")
+
+    bindings = match(a * c + b, (x + y) * 2 + x)
+    assert bindings is not None, "Pattern not matched"
+    assert str(bindings["a"]) == "(x + y)" and bindings["c"]() == 2 and str(bindings["b"]) == "x", \
+        "Invalid bindings"
+    assert match(a * c, x * y) is None, "Const Wildcard matched Var"
+    assert match(a - a, (x + 1) - (x + 1)) is not None, "Equal subtrees not matched"
+    assert match(a - a, x - y) is None, "Repeated Wildcard matched different subtrees"
+    assert match(x + a, y + 1) is None, "Different Vars matched"
+
+    try:
+        Rule(a + 0, b)
+        assert False, "Unknown Wildcard in replacement"
+    except ValueError:
+        pass
+
+
+def test_discrimination_tree():
+    x, y = Var.vars("x y")
+    a = Wildcard("a")
+    v = Wildcard("v", kind="var")
+    tree = DiscriminationTree()
+    patterns = [a + 0, a * 1, v * 1, x * a, (a + 1) * a, a]
+    for i, p in enumerate(patterns):
+        tree.insert(p, i)
+
+    assert tree.candidates(x * 1) == [1, 2, 3, 5], "Invalid candidates"
+    assert tree.candidates((y + 1) * 2) == [4, 5], "Invalid candidates of nested pattern"
+    assert tree.candidates(y + 1) == [5], "Invalid candidates of not matched node"
+    assert len(tree) == 6, "Invalid size of tree"
+
+
+def test_rewrite():
+    x, y = Var.vars("x y")
+    a, b = Wildcard("a"), Wildcard("b")
+    c, d = Wildcard("c", kind="const"), Wildcard("d", kind="const")
+    rules = Rewriter([
+        Rule(a + 0, a), Rule(0 + a, a),
+        Rule(a * 1, a), Rule(1 * a, a),
+        Rule(a * 0, 0), Rule(0 * a, 0),
+        Rule(a - a, 0),
+        # fold constants
+        Rule(c + d, lambda bind: bind["c"]() + bind["d"]()),
+        Rule(c - d, lambda bind: bind["c"]() - bind["d"]()),
+        Rule(c * d, lambda bind: bind["c"]() * bind["d"]()),
+        Rule(a / c, lambda bind: bind["a"] * (1 / bind["c"]()), condition=lambda bind: bind["c"]() != 0),
+    ])
+    assert str(rules.rewrite((x * 1 + 0) * (y - y + 1))) == "x", "Invalid rewriting"
+    assert str(rules.rewrite(x * (2 + 3) * (1 - 1 + 0))) == "0", "Constants not folded"
+    assert str(rules.rewrite(x / 4)) == "(x * 0.25)", "Conditional rule not applied"
+    assert str(rules.rewrite(x / (1 - 1))) == "(x / 0)", "Conditional rule applied"
+
+    # rewritten result is normalized again
+    e = rules.rewrite((x + 0) * (2 * (y * 0 + 1) - 1))
+    assert str(e) == "x", "Result of rule not normalized"
+
+    # equal subtrees are normalized once
+    shared = [(x * 1 + 0) * (y * 1 + 0) for _ in range(10)]
+    total = shared[0]
+    for s in shared[1:]:
+        total = total + s
+    rules.rewrite(total)
+    assert rules.steps == 4, "Equal subtrees normalized many times"
+
+    exp = Expression.from_callable(math.exp, {x})
+    assert str(rewrite(exp + 1, [Rule(Expression(math.exp, {a}, [a]), a)])) == "(x + 1)", \
+        "Callable not rewritten"
+
+    loop = Rewriter([Rule(a + b, b + a)])
+    try:
+        loop.rewrite(x + y)
+        assert False, "Cycle of rules not found"
+    except RuntimeError:
+        pass
+
+
+def test_rewrite_deep():
+    with Scope():
+        vs = [Var(f"v{i}") for i in range(1500)]
+    a = Wildcard("a")
+    e = vs[0] * 1
+    for v in vs[1:]:
+        e = (e + v * 1) + 0
+    result = rewrite(e, [Rule(a * 1, a), Rule(a + 0, a)])
+    assert tree_stats(result).size == 2 * 1500 - 1, "Invalid rewriting of deep tree"
@@ -0,0 +1,50 @@
+from smbl import Var
+from smbl.scope import Scope, current_scope, GLOBAL_SCOPE
+from smbl.domain import NaturalDomain, IntegerDomain
+import gc
+import threading
+
+
+def test_scope_isolation():
+    with Scope() as scope:
+        assert current_scope() is scope, "Scope is not current"
+        u = Var("scoped_u", domain=NaturalDomain())
+        assert Var.scoped_u is u, "Variable not found in scope"
+        assert not (u ** 2).derivative(u).vars - {u}, "derivative registered new variable"
+    assert current_scope() is GLOBAL_SCOPE, "Scope is not restored"
+    assert not Var.exist("scoped_u"), "Scoped variable is visible globally"
+
+
+def test_scope_is_weak():
+    with Scope() as scope:
+        for i in range(1000):
+            e = Var(f"tmp{i}") * 2 + 1
+        del e
+        gc.collect()
+        assert len(scope) == 0, "Unused variables are kept in scope"
+
+    Var("global_kept")
+    gc.collect()
+    assert Var.exist("global_kept"), "Global scope lost variable without references"
+    Var.delete("global_kept")
+
+
+def test_scope_threads():
+    domains = {}
+
+    def worker(name, domain):
+        with Scope():
+            t = Var("t", domain=domain)
+            domains[name] = t.domain
+
+    threads = [
+        threading.Thread(target=worker, args=("natural", NaturalDomain())),
+        threading.Thread(target=worker, args=("integer", IntegerDomain())),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert domains == {"natural": NaturalDomain(), "integer": IntegerDomain()}, \
+        "Variables of different threads are shared"
@@ -0,0 +1,45 @@
+from smbl import Var
+from smbl.calculus import find_root, solve_system, minimize
+import math
+
+
+def test_find_root():
+    x, a = Var.vars("x a")
+    f = x * x * x - a
+    for method in ("newton", "halley"):
+        result = find_root(f, x, [0.5, 1.0, 3.0, -2.0], method=method, a=2.0)
+        assert all(result.converged), f"{method} not converged"
+        assert all(abs(r - 2 ** (1 / 3)) < 1e-12 for r in result.x), f"Invalid {method} roots"
+    newton = find_root(f, x, [3.0], a=2.0)
+    halley = find_root(f, x, [3.0], method="halley", a=2.0)
+    assert halley.iterations[0] < newton.iterations[0], "Halley is not faster than Newton"
+
+    result = find_root(x * x + 1, x, [0.0, 1.0], max_iter=20)
+    assert not any(result.converged), "Root of x^2 + 1 is found"
+    assert result.stats["rate"] == 0, "Invalid convergence rate"
+
+
+def test_solve_system():
+    x, y = Var.vars("x y")
+    # circle and line, roots (0.6, 0.8) and (-0.6, -0.8)
+    F = [x * x + y * y - 1, 4 * x - 3 * y]
+    result = solve_system(F, [x, y], [(1.0, 1.0), (-2.0, -0.5), (30.0, -40.0)])
+    assert all(result.converged), "Damped Newton not converged"
+    for p in result.x:
+        assert min(math.dist(p, r) for r in [(0.6, 0.8), (-0.6, -0.8)]) < 1e-12, "Invalid root of system"
+    assert result.stats["converged"] == 3, "Invalid statistics"
+
+
+def test_minimize():
+    x, y = Var.vars("x y")
+    rosenbrock = (1 - x) * (1 - x) + 100 * (y - x * x) * (y - x * x)
+    starts = [(-1.2, 1.0), (0.0, 0.0), (2.0, 2.0), (-3.0, -1.0)]
+    result = minimize(rosenbrock, [x, y], starts, tol=1e-9)
+    assert all(result.converged), "L-BFGS not converged"
+    for p in result.x:
+        assert math.dist(p, (1, 1)) < 1e-6, "Invalid minimum of Rosenbrock function"
+    assert math.dist(result.best(), (1, 1)) < 1e-6, "Invalid best minimum"
+
+    quadratic = (x - 3) * (x - 3) + 2 * (y + 1) * (y + 1)
+    result = minimize(quadratic, [x, y], [(0.0, 0.0)], method="gradient", tol=1e-7)
+    assert result.converged[0] and math.dist(result.x[0], (3, -1)) < 1e-6, "Invalid gradient descent"
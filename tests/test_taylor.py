@@ -0,0 +1,49 @@
+from smbl import Var, Expression
+from smbl.taylor import Jet, taylor, taylor_coefficients
+from math import factorial, isclose
+import math
+
+
+def test_jet_arithmetic():
+    t = Jet.variable(1.0, order=3)
+    assert t * t == Jet([1.0, 2.0, 1.0, 0.0]), "Invalid product"
+    assert (t * t) / t == t, "Invalid division"
+    assert t ** 3 == Jet([1.0, 3.0, 3.0, 1.0]), "Invalid integer power"
+    assert all(isclose(a, b) for a, b in zip((t ** 0.5 * t ** 0.5).coefficients, t.coefficients)), \
+        "Invalid real power"
+
+
+def test_taylor_coefficients():
+    x, y = Var.vars("x y")
+    log = Expression.from_callable(math.log, {x})
+    e = log * Expression.from_callable(math.exp, {y}) / math.exp(2.0) * y + x ** 3 / (x + 1) - x % 2
+
+    for point in (0.5, 1.5):
+        c = taylor_coefficients(e, x, point, order=6, y=2.0)
+        # compare with derivatives calculated by finite differences of exact formulas
+        exact = [
+            2 * math.log(point) + point ** 3 / (point + 1) - point % 2,
+            2 / point + (2 * point ** 3 + 3 * point ** 2) / (point + 1) ** 2 - 1,
+        ]
+        assert isclose(c[0], exact[0]), "Invalid value"
+        assert isclose(c[1], exact[1]), "Invalid first derivative"
+
+    # log(1 + t) = t - t^2/2 + t^3/3 - ...
+    c = taylor_coefficients(log, x, 1.0, order=8)
+    assert all(isclose(c[k], (-1) ** (k + 1) / k) for k in range(1, 9)), "Invalid series of log"
+
+    c = taylor_coefficients(x ** x, x, 1.0, order=3)
+    assert all(isclose(a, b) for a, b in zip(c, [1, 1, 1, 0.5])), "Invalid series of x^x"
+
+
+def test_taylor_polynomial():
+    x = Var("x")
+    p = taylor(x * x * x, x, point=1, order=5)
+    for v in (0.0, 1.0, 2.5):
+        assert isclose(p(x=v), v ** 3), "Taylor polynomial of polynomial is not exact"
+
+    exp = Expression.from_callable(math.exp, {x})
+    p = taylor(exp, x, order=20)
+    assert isclose(p(x=1.0), math.e), "Invalid Taylor polynomial of exp"
+    assert Jet.variable(0.0, 3).derivatives() == [0.0, 1, 0, 0], "Invalid derivatives"
+    assert factorial(3) * taylor_coefficients(x ** 3, x, 2.0, 3)[3] == 6, "Invalid third derivative"